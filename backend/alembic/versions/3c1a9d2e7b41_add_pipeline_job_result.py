@@ -0,0 +1,28 @@
+"""add pipeline job result
+
+Revision ID: 3c1a9d2e7b41
+Revises: 80f0c56ad0ef
+Create Date: 2026-10-19 10:12:31.402118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1a9d2e7b41'
+down_revision: Union[str, Sequence[str], None] = '80f0c56ad0ef'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('pipeline_jobs', sa.Column('result', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('pipeline_jobs', 'result')
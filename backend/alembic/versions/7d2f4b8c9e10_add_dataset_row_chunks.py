@@ -0,0 +1,40 @@
+"""add dataset row chunks
+
+Revision ID: 7d2f4b8c9e10
+Revises: 3c1a9d2e7b41
+Create Date: 2026-10-19 11:02:47.118530
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2f4b8c9e10'
+down_revision: Union[str, Sequence[str], None] = '3c1a9d2e7b41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('dataset_row_chunks',
+    sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('dataset_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('chunk_index', sa.Integer(), nullable=False),
+    sa.Column('row_start', sa.Integer(), nullable=False),
+    sa.Column('row_count', sa.Integer(), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.ForeignKeyConstraint(['dataset_id'], ['datasets.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_dataset_row_chunks_dataset_id'), 'dataset_row_chunks', ['dataset_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_dataset_row_chunks_dataset_id'), table_name='dataset_row_chunks')
+    op.drop_table('dataset_row_chunks')
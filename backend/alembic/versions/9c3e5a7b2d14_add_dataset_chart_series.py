@@ -0,0 +1,28 @@
+"""add dataset chart series
+
+Revision ID: 9c3e5a7b2d14
+Revises: e4a7c2f9b813
+Create Date: 2026-10-19 18:22:41.305117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c3e5a7b2d14'
+down_revision: Union[str, Sequence[str], None] = 'e4a7c2f9b813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('datasets', sa.Column('chart_series', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('datasets', 'chart_series')
@@ -0,0 +1,32 @@
+"""add dataset profile
+
+Revision ID: b5e8a1c3d7f2
+Revises: 7d2f4b8c9e10
+Create Date: 2026-10-19 11:48:05.630214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e8a1c3d7f2'
+down_revision: Union[str, Sequence[str], None] = '7d2f4b8c9e10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('datasets', sa.Column('profile', sa.JSON(), nullable=True))
+    op.add_column('datasets', sa.Column('profile_version', sa.Integer(), nullable=True))
+    op.add_column('datasets', sa.Column('content_hash', sa.String(length=40), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('datasets', 'content_hash')
+    op.drop_column('datasets', 'profile_version')
+    op.drop_column('datasets', 'profile')
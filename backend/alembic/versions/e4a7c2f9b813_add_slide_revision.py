@@ -0,0 +1,28 @@
+"""add slide revision
+
+Revision ID: e4a7c2f9b813
+Revises: b5e8a1c3d7f2
+Create Date: 2026-10-19 14:02:37.118406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a7c2f9b813'
+down_revision: Union[str, Sequence[str], None] = 'b5e8a1c3d7f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('slides', sa.Column('revision', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('slides', 'revision')
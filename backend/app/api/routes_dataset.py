@@ -0,0 +1,76 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+import uuid
+
+from app.core.db import get_db
+from app.models.dataset import Dataset
+from app.services.dataset_rows import MAX_PAGE_ROWS, load_dataset_rows
+from app.services.dataset_service import ensure_dataset_profiles
+
+
+router = APIRouter(prefix="/datasets", tags=["datasets"])
+
+
+# =====================================================
+# PAGINATED ROWS
+# =====================================================
+@router.get("/{dataset_id}/rows")
+def get_dataset_rows(
+    dataset_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_ROWS),
+    columns: str | None = Query(None, description="Comma-separated column names"),
+    db: Session = Depends(get_db),
+):
+    try:
+        dataset_uuid = uuid.UUID(dataset_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid dataset id")
+
+    dataset = db.query(Dataset).filter(Dataset.id == dataset_uuid).first()
+
+    if not dataset:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+
+    selected = None
+    if columns:
+        selected = [c.strip() for c in columns.split(",") if c.strip()]
+        unknown = [c for c in selected if c not in dataset.columns]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown columns: {unknown}")
+
+    rows = load_dataset_rows(db, dataset, offset=offset, limit=limit, columns=selected)
+
+    return {
+        "dataset_id": str(dataset.id),
+        "offset": offset,
+        "limit": limit,
+        "total": dataset.row_count,
+        "columns": [c for c in dataset.columns if selected is None or c in selected],
+        "rows": rows,
+    }
+
+
+# =====================================================
+# RENDER-READY CHART SERIES
+# =====================================================
+@router.get("/{dataset_id}/chart-series")
+def get_dataset_chart_series(dataset_id: str, db: Session = Depends(get_db)):
+    """Categories, cleaned labels and normalized series, as the exporter plots them."""
+    try:
+        dataset_uuid = uuid.UUID(dataset_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid dataset id")
+
+    dataset = db.query(Dataset).filter(Dataset.id == dataset_uuid).first()
+
+    if not dataset:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+
+    # Recompiles legacy datasets / older series versions
+    ensure_dataset_profiles(db, [dataset])
+
+    return {
+        "dataset_id": str(dataset.id),
+        "chart_series": dataset.chart_series,
+    }
@@ -1,5 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, Header
+from fastapi import APIRouter, Depends, HTTPException, Header, Query
 from fastapi.responses import FileResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.orm import Session
 import uuid
 import os
@@ -8,20 +9,43 @@ from app.core.db import get_db
 from app.models.project import Project
 from app.models.slide import Slide
 
-from app.services.export_service import export_project_to_ppt
+from app.api.routes_pipeline import orchestrator
+from app.models.pipeline_job import JobStatus
+from app.services.export_service import (
+    export_filename,
+    export_project_to_ppt,
+    remove_pinned_export,
+)
+from app.services.pipeline_orchestrator import EXPORT_STEP
+from app.services.ppt.chart_embedding import EMBED_MODES
 
 
 router = APIRouter(prefix="/export", tags=["export"])
 
+EMBED_QUERY = Query(
+    None,
+    description="Chart workbooks: full (editable), minimal (smaller) or none (read-only)",
+)
+
+
+def _check_embed_mode(embed: str | None):
+    if embed is not None and embed not in EMBED_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid embed mode '{embed}'. Use one of: {', '.join(EMBED_MODES)}",
+        )
+
 
 @router.post("/{project_id}")
 def export_project(
     project_id: str, 
     db: Session = Depends(get_db),
     x_export_debug: str | None = Header(default=None, alias="X-EXPORT-DEBUG"),
+    embed: str | None = EMBED_QUERY,
 ):
     
     debug_mode = x_export_debug == "true"
+    _check_embed_mode(embed)
 
     uuid.UUID(project_id)
 
@@ -50,6 +74,9 @@ def export_project(
             slides=slides,
             db=db,
             debug_mode=debug_mode,
+            embed_mode=embed,
+            # Own link: cache eviction must not unlink it while streaming
+            pin_as=f"sync-{uuid.uuid4().hex}",
         )
     except RuntimeError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -59,5 +86,74 @@ def export_project(
     return FileResponse(
         ppt_path,
         media_type="application/vnd.openxmlformats-officedocument.presentationml.presentation",
-        filename=os.path.basename(ppt_path),
+        filename=export_filename(project),
+        background=BackgroundTask(remove_pinned_export, ppt_path),
+    )
+
+
+PPTX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+
+
+# =====================================================
+# EXPORT JOBS (submit -> poll -> download)
+# =====================================================
+@router.post("/{project_id}/jobs")
+def submit_export_job(
+    project_id: str,
+    db: Session = Depends(get_db),
+    x_export_debug: str | None = Header(default=None, alias="X-EXPORT-DEBUG"),
+    embed: str | None = EMBED_QUERY,
+):
+
+    _check_embed_mode(embed)
+    pid = uuid.UUID(project_id)
+
+    project = db.query(Project).filter(Project.id == pid).first()
+
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    if not db.query(Slide.id).filter(Slide.project_id == pid).first():
+        raise HTTPException(status_code=400, detail="No slides to export")
+
+    job_id = orchestrator.submit_export(project_id, x_export_debug == "true", db, embed_mode=embed)
+
+    return {"job_id": job_id, "status": "started"}
+
+
+def _get_export_job(job_id: str, db: Session) -> dict:
+    job = orchestrator.get_job_status(job_id, db)
+
+    if not job or job["step_name"] != EXPORT_STEP:
+        raise HTTPException(status_code=404, detail="Export job not found")
+
+    return job
+
+
+@router.get("/jobs/{job_id}")
+def get_export_job(job_id: str, db: Session = Depends(get_db)):
+    """Status plus progress ({"done", "total"} slides) of an export job."""
+    return _get_export_job(job_id, db)
+
+
+@router.get("/jobs/{job_id}/download")
+def download_export_job(job_id: str, db: Session = Depends(get_db)):
+
+    job = _get_export_job(job_id, db)
+
+    if job["status"] == JobStatus.FAILED.value:
+        raise HTTPException(status_code=400, detail=job["error_message"] or "Export failed")
+
+    if job["status"] != JobStatus.COMPLETED.value:
+        raise HTTPException(status_code=409, detail="Export is still running")
+
+    ppt_path = job["result"]["file"]
+
+    if not os.path.exists(ppt_path):
+        raise HTTPException(status_code=410, detail="Export file expired; export again")
+
+    return FileResponse(
+        ppt_path,
+        media_type=PPTX_MEDIA_TYPE,
+        filename=job["result"]["filename"],
     )
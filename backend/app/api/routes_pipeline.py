@@ -1,12 +1,9 @@
 from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from app.core.db import get_db
-from app.services.pipeline_orchestrator import PipelineOrchestrator
-from app.services.excel_parser import parse_excel
-from app.models.project import Project
-from app.models.dataset import Dataset
-from app.models.slide import Slide
-from app.services.slide_generator import generate_slides
+from app.services.pipeline_orchestrator import EXPORT_STEP, PipelineOrchestrator
+from app.services.finalize_service import finalize_pipeline_output
 from pathlib import Path
 import shutil
 import zipfile
@@ -26,9 +23,23 @@ orchestrator = PipelineOrchestrator()
 
 from app.schemas.pipeline_config import PipelineConfig
 from app.core.pipeline_config import PIPELINE_CONFIG
+from app.services.school_catalog import (
+    get_school_catalog,
+    invalidate_school_catalog,
+    validate_config_schools,
+    estimate_config_rows,
+)
 
 @router.post("/config")
-def update_pipeline_config(config: PipelineConfig):
+def update_pipeline_config(config: PipelineConfig, db: Session = Depends(get_db)):
+    # Validate against the school catalog of the current upload (if any)
+    if not config.useAll:
+        catalog = get_school_catalog(orchestrator.base_dir / "data")
+        if catalog:
+            errors = validate_config_schools(config, catalog)
+            if errors:
+                raise HTTPException(400, {"message": "Invalid pipeline config", "errors": errors})
+
     # Update new fields
     PIPELINE_CONFIG["useAll"] = config.useAll
     # Store schools as list of dicts
@@ -39,6 +50,10 @@ def update_pipeline_config(config: PipelineConfig):
         PIPELINE_CONFIG["exam_grades"] = config.exam_grades
     if config.participating_schools is not None:
         PIPELINE_CONFIG["participating_schools"] = config.participating_schools
+
+    # Opt-in: pre-compute the whole pipeline for this config (cancels stale runs)
+    if orchestrator.get_pipeline_state_value("dataset_uploaded", db) == "true":
+        orchestrator.start_speculation()
         
     return {"status": "ok", "config": PIPELINE_CONFIG}
 
@@ -47,54 +62,45 @@ def update_pipeline_config(config: PipelineConfig):
 def get_pipeline_config():
     return PIPELINE_CONFIG
 
+
+@router.post("/config/estimate")
+def estimate_pipeline_config(config: PipelineConfig):
+    """
+    Row-count estimate for a config (per grade file), served from the school catalog.
+    """
+    catalog = get_school_catalog(orchestrator.base_dir / "data")
+    if not catalog:
+        raise HTTPException(400, "Dataset not uploaded. Please upload data first.")
+
+    return {
+        "errors": [] if config.useAll else validate_config_schools(config, catalog),
+        **estimate_config_rows(config, catalog),
+    }
+
+
 @router.get("/available-schools")
 def get_available_schools():
     """
-    Parses the uploaded REG VS PART.xlsx to find available schools.
+    Lists schools of the uploaded REG VS PART.xlsx from the in-memory school catalog
+    (built once per upload).
     """
-    reg_file, _, _ = scan_pipeline_data(orchestrator.base_dir / "data")
-    
-    if not reg_file:
-         return {"schools": []}
-         
-    try:
-        data_path = orchestrator.base_dir / "data" / reg_file
-        # Using the parse_excel logic or just reading the sheet directly for speed
-        # Assuming sheet structure as per step0_summarizing.py
-        import pandas as pd
-        
-        # Copied logic from step0_summarizing.py for robust reading
-        # Sheet is "Assessment Participation". Row 2 is header? Step 0 says:
-        # raw = pd.read_excel(FILE, sheet_name=SHEET, header=None)
-        # cols[1] = "School Name"
-        
-        # We'll just try to read "Assessment Participation"
-        # If strict performance is needed we could cache this
-        df = pd.read_excel(data_path, sheet_name="Assessment Participation", header=1) # 1-indexed? Step 0 says 2 header rows?
-        # Step0: raw.iloc[2:].copy()... header_row = raw.iloc[1]
-        
-        # Let's trust step0's robust approach less and just grabbing column 1 ("School Name")
-        # Step0: cols[1] = "School Name"
-        
-        raw = pd.read_excel(data_path, sheet_name="Assessment Participation", header=None)
-        # Real data starts at index 2
-        df_real = raw.iloc[2:].copy()
-        
-        # School Name is at index 1
-        schools = sorted(
-            df_real[1] # Column index 1
-            .dropna()
-            .astype(str)
-            .str.strip()
-            .loc[lambda x: x.str.lower() != "total"]
-            .unique()
-            .tolist()
-        )
-        
-        return {"schools": schools}
-    except Exception as e:
-        print(f"Error reading available schools: {e}")
-        return {"schools": []}
+    catalog = get_school_catalog(orchestrator.base_dir / "data")
+
+    if not catalog:
+         return {"schools": [], "details": []}
+
+    return {
+        "schools": [s["name"] for s in catalog["schools"]],
+        "details": [
+            {
+                "name": s["name"],
+                "district": s["district"],
+                "grades": s["grades"],
+                "rows": s["rows"],
+            }
+            for s in catalog["schools"]
+        ],
+    }
 
 # We need `re` for regex validation.
 import re
@@ -222,7 +228,11 @@ async def debug_pipeline_files(db: Session = Depends(get_db)):
     }
 
 @router.post("/upload")
-async def upload_pipeline_data(file: UploadFile = File(...), db: Session = Depends(get_db)):
+async def upload_pipeline_data(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+):
     """
     Uploads a ZIP file, clears old data, extracts new data.
     Strictly returns success/failure.
@@ -236,16 +246,24 @@ async def upload_pipeline_data(file: UploadFile = File(...), db: Session = Depen
     print(f"[Upload] Received file: {file.filename}")
     
     # 0. Check for running jobs
-    running_jobs = db.query(PipelineJob).filter(PipelineJob.status == JobStatus.RUNNING).count()
+    running_jobs = db.query(PipelineJob).filter(
+        PipelineJob.status == JobStatus.RUNNING,
+        PipelineJob.step_name != EXPORT_STEP,
+    ).count()
     if running_jobs > 0:
         raise HTTPException(
             status_code=400, # Changed to 400 as per prompt request (previously 409)
             detail="Cannot upload while pipeline is running."
         )
     
+    # Stop speculative work before its inputs disappear
+    # (joins the worker thread: wait in the threadpool, not on the event loop)
+    await run_in_threadpool(orchestrator.cancel_speculation, wait=True)
+
     # Reset Session State - dataset is invalid until fully replaced
     orchestrator.reset_pipeline_state(db)
     orchestrator.update_pipeline_state("dataset_uploaded", "false", db)
+    invalidate_school_catalog()
     
     data_dir = orchestrator.base_dir / "data"
     
@@ -328,6 +346,11 @@ async def upload_pipeline_data(file: UploadFile = File(...), db: Session = Depen
         
         # 5. Success State Update
         orchestrator.update_pipeline_state("dataset_uploaded", "true", db)
+
+        # Build the school catalog (and warm the raw sheet cache) off the request path
+        background_tasks.add_task(get_school_catalog, data_dir)
+        if PIPELINE_CONFIG.get("useAll", True):
+            background_tasks.add_task(orchestrator.start_speculation)
         print(f"[Upload] Success. Detected files: {all_files}")
         return {"success": True, "files": all_files}
 
@@ -391,7 +414,8 @@ async def run_participation_step0(
         from app.models.pipeline_job import PipelineJob, JobStatus
 
         running_jobs = db.query(PipelineJob).filter(
-            PipelineJob.status == JobStatus.RUNNING
+            PipelineJob.status == JobStatus.RUNNING,
+            PipelineJob.step_name != EXPORT_STEP,
         ).count()
 
         if running_jobs > 0:
@@ -471,7 +495,7 @@ async def get_step_preview(step_name: str):
     base_dir = orchestrator.base_dir
     
     if step_name == "participation-0":
-        file_candidates.append(base_dir / "data" / "REG VS PART.xlsx")
+        file_candidates.append(base_dir / "outputs" / "participation_step0.xlsx")
     elif step_name.startswith("performance-"):
         try:
             step_num = int(step_name.split("-")[1])
@@ -611,69 +635,30 @@ async def get_pipeline_state(db: Session = Depends(get_db)):
         }
 
 @router.post("/finalize")
-async def finalize_pipeline(db: Session = Depends(get_db)):
-    """Forward uploadable data.xlsx to PPT generation flow"""
+def finalize_pipeline(
+    background_tasks: BackgroundTasks,
+    background: bool = False,
+    db: Session = Depends(get_db),
+):
+    """Forward the step 5 uploadable sheets to PPT generation flow"""
     print("==== FINALIZATION REQUEST RECEIVED ====")
+
+    # Background mode: return a job id immediately, poll /pipeline/status/{job_id}
+    if background:
+        job_id = orchestrator.create_job("finalize", db)
+        background_tasks.add_task(orchestrator.run_finalize, job_id)
+        return {"job_id": job_id, "status": "started"}
+
     try:
-        uploadable_file = orchestrator.base_dir / "data" / "uploadable data.xlsx"
-        print(f"[Finalize] Looking for file: {uploadable_file}")
-        
-        if not uploadable_file.exists():
-            print("[Finalize] Error: File not found")
-            raise HTTPException(404, "Uploadable data file not found")
-        
-        # Parse Excel (reuse existing logic)
-        print("[Finalize] Parsing Excel...")
-        with open(uploadable_file, "rb") as f:
-            upload_file = UploadFile(filename="uploadable data.xlsx", file=f)
-            datasets = await parse_excel(upload_file)
-        
-        # Create project
-        print("[Finalize] Creating Project in DB...")
-        project = Project(name="Analysis Pipeline Output")
-        db.add(project)
-        db.commit()
-        db.refresh(project)
-        
-        # Save datasets
-        print(f"[Finalize] Saving {len(datasets)} datasets...")
-        dataset_outputs = []
-        for d in datasets:
-            ds = Dataset(
-                project_id=project.id,
-                name=d["name"],
-                schema=d["schema"],
-                columns=d["columns"],
-                row_count=d["rows"],
-                preview=d["preview"],
-            )
-            db.add(ds)
-            db.flush()
-            dataset_outputs.append({
-                "id": str(ds.id),
-                "name": ds.name,
-                "columns": ds.columns,
-                "schema": ds.schema,
-                "preview": ds.preview,
-            })
-        
-        db.commit()
-        
-        # Generate slides
-        print("[Finalize] Generating Slides...")
-        slides = generate_slides(project.id, dataset_outputs)
-        for s in slides:
-            db.add(Slide(project_id=project.id, slide_json=s, position=s["position"]))
-        
-        db.commit()
-        
-        response_payload = {"project_id": str(project.id), "slides_created": len(slides)}
+        response_payload = finalize_pipeline_output(orchestrator.base_dir, db)
         print(f"FINALIZE RETURNING: {response_payload}")
         return response_payload
-        
-    except HTTPException as he:
-        raise he
+
+    except FileNotFoundError as e:
+        print(f"[Finalize] Error: {e}")
+        raise HTTPException(404, str(e))
     except Exception as e:
+        import traceback
         print(f"[Finalize] INTERNAL ERROR: {e}")
         traceback.print_exc()
         raise HTTPException(500, f"Finalization failed: {str(e)}")
@@ -12,11 +12,16 @@ from app.schemas.api import (
     SaveProjectRequest,
     RegenerateProjectRequest,
     MarkManualSlideRequest,
+    PatchSlidesRequest,
 )
 
-from app.services.slide_generator import generate_slides
-from app.services.dataset_profiler import profile_dataset
-from app.services.dataset_service import detect_dataset_type_from_name
+from app.services.dataset_service import ensure_dataset_profiles
+from app.services.json_patch import JsonPatchError
+from app.services.project_service import (
+    SlideRevisionConflict,
+    apply_slide_changes,
+    regenerate_project_slides,
+)
 
 
 router = APIRouter(prefix="/projects", tags=["projects"])
@@ -55,6 +60,9 @@ def save_project(payload: SaveProjectRequest, db: Session = Depends(get_db)):
         if not sid:
             continue
 
+        # Revision is a column (load_project adds it), never slide content
+        slide_json.pop("revision", None)
+
         incoming_ids.add(sid)
 
         position = slide_json.get("position", 0)
@@ -72,6 +80,7 @@ def save_project(payload: SaveProjectRequest, db: Session = Depends(get_db)):
             db_slide = existing_map[sid]
             db_slide.slide_json = slide_json
             db_slide.position = position
+            db_slide.revision = (db_slide.revision or 0) + 1
             flag_modified(db_slide, "slide_json")
 
         else:
@@ -93,6 +102,36 @@ def save_project(payload: SaveProjectRequest, db: Session = Depends(get_db)):
     return {"status": "saved", "slides": len(payload.slides)}
 
 
+# =====================================================
+# PATCH PROJECT SLIDES (diff-based save)
+# =====================================================
+@router.patch("/{project_id}/slides")
+def patch_project_slides(
+    project_id: str,
+    payload: PatchSlidesRequest,
+    db: Session = Depends(get_db),
+):
+
+    pid = uuid.UUID(project_id)
+
+    project = db.query(Project).filter(Project.id == pid).first()
+
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    try:
+        result = apply_slide_changes(db, pid, payload.changes, payload.deletes)
+    except SlideRevisionConflict as e:
+        raise HTTPException(
+            status_code=409,
+            detail={"message": str(e), "conflicts": e.conflicts},
+        )
+    except JsonPatchError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid patch: {e}")
+
+    return {"status": "saved", **result}
+
+
 # =====================================================
 # LOAD PROJECT
 # =====================================================
@@ -120,6 +159,9 @@ def load_project(project_id: str, db: Session = Depends(get_db)):
         .all()
     )
 
+    # Stored profiles (recomputed only for stale/legacy datasets)
+    profiles = ensure_dataset_profiles(db, datasets)
+
     return {
         "project": {
             "id": str(project.id),
@@ -129,26 +171,23 @@ def load_project(project_id: str, db: Session = Depends(get_db)):
             {
                 "id": str(d.id),
                 "name": d.name,
-                "detected_type": detect_dataset_type_from_name(d.name),
-                "profile": profile_dataset({
-                    "name": d.name,
-                    "schema": d.schema,
-                    "preview": d.preview
-                }),
+                "detected_type": profiles[str(d.id)]["detected_type"],
+                "profile": profiles[str(d.id)],
                 "row_count": d.row_count,
                 "col_count": len(d.columns),
                 "columns": d.columns,
                 "schema": d.schema,
                 "preview": d.preview,
+                "chart_series": d.chart_series,
             }
             for d in datasets
         ],
-        "slides": [s.slide_json for s in slides],
+        "slides": [{**s.slide_json, "revision": s.revision} for s in slides],
     }
 
 
 # =====================================================
-# REGENERATE AUTO SLIDES (FIXED)
+# REGENERATE AUTO SLIDES (changed datasets only)
 # =====================================================
 @router.post("/regenerate")
 def regenerate_project(
@@ -165,117 +204,9 @@ def regenerate_project(
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    # ----------------------------------
-    # Load existing slides BEFORE delete
-    # ----------------------------------
-    existing = db.query(Slide).filter(
-        Slide.project_id == payload.project_id
-    ).all()
-
-    manual = [s for s in existing if s.slide_json.get("generated") is False]
-    autos = [s for s in existing if s.slide_json.get("generated") is True]
+    result = regenerate_project_slides(db, uuid.UUID(payload.project_id))
 
-    used_positions = {s.position for s in manual}
-
-    dataset_pos = {}
-    group_pos = {}
-    overview_pos = None
-
-    for s in autos:
-        role = s.slide_json.get("role")
-        if role == "overview":
-            overview_pos = s.position
-        if role == "dataset":
-            dataset_pos[s.slide_json.get("dataset_id")] = s.position
-        if role == "group":
-            group_pos[s.slide_json.get("group")] = s.position
-
-    manual_overview_exists = any(
-        s.slide_json.get("role") == "overview" for s in manual
-    )
-
-    # ----------------------------------
-    # Delete old autos
-    # ----------------------------------
-    db.query(Slide).filter(
-        Slide.project_id == payload.project_id,
-        Slide.slide_json["generated"].as_boolean().is_(True),
-    ).delete(synchronize_session=False)
-
-    # ----------------------------------
-    # Reload datasets
-    # ----------------------------------
-    datasets = db.query(Dataset).filter(
-        Dataset.project_id == payload.project_id
-    ).all()
-
-    dataset_payloads = [
-        {
-            "id": str(d.id),
-            "name": d.name,
-            "schema": d.schema,
-            "columns": d.columns,
-            "preview": d.preview,
-        }
-        for d in datasets
-    ]
-
-    new_slides = generate_slides(payload.project_id, dataset_payloads)
-
-    # ----------------------------------
-    # Position allocator
-    # ----------------------------------
-    pos = 0
-
-    def next_free():
-        nonlocal pos
-        while pos in used_positions:
-            pos += 1
-        used_positions.add(pos)
-        return pos
-
-    # ----------------------------------
-    # Insert regenerated autos
-    # ----------------------------------
-    for s in new_slides:
-
-        role = s.get("role")
-
-        # skip overview regen if manual
-        if role == "overview" and manual_overview_exists:
-            continue
-
-        preferred = None
-
-        if role == "overview":
-            preferred = overview_pos
-        elif role == "dataset":
-            preferred = dataset_pos.get(s.get("dataset_id"))
-        elif role == "group":
-            preferred = group_pos.get(s.get("group"))
-
-        if preferred is not None and preferred not in used_positions:
-            safe_pos = preferred
-            used_positions.add(preferred)
-        else:
-            safe_pos = next_free()
-
-        s["position"] = safe_pos
-
-        db.add(
-            Slide(
-                project_id=payload.project_id,
-                slide_json=s,
-                position=safe_pos,
-            )
-        )
-
-    db.commit()
-
-    return {
-        "status": "regenerated",
-        "slides_created": len(new_slides),
-    }
+    return {"status": "regenerated", **result}
 
 
 # =====================================================
@@ -305,10 +236,15 @@ def mark_slide_manual(
     target.slide_json["generated"] = False
     flag_modified(target, "slide_json")
 
+    # A content change like any other: clients holding the old revision must conflict
+    target.revision = Slide.revision + 1
+
     db.commit()
+    db.refresh(target)
 
     return {
         "status": "ok",
         "slide_id": payload.slide_id,
         "generated": False,
+        "revision": target.revision,
     }
@@ -1,27 +1,34 @@
 import os
-from pathlib import Path
 from fastapi import APIRouter, UploadFile, File, HTTPException
 
+from app.services.ppt.template_loader import UPLOADED_TEMPLATE_PATH, save_uploaded_template
+
 router = APIRouter(prefix="/templates", tags=["template"])
 
-TEMPLATE_DIR = Path("templates")
-TEMPLATE_PATH = TEMPLATE_DIR / "current_template.pptx"
+TEMPLATE_PATH = UPLOADED_TEMPLATE_PATH
 
 @router.post("/upload")
 async def upload_template(file: UploadFile = File(...)):
     if not file.filename.endswith(".pptx"):
         raise HTTPException(status_code=400, detail="Only .pptx files are allowed")
     
-    TEMPLATE_DIR.mkdir(exist_ok=True)
-    
+    content = await file.read()
+
+    # Parsed and validated once here; exports reuse the cached result
     try:
-        content = await file.read()
-        with open(TEMPLATE_PATH, "wb") as f:
-            f.write(content)
-        return {"status": "ok"}
+        info = save_uploaded_template(content)
+    except RuntimeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to save template: {str(e)}")
 
+    return {
+        "status": "ok",
+        "hash": info["hash"],
+        "slide_width": info["slide_width"],
+        "slide_height": info["slide_height"],
+    }
+
 @router.get("/check")
 def check_template():
     # Priority 1: Env Var
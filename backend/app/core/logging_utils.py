@@ -9,6 +9,10 @@ job_context_var = contextvars.ContextVar("job_ids", default=None)
 # key: job_id, value: list of log strings
 active_job_logs = {}
 
+# Progress of running jobs that report one (in-memory)
+# key: job_id, value: {"done": int, "total": int}
+active_job_progress = {}
+
 class JobLogger:
     """
     A logger that writes to the active job's log storage if a job context is active.
@@ -39,6 +43,13 @@ class JobLogger:
     def error(message: str):
         JobLogger.log(f"ERROR: {message}")
 
+    @staticmethod
+    def progress(done: int, total: int):
+        """Records progress for the active job; no-op outside a job context."""
+        job_id = job_context_var.get()
+        if job_id:
+            active_job_progress[job_id] = {"done": done, "total": total}
+
 # Helper to easily print without importing the class everywhere if prefered
 # But usually importing the class is cleaner.
 logger = JobLogger()
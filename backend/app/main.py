@@ -9,6 +9,7 @@ from app.api import (
     routes_project,
     routes_template,
     routes_pipeline,
+    routes_dataset,
 )
 
 from app.core.db import Base, engine
@@ -66,6 +67,7 @@ app.include_router(routes_export.router)
 app.include_router(routes_project.router)
 app.include_router(routes_template.router)
 app.include_router(routes_pipeline.router)
+app.include_router(routes_dataset.router)
 
 
 # -----------------------------
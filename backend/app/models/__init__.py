@@ -2,6 +2,7 @@ from app.models.project import Project
 from app.models.dataset import Dataset
 from .project import Project
 from .dataset import Dataset
+from .dataset_rows import DatasetRowChunk
 from .slide import Slide
 from .pipeline_job import PipelineJob
 from .pipeline_state import PipelineState
@@ -23,4 +23,14 @@ class Dataset(Base):
 
     preview = Column(JSON, nullable=False)
 
+    # Computed once at creation (see dataset_service.attach_dataset_profile)
+    profile = Column(JSON, nullable=True)
+
+    profile_version = Column(Integer, nullable=True)
+
+    content_hash = Column(String(40), nullable=True)
+
+    # Render-ready chart series (see chart_series.compile_chart_series)
+    chart_series = Column(JSON, nullable=True)
+
     project = relationship("Project", back_populates="datasets")
@@ -0,0 +1,30 @@
+import uuid
+from sqlalchemy import Column, Integer, LargeBinary, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.core.db import Base
+
+
+class DatasetRowChunk(Base):
+    """
+    Full dataset rows, stored apart from Dataset.preview (which is a sample).
+    Each chunk is zlib-compressed columnar JSON for a contiguous row range.
+    """
+    __tablename__ = "dataset_row_chunks"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    dataset_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("datasets.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+
+    chunk_index = Column(Integer, nullable=False)
+
+    row_start = Column(Integer, nullable=False)
+
+    row_count = Column(Integer, nullable=False)
+
+    data = Column(LargeBinary, nullable=False)
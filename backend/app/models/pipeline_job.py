@@ -21,6 +21,7 @@ class PipelineJob(Base):
     output_files = Column(Text, nullable=True)
     error_message = Column(Text, nullable=True)
     logs = Column(Text, nullable=True)  # Storing as JSON string or text blob for simplicity
+    result = Column(Text, nullable=True)  # JSON payload of jobs that produce one (e.g. finalize)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     started_at = Column(DateTime, nullable=True)
     completed_at = Column(DateTime, nullable=True)
@@ -33,6 +34,7 @@ class PipelineJob(Base):
             "output_files": json.loads(self.output_files) if self.output_files else [],
             "error_message": self.error_message,
             "logs": json.loads(self.logs) if self.logs else [],
+            "result": json.loads(self.result) if self.result else None,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "started_at": self.started_at.isoformat() if self.started_at else None,
             "completed_at": self.completed_at.isoformat() if self.completed_at else None,
@@ -21,5 +21,8 @@ class Slide(Base):
 
     position = Column(Integer, nullable=False)
 
+    # Bumped on every write; clients send it back for optimistic concurrency
+    revision = Column(Integer, nullable=False, default=0, server_default="0")
+
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -42,3 +42,27 @@ class RegenerateProjectRequest(BaseModel):
 class MarkManualSlideRequest(BaseModel):
     project_id: str
     slide_id: str
+
+
+# -----------------------------
+# SLIDE PATCH (diff-based save)
+# -----------------------------
+
+class SlideChange(BaseModel):
+    slideId: str
+    # Revision the client last saw; None only for brand-new slides
+    revision: int | None = None
+    # Either a full slide JSON (upsert) or JSON-patch ops against the stored one
+    slide: Dict[str, Any] | None = None
+    patch: List[Dict[str, Any]] | None = None
+    position: int | None = None
+
+
+class SlideDelete(BaseModel):
+    slideId: str
+    revision: int | None = None
+
+
+class PatchSlidesRequest(BaseModel):
+    changes: List[SlideChange] = []
+    deletes: List[SlideDelete] = []
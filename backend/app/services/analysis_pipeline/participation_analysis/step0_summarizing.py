@@ -3,6 +3,9 @@ import numpy as np
 from pathlib import Path
 from app.core.logging_utils import JobLogger
 from app.core.pipeline_config import PIPELINE_CONFIG
+from app.services.pipeline_state import get_pipeline_state
+from app.services.analysis_pipeline.utils.config_filter import compile_config_filter
+from app.utils.excel_export import export_snapshot
 
 # -----------------------------
 # CONFIG
@@ -14,181 +17,176 @@ DATA_DIR = Path("data")
 FILE = DATA_DIR / "REG VS PART.xlsx"
 SHEET = "Assessment Participation"
 
-# -----------------------------
-# LOAD RAW (TWO HEADER ROWS)
-# -----------------------------
 
-raw = pd.read_excel(FILE, sheet_name=SHEET, header=None)
+def run_step0():
+    """
+    Summarizes registration vs participation per school and per grade.
 
-df = raw.iloc[2:].copy()
-header_row = raw.iloc[1]
+    Results are kept in the pipeline state under "participation" (and
+    snapshotted to outputs/participation_step0.xlsx). The uploaded
+    REG VS PART.xlsx is only ever read, never rewritten.
+    """
+    JobLogger.log("Starting Participation Step 0 (In-Memory)...")
 
-cols = list(header_row)
+    state = get_pipeline_state()
+    state["participation"] = {}
 
-cols[0] = "S.No"
-cols[1] = "School Name"
-cols[2] = "District"
+    # -----------------------------
+    # LOAD RAW (TWO HEADER ROWS)
+    # -----------------------------
 
-cols[15] = "Total Registered"
-cols[28] = "Total Participated"
+    raw = pd.read_excel(FILE, sheet_name=SHEET, header=None)
 
-cols[-2] = "Contact Name"
-cols[-1] = "Contact Phone"
+    df = raw.iloc[2:].copy()
+    header_row = raw.iloc[1]
 
-df.columns = cols
+    cols = list(header_row)
 
-# Clean school names
-df["School Name"] = df["School Name"].astype(str).str.strip()
+    cols[0] = "S.No"
+    cols[1] = "School Name"
+    cols[2] = "District"
 
-JobLogger.log("\n===== DEBUG: ORIGINAL SCHOOL NAMES =====")
-JobLogger.log(str(df["School Name"].unique()))
+    cols[15] = "Total Registered"
+    cols[28] = "Total Participated"
 
-# Drop total row
-df = df[df["School Name"].str.lower() != "total"]
+    cols[-2] = "Contact Name"
+    cols[-1] = "Contact Phone"
 
-JobLogger.log("\n===== DEBUG: DF SHAPE AFTER DROP TOTAL =====")
-JobLogger.log(str(df.shape))
+    df.columns = cols
 
-# -----------------------------
-# IDENTIFY GRADE COLUMN INDEXES
-# -----------------------------
+    # Clean school names
+    df["School Name"] = df["School Name"].astype(str).str.strip()
 
-reg_idx = list(range(3, 15))
-part_idx = list(range(16, 28))
+    JobLogger.log("\n===== DEBUG: ORIGINAL SCHOOL NAMES =====")
+    JobLogger.log(str(df["School Name"].unique()))
 
-reg_grade_map = {i: int(float(df.columns[i])) for i in reg_idx}
-part_grade_map = {i: int(float(df.columns[i])) for i in part_idx}
+    # Drop total row
+    df = df[df["School Name"].str.lower() != "total"]
 
-JobLogger.log(f"\n===== DEBUG: REG IDX ===== {reg_idx}")
-JobLogger.log(f"===== DEBUG: PART IDX ===== {part_idx}")
+    JobLogger.log("\n===== DEBUG: DF SHAPE AFTER DROP TOTAL =====")
+    JobLogger.log(str(df.shape))
 
-# -----------------------------
-# FILTER SCHOOLS (FIXED)
-# -----------------------------
+    # -----------------------------
+    # IDENTIFY GRADE COLUMN INDEXES
+    # -----------------------------
 
-# Extract config dynamically on each run
-use_all = PIPELINE_CONFIG.get("useAll", True)
-schools_config = PIPELINE_CONFIG.get("schools", [])
+    reg_idx = list(range(3, 15))
+    part_idx = list(range(16, 28))
 
-df_filt = df.copy()
+    reg_grade_map = {i: int(float(df.columns[i])) for i in reg_idx}
+    part_grade_map = {i: int(float(df.columns[i])) for i in part_idx}
 
-if not use_all:
+    JobLogger.log(f"\n===== DEBUG: REG IDX ===== {reg_idx}")
+    JobLogger.log(f"===== DEBUG: PART IDX ===== {part_idx}")
 
-    allowed_schools = [
-        sc.get("schoolName", "").strip().lower()
-        for sc in schools_config
-    ]
-
-    JobLogger.log(f"\n===== DEBUG: ALLOWED SCHOOLS =====")
-    JobLogger.log(str(allowed_schools))
+    # -----------------------------
+    # FILTER SCHOOLS (FIXED)
+    # -----------------------------
 
-    df_filt = df_filt[
-        df_filt["School Name"]
-        .str.lower()
-        .isin(allowed_schools)
-    ]
+    # Extract config dynamically on each run
+    use_all = PIPELINE_CONFIG.get("useAll", True)
 
-    JobLogger.log(f"Rows after school filter: {len(df_filt)}")
+    df_filt = df.copy()
 
-else:
+    if not use_all:
 
-    JobLogger.log("Using ALL schools")
+        # Compiled lookup: normalized school name -> allowed grade interval(s)
+        plan = compile_config_filter(PIPELINE_CONFIG)
 
-JobLogger.log("\n===== DEBUG: FILTERED SCHOOL NAMES =====")
-JobLogger.log(str(df_filt["School Name"].unique()))
-
-# -----------------------------
-# APPLY GRADE RANGE MASKING
-# -----------------------------
+        JobLogger.log(f"\n===== DEBUG: ALLOWED SCHOOLS =====")
+        JobLogger.log(str(plan.schools))
 
-if not use_all:
+        df_filt = df_filt[plan.mask(df_filt["School Name"])]
 
-    JobLogger.log("Applying grade range masking")
+        JobLogger.log(f"Rows after school filter: {len(df_filt)}")
 
-    for sc in schools_config:
+    else:
 
-        school = sc.get("schoolName", "").strip().lower()
-        f_grade = sc.get("fromGrade", 0)
-        t_grade = sc.get("toGrade", 100)
+        JobLogger.log("Using ALL schools")
 
-        mask = df_filt["School Name"].str.lower() == school
+    JobLogger.log("\n===== DEBUG: FILTERED SCHOOL NAMES =====")
+    JobLogger.log(str(df_filt["School Name"].unique()))
 
-        if not mask.any():
-            continue
+    # -----------------------------
+    # APPLY GRADE RANGE MASKING
+    # -----------------------------
 
-        # Registered columns
-        for col_idx, grade in reg_grade_map.items():
+    if not use_all:
 
-            if not (f_grade <= grade <= t_grade):
+        JobLogger.log("Applying grade range masking")
 
-                col_name = df.columns[col_idx]
-                df_filt.loc[mask, col_name] = 0
+        # One range check per grade (registered + participated columns together).
+        # Positional access: registered/participated headers share the same grade labels.
+        grade_cols = {}
+        for col_idx, grade in list(reg_grade_map.items()) + list(part_grade_map.items()):
+            grade_cols.setdefault(grade, []).append(col_idx)
 
-        # Participated columns
-        for col_idx, grade in part_grade_map.items():
+        for grade, col_idxs in grade_cols.items():
 
-            if not (f_grade <= grade <= t_grade):
+            outside = ~plan.mask(df_filt["School Name"], grade)
 
-                col_name = df.columns[col_idx]
-                df_filt.loc[mask, col_name] = 0
+            if outside.any():
+                df_filt.iloc[outside, col_idxs] = 0
 
-# -----------------------------
-# SCHOOL TOTALS
-# -----------------------------
+    # -----------------------------
+    # SCHOOL TOTALS
+    # -----------------------------
 
-school_totals = df_filt[["School Name"]].copy()
+    school_totals = df_filt[["School Name"]].copy()
 
-school_totals["Registered"] = df_filt.iloc[:, reg_idx].sum(axis=1)
-school_totals["Participated"] = df_filt.iloc[:, part_idx].sum(axis=1)
+    school_totals["Registered"] = df_filt.iloc[:, reg_idx].sum(axis=1)
+    school_totals["Participated"] = df_filt.iloc[:, part_idx].sum(axis=1)
 
-school_totals["Not Participated"] = (
-    school_totals["Registered"] - school_totals["Participated"]
-)
+    school_totals["Not Participated"] = (
+        school_totals["Registered"] - school_totals["Participated"]
+    )
 
-school_totals = school_totals[
-    ["School Name", "Participated", "Not Participated", "Registered"]
-]
+    school_totals = school_totals[
+        ["School Name", "Participated", "Not Participated", "Registered"]
+    ]
 
-JobLogger.log("\n===== DEBUG: SCHOOL TOTALS =====")
-JobLogger.log(str(school_totals))
+    JobLogger.log("\n===== DEBUG: SCHOOL TOTALS =====")
+    JobLogger.log(str(school_totals))
 
-# -----------------------------
-# OVERALL GRADE TOTALS
-# -----------------------------
+    # -----------------------------
+    # OVERALL GRADE TOTALS
+    # -----------------------------
 
-overall = pd.DataFrame({
-    "Grade": [reg_grade_map[i] for i in reg_idx],
-    "Registered": df_filt.iloc[:, reg_idx].sum().values,
-    "Participated": df_filt.iloc[:, part_idx].sum().values,
-})
+    overall = pd.DataFrame({
+        "Grade": [reg_grade_map[i] for i in reg_idx],
+        "Registered": df_filt.iloc[:, reg_idx].sum().values,
+        "Participated": df_filt.iloc[:, part_idx].sum().values,
+    })
 
-overall["Registered"] = pd.to_numeric(overall["Registered"], errors="coerce").fillna(0)
-overall["Participated"] = pd.to_numeric(overall["Participated"], errors="coerce").fillna(0)
+    overall["Registered"] = pd.to_numeric(overall["Registered"], errors="coerce").fillna(0)
+    overall["Participated"] = pd.to_numeric(overall["Participated"], errors="coerce").fillna(0)
 
-overall["Participation %"] = (
-    (overall["Participated"] / overall["Registered"]) * 100
-).replace([np.inf, -np.inf], 0).fillna(0)
+    overall["Participation %"] = (
+        (overall["Participated"] / overall["Registered"]) * 100
+    ).replace([np.inf, -np.inf], 0).fillna(0)
 
-overall["Participation %"] = overall["Participation %"].round(0).astype(int)
+    overall["Participation %"] = overall["Participation %"].round(0).astype(int)
 
-# Remove grades with no registered students
-JobLogger.log(f"Grades before filtering: {overall['Grade'].tolist()}")
+    # Remove grades with no registered students
+    JobLogger.log(f"Grades before filtering: {overall['Grade'].tolist()}")
 
-overall = overall[overall["Registered"] > 0]
+    overall = overall[overall["Registered"] > 0]
 
-JobLogger.log(f"Grades after filtering: {overall['Grade'].tolist()}")
+    JobLogger.log(f"Grades after filtering: {overall['Grade'].tolist()}")
 
-JobLogger.log("\n===== DEBUG: OVERALL =====")
-JobLogger.log(str(overall))
+    JobLogger.log("\n===== DEBUG: OVERALL =====")
+    JobLogger.log(str(overall))
 
-# -----------------------------
-# WRITE BACK
-# -----------------------------
+    # -----------------------------
+    # STORE IN STATE
+    # -----------------------------
 
-with pd.ExcelWriter(FILE, engine="openpyxl", mode="a", if_sheet_exists="replace") as writer:
+    state["participation"] = {
+        "schl_wise": school_totals,
+        "grade_wise": overall,
+    }
 
-    school_totals.to_excel(writer, sheet_name="schl_wise", index=False)
-    overall.to_excel(writer, sheet_name="grade_wise", index=False)
+    export_snapshot("participation_step0", state["participation"])
 
     from app.core.preview_registry import register_preview
 
@@ -207,4 +205,8 @@ with pd.ExcelWriter(FILE, engine="openpyxl", mode="a", if_sheet_exists="replace"
         ]
     })
 
-    JobLogger.log("\n✅ DONE. Participation step completed successfully.")
\ No newline at end of file
+    JobLogger.log("\n✅ DONE. Participation step completed successfully.")
+
+
+if __name__ == "__main__":
+    run_step0()
@@ -9,6 +9,12 @@ DATA_DIR = Path("data")
 
 import re
 from app.core.pipeline_config import PIPELINE_CONFIG
+from app.services.analysis_pipeline.utils.config_filter import (
+    apply_pipeline_config_filter,
+    compile_config_filter,
+    get_config_val,
+)
+from app.services.analysis_pipeline.utils.raw_ingest import load_raw_workbook
 
 # ...
 
@@ -18,17 +24,10 @@ def run_step0():
     state = get_pipeline_state()
     state["step0"] = {} # Initialize/Reset
     
-    def get_config_val(item, camel, snake, default=None):
-        if item is None: return default
-        val = getattr(item, camel, None)
-        if val is None: val = getattr(item, snake, None)
-        if val is None and isinstance(item, dict):
-            val = item.get(camel)
-            if val is None: val = item.get(snake)
-        return val if val is not None else default
-
     USE_ALL = get_config_val(PIPELINE_CONFIG, "useAll", "use_all", True)
-    SCHOOLS_CONFIG = get_config_val(PIPELINE_CONFIG, "schools", "schools", [])
+
+    # Compiled once per config (cached across sheets and files)
+    config_plan = compile_config_filter(PIPELINE_CONFIG)
     
     # All Excel files in that folder
     excel_files = [
@@ -54,29 +53,16 @@ def run_step0():
 
         # Load Raw Data
         try:
-            xls = pd.ExcelFile(input_file)
-            
-            # Store raw in state (optional, if needed by other steps or just for record)
-            if input_file.name not in state["raw"]:
-                state["raw"][input_file.name] = {}
-                
-            for sheet in xls.sheet_names:
-                # Skip processed sheets if they exist in source (legacy artifact check)
-                if sheet.endswith("_formatted") or sheet.endswith("_formatted_long"):
-                    continue
-                
-                df = pd.read_excel(xls, sheet_name=sheet)
-                
-                # Apply Strict Pipeline Filter
-                from app.services.analysis_pipeline.utils.config_filter import apply_pipeline_config_filter
-                df = apply_pipeline_config_filter(df, PIPELINE_CONFIG)
+            # Unfiltered sheets, parsed once per file hash (see raw_ingest)
+            raw_sheets = load_raw_workbook(input_file)
+
+            for sheet, raw_df in raw_sheets.items():
+                # Apply Strict Pipeline Filter (late predicate on the cached copy)
+                df = apply_pipeline_config_filter(raw_df, PIPELINE_CONFIG)
 
                 if df.empty:
                     JobLogger.log(f"  Skipping sheet {sheet} (Filtered out)")
                     continue
-                
-                # Store raw
-                state["raw"][input_file.name][sheet] = df
 
                 # ---------- STEP 1: CREATE _formatted ----------
                 
@@ -100,25 +86,12 @@ def run_step0():
                 # FILTERING LOGIC (NEW)
                 # -----------------------------
                 if not USE_ALL and current_grade is not None:
-                    # Identify which schools are allowed for THIS grade
-                    allowed_schools = set()
-                    for sc in SCHOOLS_CONFIG:
-                        # Pydantic dicts: {'schoolName': '...', 'fromGrade': x, 'toGrade': y}
-                        # Check grade range
-                        s_name = str(get_config_val(sc, "schoolName", "school_name", "")).strip().lower()
-                        f_grade = get_config_val(sc, "fromGrade", "from_grade", 0)
-                        t_grade = get_config_val(sc, "toGrade", "to_grade", 100)
-                        
-                        if f_grade <= current_grade <= t_grade:
-                            allowed_schools.add(s_name)
-                    
-                    # Apply filter
+                    # Keep schools whose configured grade range covers THIS grade
                     if "SchoolName" in formatted_df.columns:
-                         # Normalize data school names
                         formatted_df = formatted_df[
-                            formatted_df["SchoolName"].astype(str).str.strip().str.lower().isin(allowed_schools)
+                            config_plan.mask(formatted_df["SchoolName"], current_grade)
                         ]
-                        JobLogger.log(f"  Filtered for Grade {current_grade}: {len(allowed_schools)} allowed schools. Rows: {len(formatted_df)}")
+                        JobLogger.log(f"  Filtered for Grade {current_grade}. Rows: {len(formatted_df)}")
                     else:
                         JobLogger.log("  WARNING: 'SchoolName' column missing. Cannot filter.")
 
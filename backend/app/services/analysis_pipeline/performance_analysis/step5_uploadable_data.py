@@ -8,9 +8,9 @@ from app.core.logging_utils import JobLogger
 # ----------------------------
 # PATHS
 # ----------------------------
-DATA_DIR = Path("data")
-# We still write to "uploadable data.xlsx" in data/ for backward compatibility/Finalize step
-OUTPUT_FILE = DATA_DIR / "uploadable data.xlsx"
+# Finalize reads state["step5"] directly; the step5_uploadable.xlsx snapshot
+# is the only workbook written (for download)
+PARTICIPATION_SNAPSHOT = Path("outputs") / "participation_step0.xlsx"
 
 # ----------------------------
 # NORMALIZATION
@@ -38,29 +38,31 @@ def run_step5():
     sheets_to_write = {}
 
     # ======================================================
-    # 1) REG VS PART FIRST (From Disk or State if available)
+    # 1) REG VS PART FIRST (From Participation State)
     # ======================================================
-    # Assuming REG VS PART is still a file output from Participation Pipeline
-    reg_file = None
-    for file_path in DATA_DIR.glob("*.xlsx"):
-        if normalize_name(file_path.stem) == "reg_vs_part":
-            reg_file = file_path
-            break
-            
-    if reg_file:
-        prefix = normalize_name(reg_file.stem)
-        JobLogger.log(f"Scanning {reg_file.name}")
+    # Participation step 0 keeps its outputs in state["participation"];
+    # fall back to its snapshot if the state was lost (e.g. server restart)
+    participation = state.get("participation") or {}
+
+    if not participation and PARTICIPATION_SNAPSHOT.exists():
+        JobLogger.log(f"Participation state empty, reading {PARTICIPATION_SNAPSHOT}")
         try:
-            xls = pd.ExcelFile(reg_file)
-            for sheet in xls.sheet_names:
-                norm_sheet = normalize_name(sheet)
-                if norm_sheet in ["schl_wise", "grade_wise"]:
-                    df = pd.read_excel(reg_file, sheet_name=sheet)
-                    new_name = safe_sheet_name(f"{prefix}_{norm_sheet}")
-                    sheets_to_write[new_name] = df
-                    JobLogger.log(f"  → grabbed {sheet} → {new_name}")
+            with pd.ExcelFile(PARTICIPATION_SNAPSHOT) as xls:
+                participation = {
+                    normalize_name(sheet): pd.read_excel(xls, sheet_name=sheet)
+                    for sheet in xls.sheet_names
+                }
         except Exception as e:
-            JobLogger.log(f"Error reading REG VS PART: {e}")
+            JobLogger.log(f"Error reading participation snapshot: {e}")
+
+    prefix = "reg_vs_part"
+    for sheet in ["schl_wise", "grade_wise"]:
+        df = participation.get(sheet)
+        if df is None:
+            continue
+        new_name = safe_sheet_name(f"{prefix}_{sheet}")
+        sheets_to_write[new_name] = df
+        JobLogger.log(f"  → grabbed {sheet} → {new_name}")
             
     # ======================================================
     # 2) clustered/all_subjects (From Step 4 State)
@@ -124,7 +126,7 @@ def run_step5():
     # Store result in state
     state["step5"] = sheets_to_write
     
-    # Export Snapshot (This is the uploadable data)
+    # Export Snapshot (This is the uploadable data, for download)
     export_snapshot("step5_uploadable", state["step5"])
     
     # --------------------------------------------------
@@ -149,19 +151,8 @@ def run_step5():
         if len(preview_sheets) >= 10: break
 
     register_preview("performance-5", {"sheets": preview_sheets})
-    
-    # ----------------------------
-    # WRITE FINAL OUTPUT TO DATA DIR
-    # ----------------------------
-    # Using export logic or manual write to ensure exact location
-    JobLogger.log("\nWriting consolidated workbook to data/uploadable data.xlsx...")
-    try:
-        with pd.ExcelWriter(OUTPUT_FILE, engine="xlsxwriter") as writer:
-            for sheet_name, df in sheets_to_write.items():
-                df.to_excel(writer, sheet_name=sheet_name, index=False)
-        JobLogger.log("Finished. uploadable data.xlsx created.")
-    except Exception as e:
-        JobLogger.log(f"Error writing final file: {e}")
+
+    JobLogger.log("Finished Step 5 (In-Memory).")
 
 if __name__ == "__main__":
     run_step5()
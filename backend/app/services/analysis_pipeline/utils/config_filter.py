@@ -1,5 +1,159 @@
+import hashlib
+import json
+from collections import OrderedDict
+
+import numpy as np
 import pandas as pd
-import logging
+
+from app.core.logging_utils import JobLogger
+
+
+# --------------------------------------------------
+# CONFIG ACCESS
+# --------------------------------------------------
+
+def get_config_val(item, camel, snake, default=None):
+    """
+    Reads a config value from a dict or object, accepting camelCase or snake_case keys.
+    """
+    if item is None:
+        return default
+    val = getattr(item, camel, None)
+    if val is None: val = getattr(item, snake, None)
+    if val is None and isinstance(item, dict):
+        val = item.get(camel)
+        if val is None: val = item.get(snake)
+    return val if val is not None else default
+
+
+def normalize_school_name(name) -> str:
+    """Canonical key used to match school names (case-insensitive, whitespace-safe)."""
+    return str(name).strip().lower()
+
+
+# --------------------------------------------------
+# COMPILED FILTER
+# --------------------------------------------------
+
+class CompiledConfigFilter:
+    """
+    Lookup table compiled from a pipeline config:
+    normalized school name -> allowed grade interval(s).
+
+    Intervals are stored as (n_schools, k) arrays so a whole column of
+    school names can be checked with one factorize + one range check.
+    """
+
+    def __init__(self, use_all: bool, intervals: dict):
+        self.use_all = use_all
+        self.schools = list(intervals.keys())
+        self._index = {name: i for i, name in enumerate(self.schools)}
+
+        width = max((len(v) for v in intervals.values()), default=1)
+        self._lo = np.full((max(len(self.schools), 1), width), np.inf)
+        self._hi = np.full((max(len(self.schools), 1), width), -np.inf)
+
+        for i, name in enumerate(self.schools):
+            for j, (lo, hi) in enumerate(intervals[name]):
+                self._lo[i, j] = lo
+                self._hi[i, j] = hi
+
+    def lookup(self, values) -> np.ndarray:
+        """
+        Maps raw school names to plan indexes (-1 when not configured).
+        Only the distinct values are normalized.
+        """
+        codes, uniques = pd.factorize(pd.Series(values), use_na_sentinel=True)
+        if len(uniques) == 0:
+            return np.full(len(codes), -1, dtype=np.intp)
+
+        table = np.fromiter(
+            (self._index.get(normalize_school_name(u), -1) for u in uniques),
+            dtype=np.intp,
+            count=len(uniques),
+        )
+        return np.where(codes >= 0, table[codes], -1)
+
+    def mask(self, school_values, grades=None) -> np.ndarray:
+        """
+        Boolean row mask: school is configured and (if grades given) the grade
+        lies inside one of its intervals. `grades` may be a column or a scalar.
+        """
+        idx = self.lookup(school_values)
+        matched = idx >= 0
+
+        if grades is None:
+            return matched
+
+        g = pd.to_numeric(pd.Series(grades) if np.ndim(grades) else pd.Series([grades]), errors="coerce")
+        g = np.broadcast_to(g.to_numpy(dtype=float), idx.shape)[:, None]
+
+        safe = np.where(matched, idx, 0)
+        in_range = ((g >= self._lo[safe]) & (g <= self._hi[safe])).any(axis=1)
+
+        return matched & in_range
+
+
+_PLAN_CACHE: "OrderedDict[str, CompiledConfigFilter]" = OrderedDict()
+_PLAN_CACHE_SIZE = 16
+
+
+def config_hash(config) -> str:
+    """Stable hash of the filtering-relevant part of a pipeline config."""
+    use_all = bool(get_config_val(config, "useAll", "use_all", None))
+    schools = get_config_val(config, "schools", "schools", []) or []
+
+    key = {
+        "useAll": use_all,
+        "schools": [
+            [
+                str(get_config_val(s, "schoolName", "school_name", "")),
+                get_config_val(s, "fromGrade", "from_grade", 0),
+                get_config_val(s, "toGrade", "to_grade", 100),
+            ]
+            for s in schools
+        ],
+    }
+    return hashlib.sha1(json.dumps(key, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def compile_config_filter(config) -> CompiledConfigFilter:
+    """
+    Compiles (or returns the cached plan for) a pipeline config.
+    Plans are shared across sheets and files until the config changes.
+    """
+    key = config_hash(config)
+
+    plan = _PLAN_CACHE.get(key)
+    if plan is not None:
+        _PLAN_CACHE.move_to_end(key)
+        return plan
+
+    use_all = bool(get_config_val(config, "useAll", "use_all", None))
+    schools = get_config_val(config, "schools", "schools", []) or []
+
+    intervals = {}
+    for school in schools:
+        name = normalize_school_name(get_config_val(school, "schoolName", "school_name", ""))
+        from_grade = get_config_val(school, "fromGrade", "from_grade", 0)
+        to_grade = get_config_val(school, "toGrade", "to_grade", 100)
+        intervals.setdefault(name, []).append((float(from_grade), float(to_grade)))
+
+    plan = CompiledConfigFilter(use_all, intervals)
+
+    _PLAN_CACHE[key] = plan
+    if len(_PLAN_CACHE) > _PLAN_CACHE_SIZE:
+        _PLAN_CACHE.popitem(last=False)
+
+    if not use_all:
+        JobLogger.log(f"Compiled config filter: {len(plan.schools)} schools")
+
+    return plan
+
+
+# --------------------------------------------------
+# FILTER
+# --------------------------------------------------
 
 def apply_pipeline_config_filter(df: pd.DataFrame, config):
     """
@@ -10,93 +164,33 @@ def apply_pipeline_config_filter(df: pd.DataFrame, config):
     if df is None or df.empty:
         return df
 
-    # Handle both object and dict access for config
-    use_all = getattr(config, "useAll", None)
-    if use_all is None: use_all = getattr(config, "use_all", None)
-    
-    if use_all is None and isinstance(config, dict):
-        use_all = config.get("useAll")
-        if use_all is None: use_all = config.get("use_all")
-    
-    if use_all:
-        return df
+    plan = compile_config_filter(config)
 
-    schools = getattr(config, "schools", [])
-    if not schools and isinstance(config, dict):
-        schools = config.get("schools", [])
+    if plan.use_all:
+        return df
 
-    if not schools:
+    if not plan.schools:
         # Config says "don't use all" but no schools provided -> return empty
         return df.iloc[0:0]
 
     # Normalize column names if needed
     if "School Name" in df.columns and "SchoolName" not in df.columns:
-        df = df.copy() # Ensure we don't modify in-place before filtering
-        df["SchoolName"] = df["School Name"]
+        df = df.assign(SchoolName=df["School Name"])
 
     if "SchoolName" not in df.columns:
         print("Warning: 'SchoolName' column not found in dataframe. Skipping filter.")
         return df
-        
-    # User Request: Debug Logging
-    print(f"Schools in data (first 10): {df['SchoolName'].unique()[:10]}")
-    
-    # helper to get school name from config item
-    def get_config_val(item, camel, snake, default=None):
-        val = getattr(item, camel, None)
-        if val is None: val = getattr(item, snake, None)
-        if val is None and isinstance(item, dict):
-            val = item.get(camel)
-            if val is None: val = item.get(snake)
-        return val if val is not None else default
-
-    print(f"Config schools: {[get_config_val(s, 'schoolName', 'school_name') for s in schools]}")
+
+    grades = None
 
     # Ensure Grade column is numeric if it exists
     if "Grade" in df.columns:
-        df["Grade"] = pd.to_numeric(df["Grade"], errors="coerce")
-
-    # CLEAN FILTERING
-    # Create temp copy if not already copied
-    df = df.copy()
-
-    # Create Normalized Column
-    df["SchoolName_clean"] = (
-        df["SchoolName"]
-        .astype(str)
-        .str.strip()
-        .str.lower()
-    )
-
-    filtered_parts = []
-
-    for school in schools:
-        # Resolve config values
-        school_name = get_config_val(school, "schoolName", "school_name")
-        from_grade = get_config_val(school, "fromGrade", "from_grade", 0)
-        to_grade = get_config_val(school, "toGrade", "to_grade", 100)
-
-        school_name_clean = str(school_name).strip().lower()
-
-        # Filter by School Name
-        # We use the clean column
-        mask = df["SchoolName_clean"] == school_name_clean
-        
-        # Filter by Grade (If exists)
-        if "Grade" in df.columns:
-             mask = mask & (df["Grade"] >= from_grade) & (df["Grade"] <= to_grade)
-        
-        part = df[mask].copy()
-
-        print(f"Matching school '{school_name}' -> rows: {len(part)}")
-        filtered_parts.append(part)
-
-    if not filtered_parts:
-        return df.iloc[0:0]
+        grades = pd.to_numeric(df["Grade"], errors="coerce")
 
-    result = pd.concat(filtered_parts, ignore_index=True)
+    mask = plan.mask(df["SchoolName"], grades)
 
-    print(f"Final filtered rows: {len(result)}")
+    result = df[mask]
+    if grades is not None:
+        result = result.assign(Grade=grades[mask])
 
-    # Cleanup temp column
-    return result.drop(columns=["SchoolName_clean"], errors="ignore")
+    return result.reset_index(drop=True)
@@ -0,0 +1,88 @@
+import hashlib
+from pathlib import Path
+
+import pandas as pd
+
+from app.core.logging_utils import JobLogger
+from app.services.pipeline_state import get_pipeline_state
+
+
+# --------------------------------------------------
+# FILE HASHING
+# --------------------------------------------------
+
+# (path, size, mtime) -> sha1, so unchanged files are not re-read just to hash them
+_HASH_MEMO = {}
+
+
+def file_hash(path: Path) -> str:
+    """Content hash (sha1) of a file, memoized on size + mtime."""
+    path = Path(path)
+    st = path.stat()
+    memo_key = (str(path.resolve()), st.st_size, st.st_mtime_ns)
+
+    cached = _HASH_MEMO.get(memo_key)
+    if cached:
+        return cached
+
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+
+    digest = h.hexdigest()
+    _HASH_MEMO[memo_key] = digest
+    return digest
+
+
+# --------------------------------------------------
+# NORMALIZATION
+# --------------------------------------------------
+
+def _normalize_raw_sheet(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Prepares an unfiltered sheet for late config filtering (numeric Grade,
+    so the per-config range check does not re-coerce it).
+    """
+    if "Grade" in df.columns:
+        df["Grade"] = pd.to_numeric(df["Grade"], errors="coerce")
+
+    return df
+
+
+# --------------------------------------------------
+# INGEST
+# --------------------------------------------------
+
+def load_raw_workbook(path: Path) -> dict:
+    """
+    Returns { sheet_name: DataFrame } for a grade workbook, UNFILTERED.
+
+    Sheets are parsed once per file content and kept in state["raw"] keyed by
+    file hash; the pipeline config is applied later as a predicate, so a
+    config change does not re-open the Excel file.
+    """
+    path = Path(path)
+    key = file_hash(path)
+
+    raw_store = get_pipeline_state().setdefault("raw", {})
+
+    cached = raw_store.get(key)
+    if cached is not None:
+        JobLogger.log(f"  Using cached raw sheets for {path.name}")
+        return cached["sheets"]
+
+    JobLogger.log(f"  Parsing {path.name}...")
+
+    # Single pass over the workbook: all sheets at once
+    all_sheets = pd.read_excel(path, sheet_name=None)
+
+    sheets = {}
+    for sheet, df in all_sheets.items():
+        # Skip processed sheets if they exist in source (legacy artifact check)
+        if sheet.endswith("_formatted") or sheet.endswith("_formatted_long"):
+            continue
+        sheets[sheet] = _normalize_raw_sheet(df)
+
+    raw_store[key] = {"filename": path.name, "sheets": sheets}
+    return sheets
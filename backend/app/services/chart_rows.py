@@ -0,0 +1,59 @@
+# --------------------------------------------------
+# CHART ROW SPECS
+# --------------------------------------------------
+#
+# Chart elements reference their dataset by "datasetId" instead of embedding
+# rows. An optional "rowSpec" says which rows/shape the chart needs:
+#
+#   {
+#     "filter":  {"column": "School Name", "equals": "Alpha School"},
+#     "take":    "last",                                 # keep one row
+#     "columns": ["Grade", "Registered", ...],          # projection
+#     "unpivot": {                                     # wide -> long
+#         "columns": ["Participated", "Not Participated"],
+#         "labelColumn": "Category",
+#         "valueColumn": "Value",
+#         "valueType": "float",                        # optional cast
+#     },
+#   }
+#
+# Steps apply in that order. Rows are resolved at render/export time.
+
+
+def _cast(value, value_type):
+    if value_type == "float":
+        return float(value)
+    return value
+
+
+def apply_row_spec(rows: list, spec: dict | None) -> list:
+    """Rows of a dataset shaped by a chart element's rowSpec (None = all rows)."""
+    if not spec:
+        return rows
+
+    flt = spec.get("filter")
+    if flt:
+        col, target = flt["column"], flt.get("equals")
+        rows = [r for r in rows if r.get(col) == target]
+
+    if spec.get("take") == "last":
+        rows = rows[-1:]
+
+    columns = spec.get("columns")
+    if columns:
+        rows = [{c: r.get(c) for c in columns} for r in rows]
+
+    unpivot = spec.get("unpivot")
+    if unpivot:
+        label_col = unpivot.get("labelColumn", "Category")
+        value_col = unpivot.get("valueColumn", "Value")
+        value_type = unpivot.get("valueType")
+
+        rows = [
+            {label_col: c, value_col: _cast(r.get(c), value_type)}
+            for r in rows
+            for c in unpivot["columns"]
+        ]
+
+    return rows
+
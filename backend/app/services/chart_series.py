@@ -0,0 +1,289 @@
+import math
+import re
+
+
+# --------------------------------------------------
+# RENDER-READY CHART SERIES
+# --------------------------------------------------
+#
+# Everything a chart needs from a dataset's rows, resolved once when the
+# dataset is created (stored on Dataset.chart_series) instead of per cell
+# on every export:
+#
+#   {
+#     "version": CHART_SERIES_VERSION,
+#     "render_type": "lo",
+#     "label_column": "Learning Outcome",
+#     "percent_column": "Score %",                 # None if not detected
+#     "metric_columns": ["Score %"],               # plotted columns
+#     "categories": ["Students will be able to ..."],
+#     "labels": ["Identify Item 1"],               # cleaned (LO) labels
+#     "series": [{"name": "Score %", "values": [40, ...]}],
+#     "percents": [40, ...],                       # percent column, normalized
+#     "pie": {"name": "Score %", "values": [40, ...]},
+#   }
+#
+# A dataset the renderer would reject stores {"version", "error"} instead.
+# Charts with a rowSpec (see chart_rows) compile their shaped rows at export.
+
+# Bump when the compiled output changes (stale series are recompiled)
+CHART_SERIES_VERSION = 1
+
+# Render types that cannot be plotted without a percent column
+PCT_REQUIRED_TYPES = {
+    "lo",
+    "qlvl",
+    "perf_summary",
+    "subwise",
+}
+
+
+# --------------------------------------------------
+# Value normalization
+# --------------------------------------------------
+
+def normalize_percent(val):
+    """
+    Centralized percent handling. Strips symbols, rounds to nearest integer.
+    """
+    try:
+        # Handle None or empty strings
+        if val is None or str(val).strip() == "":
+            return 0
+        # Strip % and common numeric decorators
+        clean_val = str(val).replace("%", "").replace("(", "").replace(")", "").strip()
+        return int(round(float(clean_val)))
+    except (ValueError, TypeError):
+        return 0
+
+
+def _safe_count(val):
+    """
+    Safe numeric parser for counts. Rounds and strips junk characters.
+    """
+    try:
+        if val is None:
+            return 0
+        return int(round(float(str(val).replace("%", "").strip())))
+    except Exception:
+        return 0
+
+
+def _safe_float(val):
+    try:
+        value = float(str(val).replace("%", ""))
+    except Exception:
+        return 0
+    # NaN/inf cannot be plotted (nor stored as JSON)
+    return value if math.isfinite(value) else 0
+
+
+# --------------------------------------------------
+# LO label cleaner
+# --------------------------------------------------
+
+LO_PREFIXES = [
+    r"the student will be able to",
+    r"students will be able to",
+    r"student will be able to",
+    r"learner will be able to",
+]
+
+_LO_PREFIX_RES = [re.compile(p) for p in LO_PREFIXES]
+
+
+def clean_lo_label(text: str, max_words: int = 6) -> str:
+
+    t = str(text).lower().strip()
+
+    for p in _LO_PREFIX_RES:
+        t = p.sub("", t).strip()
+
+    t = t.strip(" .:")
+
+    words = t.split()
+
+    if len(words) > max_words:
+        words = words[:max_words]
+
+    return " ".join(words).title()
+
+
+# --------------------------------------------------
+# Percent column detection
+# --------------------------------------------------
+
+def _detect_numeric_percent_column(columns, rows):
+    """
+    Fallback: find numeric column that looks like percent.
+    """
+    for c in columns:
+        vals = []
+        for r in rows:
+            try:
+                # Better 0-1 decimal handling
+                raw = str(r.get(c))
+                if "." in raw and float(raw) <= 1:
+                    v = int(round(float(raw) * 100))
+                else:
+                    v = normalize_percent(raw)
+                vals.append(v)
+            except Exception:
+                continue
+
+        if not vals:
+            continue
+
+        mn = min(vals)
+        mx = max(vals)
+
+        # Only treat as percent if the column name clearly indicates it
+        if 0 <= mn and mx <= 100:
+            name = c.lower()
+            if "%" in name or "percent" in name or "percentage" in name:
+                return c
+
+    return None
+
+
+def resolve_percent_column(columns, rows, metric_types, render_type):
+
+    percent_col = next(
+        (c for c in columns if metric_types.get(c) == "percent"),
+        None,
+    )
+
+    # For reg_vs_part_grade, ONLY use schema-classified percent columns
+    if render_type == "reg_vs_part_grade":
+        return percent_col
+
+    if not percent_col:
+        percent_col = _detect_numeric_percent_column(columns, rows)
+
+    if not percent_col:
+        percent_col = next(
+            (c for c in columns if "%" in c or "percent" in c.lower()),
+            None,
+        )
+
+    return percent_col
+
+
+def select_metric_columns(columns, metric_types, render_type, percent_col):
+
+    if render_type == "reg_vs_part_grade":
+        # Only include count columns as bars. ignore Participation %
+        metric_cols = [
+            c for c in columns
+            if metric_types.get(c) in ("registered", "participated")
+        ]
+
+    elif render_type in ("lo", "qlvl", "perf_summary", "subwise"):
+        metric_cols = [percent_col] if percent_col else []
+        if not metric_cols and columns[1:]:
+            # Last resort for percent types, but avoid Participation % if possible
+            metric_cols = [columns[1]]
+
+    else:
+        metric_cols = columns[1:]
+
+    # No dynamic fallback for reg_vs_part_grade: only counts are plotted
+    if not metric_cols and render_type != "reg_vs_part_grade":
+        metric_cols = columns[1:]
+
+    # FINAL GUARD: reg_vs_part charts must NEVER plot percent series
+    if render_type == "reg_vs_part_grade" and percent_col in metric_cols:
+        metric_cols = [c for c in metric_cols if c != percent_col]
+
+    return metric_cols
+
+
+# --------------------------------------------------
+# Compiler
+# --------------------------------------------------
+
+def _series_values(rows, col, render_type, is_pct):
+    # Force normalization for subwise OR if identified as percent
+    if render_type == "subwise" or is_pct:
+        return [normalize_percent(r.get(col)) for r in rows]
+    if render_type == "reg_vs_part_grade":
+        return [_safe_count(r.get(col)) for r in rows]
+    return [_safe_float(r.get(col)) for r in rows]
+
+
+def compile_chart_series(rows: list, metric_types: dict, render_type: str, dataset_name=None) -> dict:
+    """
+    Render-ready series of a dataset's rows. Raises ValueError for rows the
+    renderer cannot plot (no rows, missing percent column).
+    """
+    if not rows:
+        raise ValueError(
+            f"Chart Error: Dataset '{dataset_name}' has empty preview data. "
+            "Cannot render chart."
+        )
+
+    metric_types = metric_types or {}
+    columns = list(rows[0].keys())
+    label_col = columns[0]
+
+    percent_col = resolve_percent_column(columns, rows, metric_types, render_type)
+
+    if render_type in PCT_REQUIRED_TYPES and not percent_col:
+        raise ValueError(
+            f"Chart Error: Dataset '{dataset_name}' (type: {render_type}) "
+            "requires a percentage column but none was detected. "
+            f"Found columns: {columns}"
+        )
+
+    metric_cols = select_metric_columns(columns, metric_types, render_type, percent_col)
+
+    categories = [str(r.get(label_col)) for r in rows]
+
+    if render_type == "lo":
+        labels = [clean_lo_label(c) for c in categories]
+    else:
+        labels = categories
+
+    series = [
+        {
+            "name": col,
+            "values": _series_values(
+                rows,
+                col,
+                render_type,
+                (col == percent_col) or (metric_types.get(col) == "percent"),
+            ),
+        }
+        for col in metric_cols
+    ]
+
+    # ALWAYS normalize_percent for PIE: they are essentially distributions
+    pie = None
+    if metric_cols:
+        pie = {
+            "name": metric_cols[0],
+            "values": [normalize_percent(r.get(metric_cols[0])) for r in rows],
+        }
+
+    return {
+        "version": CHART_SERIES_VERSION,
+        "render_type": render_type,
+        "label_column": label_col,
+        "percent_column": percent_col,
+        "metric_columns": metric_cols,
+        "categories": categories,
+        "labels": labels,
+        "series": series,
+        "percents": [normalize_percent(r.get(percent_col)) for r in rows] if percent_col else None,
+        "pie": pie,
+    }
+
+
+def build_chart_series(name: str, rows: list, profile: dict) -> dict:
+    """compile_chart_series() for a profiled dataset; failures are stored, not raised."""
+    try:
+        return compile_chart_series(
+            rows, profile.get("metric_types"), profile.get("render_type"), name
+        )
+    except ValueError as e:
+        return {"version": CHART_SERIES_VERSION, "error": str(e)}
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+
+
+# --------------------------------------------------
+# COLUMN STATISTICS
+# --------------------------------------------------
+#
+# One pass over a frame, shared by the metric classifier and the schema
+# detector. Per column:
+#   count           non-null values
+#   null_count      null values
+#   numeric_count   values that coerce to a number
+#   numeric_rate    numeric_count / count
+#   numeric_distinct  distinct numeric values
+#   min / max       over the numeric values (None if there are none)
+#   distinct        distinct non-null values (any type)
+
+
+def _numeric_matrix(df: pd.DataFrame) -> np.ndarray:
+    """(rows x columns) float matrix; non-numeric cells become NaN."""
+    cols = []
+    for col in range(df.shape[1]):
+        s = df.iloc[:, col]
+        if pd.api.types.is_bool_dtype(s.dtype) or pd.api.types.is_numeric_dtype(s.dtype):
+            # Fast path: already numeric, no per-value coercion
+            cols.append(s.to_numpy(dtype="float64", na_value=np.nan))
+        else:
+            cols.append(pd.to_numeric(s, errors="coerce").to_numpy(dtype="float64", na_value=np.nan))
+
+    if not cols:
+        return np.empty((len(df), 0))
+
+    return np.column_stack(cols)
+
+
+def compute_column_stats(df: pd.DataFrame) -> dict:
+    """Statistics for every column of `df`, keyed by column name."""
+    values = _numeric_matrix(df)
+    n_cols = values.shape[1]
+
+    if n_cols == 0:
+        return {}
+
+    numeric = ~np.isnan(values)
+    numeric_count = numeric.sum(axis=0)
+
+    has_numeric = numeric_count > 0
+    mins = np.where(numeric, values, np.inf).min(axis=0, initial=np.inf)
+    maxs = np.where(numeric, values, -np.inf).max(axis=0, initial=-np.inf)
+
+    # Distinct numeric values: sort each column (NaN sorts last), count steps
+    ordered = np.sort(values, axis=0)
+    steps = (np.diff(ordered, axis=0) != 0) & ~np.isnan(ordered[1:])
+    numeric_distinct = steps.sum(axis=0) + has_numeric
+
+    null_count = df.isna().sum().to_numpy()
+    count = len(df) - null_count
+    distinct = df.nunique(dropna=True).to_numpy()
+
+    stats = {}
+    for i, col in enumerate(df.columns):
+        stats[col] = {
+            "count": int(count[i]),
+            "null_count": int(null_count[i]),
+            "numeric_count": int(numeric_count[i]),
+            "numeric_rate": float(numeric_count[i] / count[i]) if count[i] else 0.0,
+            "numeric_distinct": int(numeric_distinct[i]),
+            "min": float(mins[i]) if has_numeric[i] else None,
+            "max": float(maxs[i]) if has_numeric[i] else None,
+            "distinct": int(distinct[i]),
+        }
+
+    return stats
+
+
+def records_column_stats(records: list, columns: list) -> dict:
+    """Column statistics straight from row dicts (e.g. a dataset preview)."""
+    frame = pd.DataFrame.from_records(records or [], columns=columns)
+    return compute_column_stats(frame)
@@ -36,7 +36,7 @@ def _looks_textual(name: str) -> bool:
 # NORMALIZER
 # --------------------------------------------------
 
-def normalize_dataset(df: pd.DataFrame, schema: dict) -> pd.DataFrame:
+def normalize_dataset(df: pd.DataFrame, schema: dict, column_types: dict = None) -> pd.DataFrame:
 
     dims_raw = schema.get("dimensions", [])
     metrics_raw = schema.get("metrics", [])
@@ -72,6 +72,12 @@ def normalize_dataset(df: pd.DataFrame, schema: dict) -> pd.DataFrame:
         if meta.get("is_percent"):
             percent_metrics.append(m)
             
+            # Already numeric (type-inference flag or dtype): nothing to strip
+            info = (column_types or {}).get(m)
+            already_numeric = info["numeric"] if info else pd.api.types.is_numeric_dtype(df[m])
+            if already_numeric:
+                continue
+
             # Implementation: Strip % and coerce to float
             if m in df.columns:
                 df[m] = (
@@ -1,4 +1,10 @@
-from app.services.metric_classifier import classify_metric
+from app.services.column_stats import records_column_stats
+from app.services.metric_classifier import classify_metrics
+
+
+# Bump whenever profiling / classification logic changes:
+# stored Dataset.profile values with another version are recomputed.
+PROFILE_VERSION = 3
 
 
 # --------------------------------------------------
@@ -96,19 +102,13 @@ def profile_dataset(dataset: dict):
     metrics = [m for m in metrics if not _is_blacklisted_metric(m)]
 
     # --------------------------------------------------
-    # Classify metrics
-    # --------------------------------------------------
-
-    # --------------------------------------------------
-    # Classify metrics
+    # Classify metrics (one statistics pass, one batch call)
     # --------------------------------------------------
 
     preview = dataset.get("preview") or []
-    metric_types = {}
-    
-    for m in metrics:
-        vals = [r.get(m) for r in preview] if preview else None
-        metric_types[m] = classify_metric(m, vals)
+    stats = records_column_stats(preview, metrics) if preview else None
+
+    metric_types = classify_metrics(metrics, stats)
 
     # --------------------------------------------------
     # Special cases
@@ -0,0 +1,149 @@
+import json
+import uuid
+import zlib
+
+from sqlalchemy.orm import Session
+
+from app.models.dataset import Dataset
+from app.models.dataset_rows import DatasetRowChunk
+
+
+# Dataset.preview holds only this many rows; the rest lives in row chunks
+PREVIEW_ROWS = 20
+
+ROW_CHUNK_SIZE = 5000
+
+MAX_PAGE_ROWS = 1000
+
+
+# --------------------------------------------------
+# ENCODING
+# --------------------------------------------------
+
+def preview_sample(records: list) -> list:
+    return records[:PREVIEW_ROWS]
+
+
+def _encode_chunk(columns: list, records: list) -> bytes:
+    """Columnar JSON (one list per column), zlib-compressed."""
+    payload = {
+        "columns": columns,
+        "values": [[r.get(c) for r in records] for c in columns],
+    }
+    return zlib.compress(json.dumps(payload, default=str, separators=(",", ":")).encode("utf-8"))
+
+
+def _decode_chunk(data: bytes, columns: list | None = None) -> list:
+    payload = json.loads(zlib.decompress(data))
+
+    names = payload["columns"]
+    values = payload["values"]
+
+    if columns is not None:
+        keep = [i for i, c in enumerate(names) if c in columns]
+        names = [names[i] for i in keep]
+        values = [values[i] for i in keep]
+
+    return [dict(zip(names, row)) for row in zip(*values)] if values else []
+
+
+# --------------------------------------------------
+# WRITE
+# --------------------------------------------------
+
+def encode_row_chunks(dataset_id, columns: list, records: list) -> list[dict]:
+    """Row-chunk records for a dataset, ready for a bulk insert / COPY."""
+    columns = list(columns or [])
+    chunks = []
+
+    for idx, start in enumerate(range(0, len(records), ROW_CHUNK_SIZE)):
+        chunk = records[start:start + ROW_CHUNK_SIZE]
+        chunks.append({
+            "id": uuid.uuid4(),
+            "dataset_id": dataset_id,
+            "chunk_index": idx,
+            "row_start": start,
+            "row_count": len(chunk),
+            "data": _encode_chunk(columns, chunk),
+        })
+
+    return chunks
+
+
+# --------------------------------------------------
+# READ
+# --------------------------------------------------
+
+def _preview_is_complete(dataset: Dataset) -> bool:
+    # Small datasets, and legacy datasets whose preview still has every row
+    return len(dataset.preview or []) >= (dataset.row_count or 0)
+
+
+def load_dataset_rows(
+    db: Session,
+    dataset: Dataset,
+    offset: int = 0,
+    limit: int | None = None,
+    columns: list | None = None,
+) -> list:
+    """Rows [offset, offset + limit) of a dataset, optionally projected to `columns`."""
+    end = dataset.row_count if limit is None else min(offset + limit, dataset.row_count)
+
+    if offset >= end:
+        return []
+
+    if _preview_is_complete(dataset):
+        rows = dataset.preview[offset:end]
+        if columns is not None:
+            rows = [{c: r.get(c) for c in dataset.columns if c in columns} for r in rows]
+        return rows
+
+    first = offset // ROW_CHUNK_SIZE
+    last = (end - 1) // ROW_CHUNK_SIZE
+
+    chunks = (
+        db.query(DatasetRowChunk)
+        .filter(
+            DatasetRowChunk.dataset_id == dataset.id,
+            DatasetRowChunk.chunk_index >= first,
+            DatasetRowChunk.chunk_index <= last,
+        )
+        .order_by(DatasetRowChunk.chunk_index.asc())
+        .all()
+    )
+
+    rows = []
+    for chunk in chunks:
+        lo = max(offset - chunk.row_start, 0)
+        hi = min(end - chunk.row_start, chunk.row_count)
+        rows.extend(_decode_chunk(chunk.data, columns)[lo:hi])
+
+    return rows
+
+
+def load_rows_for_datasets(db: Session, datasets: list) -> dict:
+    """All rows of several datasets at once (one chunk query): str(id) -> rows."""
+    result = {}
+    pending = {}
+
+    for d in datasets:
+        if _preview_is_complete(d):
+            result[str(d.id)] = d.preview or []
+        else:
+            result[str(d.id)] = []
+            pending[d.id] = d
+
+    if not pending:
+        return result
+
+    chunks = (
+        db.query(DatasetRowChunk)
+        .filter(DatasetRowChunk.dataset_id.in_(list(pending)))
+        .order_by(DatasetRowChunk.dataset_id, DatasetRowChunk.chunk_index.asc())
+        .all()
+    )
+
+    for chunk in chunks:
+        result[str(chunk.dataset_id)].extend(_decode_chunk(chunk.data))
+
+    return result
@@ -1,3 +1,14 @@
+import hashlib
+import json
+
+from sqlalchemy.orm import Session
+
+from app.models.dataset import Dataset
+from app.services.chart_series import CHART_SERIES_VERSION, build_chart_series
+from app.services.dataset_profiler import PROFILE_VERSION, profile_dataset
+from app.services.dataset_rows import load_rows_for_datasets
+
+
 def detect_dataset_type_from_name(name: str) -> str:
     name = name.lower()
     
@@ -20,3 +31,103 @@ def detect_dataset_type_from_name(name: str) -> str:
         return "perf_summary"
     
     return "generic"
+
+
+def detect_render_type(name: str, family: str | None = None) -> str:
+    """
+    Dataset classification used by the chart renderer: an explicit, non-generic
+    family wins, otherwise the (looser) name patterns below.
+    """
+    # Do not trust generic family blindly
+    if family and family != "generic":
+        return family
+
+    name = (name or "").lower()
+
+    if "sub_wise" in name or "subwise" in name:
+        return "subwise"
+
+    if name.endswith("_lo") or "learning_outcome" in name:
+        return "lo"
+
+    if name.endswith("_qlvl") or "difficulty" in name:
+        return "qlvl"
+
+    if "reg_vs_part_grade" in name or ("reg" in name and "part" in name and "grade" in name):
+        return "reg_vs_part_grade"
+
+    if "reg_vs_part_schl" in name or "reg_vs_part_school" in name:
+        return "reg_vs_part_school"
+
+    if "perf_summary" in name or "summary" in name:
+        return "perf_summary"
+
+    return "generic"
+
+
+# --------------------------------------------------
+# PERSISTED PROFILES
+# --------------------------------------------------
+
+def dataset_content_hash(schema, columns, rows) -> str:
+    payload = json.dumps(
+        {"schema": schema, "columns": columns, "rows": rows},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def build_dataset_profile(name: str, schema, rows) -> dict:
+    """
+    The one profile of a dataset: profile_dataset() plus the name-based
+    classifications, so nothing downstream has to re-derive them.
+    """
+    profile = profile_dataset({"name": name, "schema": schema, "preview": rows})
+    profile["detected_type"] = detect_dataset_type_from_name(name)
+    profile["render_type"] = detect_render_type(name, profile.get("dataset_family"))
+    return profile
+
+
+def dataset_profile_fields(name: str, schema, columns, rows) -> dict:
+    """Profile columns of a Dataset row (profile, profile_version, content_hash, chart_series)."""
+    profile = build_dataset_profile(name, schema, rows)
+    return {
+        "profile": profile,
+        "profile_version": PROFILE_VERSION,
+        "content_hash": dataset_content_hash(schema, columns, rows),
+        "chart_series": build_chart_series(name, rows, profile),
+    }
+
+
+def attach_dataset_profile(dataset: Dataset, rows: list) -> dict:
+    """Computes and stores profile + content hash on an existing (stale) dataset."""
+    fields = dataset_profile_fields(dataset.name, dataset.schema, dataset.columns, rows)
+    for key, value in fields.items():
+        setattr(dataset, key, value)
+    return dataset.profile
+
+
+def ensure_dataset_profiles(db: Session, datasets: list, commit: bool = True) -> dict:
+    """
+    str(id) -> profile. Stored profiles are reused; only datasets without one,
+    profiled by an older classifier version or with stale chart series, are
+    recomputed (and saved).
+    Pass commit=False inside a caller's own transaction.
+    """
+    stale = [
+        d for d in datasets
+        if not d.profile
+        or d.profile_version != PROFILE_VERSION
+        or (d.chart_series or {}).get("version") != CHART_SERIES_VERSION
+    ]
+
+    if stale:
+        print(f" [Profile] Recomputing {len(stale)} dataset profile(s) (version {PROFILE_VERSION})")
+        rows_map = load_rows_for_datasets(db, stale)
+        for d in stale:
+            attach_dataset_profile(d, rows_map[str(d.id)])
+        if commit:
+            db.commit()
+
+    return {str(d.id): d.profile for d in datasets}
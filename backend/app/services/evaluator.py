@@ -1,88 +1,221 @@
+import os
+
 import yaml
 from pathlib import Path
 
 BASE = Path(__file__).parent
 
-_RULES = None
+RULES_PATH = BASE / "chart_rules.yaml"
 
+# Profile keys rules are indexed by (a rule with a literal value for one of
+# these can only match profiles with that exact value)
+INDEX_KEYS = ("dataset_family", "special_case", "entity")
 
-# --------------------------------------------------
-# LOAD RULES
-# --------------------------------------------------
+DEFAULT_DECISION = {"chart": "column"}
 
-def load_rules():
-    global _RULES
-    if _RULES is None:
-        with open(BASE / "chart_rules.yaml") as f:
-            data = yaml.safe_load(f) or {}
-            _RULES = data.get("rules", [])
-    return _RULES
+# Compiled rules + index, reloaded when the rules file's mtime changes
+_STATE = {"path": None, "mtime": None, "rules": [], "index": {}, "unindexed": []}
 
 
 # --------------------------------------------------
-# MATCHING ENGINE
+# COMPILING
 # --------------------------------------------------
 
-def _match_value(actual, expected):
+_COMPARATORS = [
+    (">=", lambda a, b: a >= b),
+    ("<=", lambda a, b: a <= b),
+    (">", lambda a, b: a > b),
+    ("<", lambda a, b: a < b),
+]
+
 
-    # wildcard
+def _compile_value(expected):
+    """
+    One predicate per `when` entry, parsed once:
+
+      "*"             wildcard (matches even a missing value)
+      ">3" ">=2" ...  numeric comparisons
+      "!=x"           not equal
+      [a, b]          membership
+      anything else   equality
+
+    A missing profile value never matches anything but the wildcard.
+    """
     if expected == "*":
-        return True
+        return lambda actual: True
 
-    # missing actual never matches unless wildcard
-    if actual is None:
-        return False
+    if isinstance(expected, str):
+        s = expected.strip()
+
+        for prefix, compare in _COMPARATORS:
+            if s.startswith(prefix):
+                bound = int(s[len(prefix):])
+                return lambda actual, c=compare, b=bound: actual is not None and c(actual, b)
 
-    # numeric comparisons: >3, >=2, <5, <=10
+        if s.startswith("!="):
+            other = s[2:]
+            return lambda actual: actual is not None and actual != other
+
+    if isinstance(expected, list):
+        return lambda actual: actual is not None and actual in expected
+
+    return lambda actual: actual is not None and actual == expected
+
+
+def _is_literal(expected) -> bool:
+    if isinstance(expected, (list, dict)) or expected == "*":
+        return False
     if isinstance(expected, str):
         s = expected.strip()
+        return not s.startswith((">", "<", "!="))
+    return True
 
-        if s.startswith(">="):
-            return actual >= int(s[2:])
 
-        if s.startswith("<="):
-            return actual <= int(s[2:])
+class CompiledRule:
 
-        if s.startswith(">"):
-            return actual > int(s[1:])
+    def __init__(self, rule: dict):
+        self.name = rule.get("name", "unnamed")
+        self.then = rule.get("then", {})
+        when = rule.get("when") or {}
 
-        if s.startswith("<"):
-            return actual < int(s[1:])
+        try:
+            self.predicates = [(k, _compile_value(v)) for k, v in when.items()]
+        except ValueError as e:
+            raise ValueError(f"Rule '{self.name}': {e}")
 
-        # not equal
-        if s.startswith("!="):
-            return actual != s[2:]
+        # First discriminating key with an exact value, if any
+        self.index_key = next(
+            ((k, when[k]) for k in INDEX_KEYS if k in when and _is_literal(when[k])),
+            None,
+        )
 
-    # list membership
-    if isinstance(expected, list):
-        return actual in expected
+    def first_failure(self, profile: dict):
+        """Key of the first failing condition, or None when the rule matches."""
+        for key, predicate in self.predicates:
+            if not predicate(profile.get(key)):
+                return key
+        return None
+
+
+def compile_rules(rules: list) -> dict:
+    compiled = [CompiledRule(r) for r in rules]
 
-    return actual == expected
+    index = {}
+    unindexed = []
+
+    for pos, rule in enumerate(compiled):
+        if rule.index_key is None:
+            unindexed.append(pos)
+        else:
+            key, value = rule.index_key
+            index.setdefault(key, {}).setdefault(value, []).append(pos)
+
+    return {"rules": compiled, "index": index, "unindexed": unindexed}
+
+
+# --------------------------------------------------
+# LOAD RULES
+# --------------------------------------------------
+
+def _load_compiled(path: Path = None) -> dict:
+    path = Path(path or RULES_PATH)
+
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError as e:
+        if _STATE["path"] == path:
+            print(f" [Rules] Cannot stat {path} ({e}); keeping loaded rules")
+            return _STATE
+        raise
+
+    if _STATE["path"] == path and _STATE["mtime"] == mtime:
+        return _STATE
+
+    try:
+        with open(path) as f:
+            data = yaml.safe_load(f) or {}
+        compiled = compile_rules(data.get("rules", []))
+    except Exception as e:
+        # A half-saved or broken file must not take down slide generation
+        if _STATE["path"] == path:
+            print(f" [Rules] Reload of {path} failed ({e}); keeping previous rules")
+            return _STATE
+        raise
+
+    _STATE.update(path=path, mtime=mtime, **compiled)
+    print(f" [Rules] Loaded {len(compiled['rules'])} chart rules from {path.name}")
+    return _STATE
+
+
+def load_rules():
+    """Compiled rules, in priority order (reloaded if the file changed)."""
+    return _load_compiled()["rules"]
 
 
 # --------------------------------------------------
 # RULE PICKER
 # --------------------------------------------------
 
-def pick_rule(profile: dict):
+def _candidates(state: dict, profile: dict) -> list:
+    positions = list(state["unindexed"])
+
+    for key, by_value in state["index"].items():
+        try:
+            positions.extend(by_value.get(profile.get(key), ()))
+        except TypeError:
+            # unhashable profile value cannot equal a literal
+            continue
+
+    return sorted(positions)
+
 
-    for rule in load_rules():
+def _pick(state: dict, profile: dict, trace: list = None):
+    for pos in _candidates(state, profile):
+        rule = state["rules"][pos]
+        failed = rule.first_failure(profile)
 
-        when = rule.get("when", {})
-        ok = True
+        if trace is not None:
+            trace.append({"rule": rule.name, "matched": failed is None, "failed_on": failed})
 
-        for k, v in when.items():
+        if failed is None:
+            return rule
 
-            actual = profile.get(k)
+    return None
+
+
+def pick_rule(profile: dict):
 
-            if not _match_value(actual, v):
-                ok = False
-                break
+    rule = _pick(_load_compiled(), profile)
 
-        if ok:
-            then = rule.get("then", {})
-            print(f"[VALIDATED] Rule Match: {rule.get('name', 'unnamed')} -> Chart: {then.get('chart')}")
-            return then
+    if rule is not None:
+        print(f"[VALIDATED] Rule Match: {rule.name} -> Chart: {rule.then.get('chart')}")
+        return rule.then
 
     # safe default
-    return {"chart": "column"}
+    return dict(DEFAULT_DECISION)
+
+
+def pick_rules(profiles: list) -> list:
+    """
+    Decisions for many profiles (e.g. a whole project) against one rules
+    snapshot. Each result: {"rule", "then", "trace"}; the trace lists every
+    candidate rule evaluated (rules ruled out by the index are skipped) and
+    the first condition that failed.
+    """
+    state = _load_compiled()
+    results = []
+
+    for profile in profiles:
+        trace = []
+        rule = _pick(state, profile, trace)
+
+        if rule is not None:
+            print(f"[VALIDATED] Rule Match: {rule.name} -> Chart: {rule.then.get('chart')}")
+
+        results.append({
+            "rule": rule.name if rule is not None else None,
+            "then": rule.then if rule is not None else dict(DEFAULT_DECISION),
+            "trace": trace,
+        })
+
+    return results
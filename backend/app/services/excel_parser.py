@@ -1,27 +1,23 @@
-import pandas as pd
-import tempfile
-import openpyxl
+import io
+import os
+import posixpath
 import re
+import zipfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from starlette.concurrency import run_in_threadpool
 
 from app.services.pivot_detector import detect_schema
 from app.services.dataset_normalizer import normalize_dataset
+from app.services.type_inference import infer_column_types
 
 
 # --------------------------------------------------
 # CLEANERS
 # --------------------------------------------------
 
-TEXT_COL_HINTS = [
-    "question",
-    "questions",
-    "learning outcome",
-    "lo",
-    "description",
-    "statement",
-    "indicator",
-]
-
-
 def _clean_dataframe(df: pd.DataFrame) -> pd.DataFrame:
 
     # Drop fully empty rows/cols
@@ -33,45 +29,6 @@ def _clean_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     return df.reset_index(drop=True)
 
 
-def _coerce_percent_columns(df: pd.DataFrame) -> pd.DataFrame:
-    """
-    Convert columns that look like percentages into floats.
-    """
-
-    for col in df.columns:
-
-        cname = col.lower()
-
-        if "%" in cname or "percent" in cname or "avg" in cname:
-
-            df[col] = (
-                df[col]
-                .astype(str)
-                .str.replace("%", "", regex=False)
-                .str.replace("(", "", regex=False)
-                .str.replace(")", "", regex=False)
-            )
-
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-
-    return df
-
-
-def _drop_text_metric_columns(df: pd.DataFrame) -> pd.DataFrame:
-    """
-    If a column smells like narrative text, never let it become numeric.
-    """
-
-    for col in list(df.columns):
-
-        n = col.lower()
-
-        if any(h in n for h in TEXT_COL_HINTS):
-            df[col] = df[col].astype(str)
-
-    return df
-
-
 def _sanitize_for_json(df: pd.DataFrame) -> pd.DataFrame:
     """
     PostgreSQL JSON cannot store NaN / inf.
@@ -117,86 +74,164 @@ def looks_like_pivot(df: pd.DataFrame) -> bool:
 # MERGED CELL DETECTOR
 # --------------------------------------------------
 
-def detect_merged_sheets(path: str) -> set[str]:
-    wb = openpyxl.load_workbook(path, data_only=True)
-    try:
-        merged = set()
-        for ws in wb.worksheets:
-            if ws.merged_cells.ranges:
-                merged.add(ws.title)
-        return merged
-    finally:
-        wb.close()
+_NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_NS_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+# <mergeCell ref="..."/> (any namespace prefix)
+_MERGE_CELL_RE = re.compile(rb"<(?:[\w.-]+:)?mergeCell[\s/>]")
+
+
+def _sheet_xml_paths(zf: zipfile.ZipFile) -> dict[str, str]:
+    """Maps sheet name -> worksheet part path inside the xlsx package."""
+    workbook = ET.fromstring(zf.read("xl/workbook.xml"))
+    rels = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+
+    targets = {}
+    for rel in rels.iter(f"{_NS_PKG_REL}Relationship"):
+        target = rel.get("Target", "")
+        if target.startswith("/"):
+            target = target[1:]
+        else:
+            target = posixpath.normpath(posixpath.join("xl", target))
+        targets[rel.get("Id")] = target
+
+    paths = {}
+    for sheet in workbook.iter(f"{_NS_MAIN}sheet"):
+        target = targets.get(sheet.get(f"{_NS_REL}id"))
+        if target:
+            paths[sheet.get("name")] = target
+    return paths
+
+
+def _part_has_merged_cells(zf: zipfile.ZipFile, part: str, chunk_size: int = 1 << 20) -> bool:
+    """Streams a worksheet part looking for <mergeCell>, without building any cells."""
+    tail = b""
+    with zf.open(part) as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return False
+            if _MERGE_CELL_RE.search(tail + chunk):
+                return True
+            tail = chunk[-64:]
+
+
+def detect_merged_sheets(source) -> set[str]:
+    """
+    Names of sheets containing merged cells.
+    `source` is a path or a binary file-like object of an .xlsx file.
+    """
+    merged = set()
+    with zipfile.ZipFile(source) as zf:
+        for name, part in _sheet_xml_paths(zf).items():
+            if part in zf.namelist() and _part_has_merged_cells(zf, part):
+                merged.add(name)
+    return merged
+
+
+# --------------------------------------------------
+# SHEET PIPELINE
+# --------------------------------------------------
+
+def _build_dataset(sheet: str, df: pd.DataFrame):
+    """
+    Runs one sheet through cleaning, pivot check, schema detection and
+    normalization. Returns the dataset dict, or None if the sheet is skipped.
+    """
+    df = _clean_dataframe(df)
+
+    # ----------------------------------
+    # One type-inference pass: percent-like columns -> numeric,
+    # narrative columns -> text, plus per-column flags for schema/normalize
+    # ----------------------------------
+    df, column_types = infer_column_types(df)
+
+    # ----------------------------------
+    # Skip admin / non-pivot sheets
+    # ----------------------------------
+    print(f" [ExcelParser] Checking sheet '{sheet}'...")
+    if not looks_like_pivot(df):
+        print(f" [ExcelParser] SKIPPING '{sheet}' (not a pivot)")
+        return None
+    
+    print(f" [ExcelParser] ACCEPTED '{sheet}'")
+
+    schema = detect_schema(df, column_types)
+
+    # ----------------------------------
+    # REG VS PART MUST STAY WIDE
+    # ----------------------------------
+    if sheet.startswith("reg_vs_part"):
+        normalized = df.copy()
+    else:
+        normalized = normalize_dataset(df, schema, column_types)
+
+    # ----------------------------------
+    # JSON-safe
+    # ----------------------------------
+    normalized = _sanitize_for_json(normalized)
+
+    return {
+        "name": sheet,
+        "columns": normalized.columns.tolist(),
+        "rows": len(normalized),
+        "schema": schema,
+        "preview": normalized.to_dict(orient="records"),
+    }
 
 
 # --------------------------------------------------
 # MAIN PARSER
 # --------------------------------------------------
 
-async def parse_excel(file):
+def read_workbook_frames(contents: bytes) -> dict[str, pd.DataFrame]:
+    """
+    Reads every sheet without merged cells, in workbook order.
+    Everything stays in memory: no temp files.
+    """
+    merged_sheets = detect_merged_sheets(io.BytesIO(contents))
 
-    contents = await file.read()
+    with pd.ExcelFile(io.BytesIO(contents)) as xls:
+        sheets = [s for s in xls.sheet_names if s not in merged_sheets]
+        # One workbook load for all remaining sheets
+        return xls.parse(sheets, header=0) if sheets else {}
 
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx") as tmp:
-        tmp.write(contents)
-        path = tmp.name
 
-    merged_sheets = detect_merged_sheets(path)
+# Sheets are independent: clean/schema/normalize them on a worker pool.
+# EXCEL_PARSE_WORKERS=1 keeps the old sequential behaviour.
+# The stages are mostly GIL-bound pandas work: on a single CPU the pool only
+# adds overhead, hence the CPU-bound default (scripts/bench_excel_parse.py).
+PARSE_WORKERS = int(os.environ.get("EXCEL_PARSE_WORKERS", min(4, os.cpu_count() or 1)))
 
-    datasets = []
-    
-    with pd.ExcelFile(path) as xls:
-        for sheet in xls.sheet_names:
-            # ----------------------------------
-            # Skip merged-cell sheets
-            # ----------------------------------
-            if sheet in merged_sheets:
-                continue
-
-            df = xls.parse(sheet, header=0)
-
-            df = _clean_dataframe(df)
-
-            # ----------------------------------
-            # Normalize percent-like columns early
-            # ----------------------------------
-            df = _coerce_percent_columns(df)
-
-            df = _drop_text_metric_columns(df)
-
-            # ----------------------------------
-            # Skip admin / non-pivot sheets
-            # ----------------------------------
-            print(f" [ExcelParser] Checking sheet '{sheet}'...")
-            if not looks_like_pivot(df):
-                print(f" [ExcelParser] SKIPPING '{sheet}' (not a pivot)")
-                continue
-            
-            print(f" [ExcelParser] ACCEPTED '{sheet}'")
-
-            schema = detect_schema(df)
-
-            # ----------------------------------
-            # REG VS PART MUST STAY WIDE
-            # ----------------------------------
-            if sheet.startswith("reg_vs_part"):
-                normalized = df.copy()
-            else:
-                normalized = normalize_dataset(df, schema)
-
-            # ----------------------------------
-            # JSON-safe
-            # ----------------------------------
-            normalized = _sanitize_for_json(normalized)
-
-            datasets.append(
-                {
-                    "name": sheet,
-                    "columns": normalized.columns.tolist(),
-                    "rows": len(normalized),
-                    "schema": schema,
-                    "preview": normalized.to_dict(orient="records"),
-                }
-            )
-
-    return datasets
+# Smaller workbooks are processed sequentially (pool overhead outweighs the gain)
+PARSE_PARALLEL_MIN_SHEETS = int(os.environ.get("EXCEL_PARSE_PARALLEL_MIN_SHEETS", "4"))
+
+
+def build_datasets(frames: dict[str, pd.DataFrame]) -> list[dict]:
+    """Processes sheets (in parallel for larger workbooks); results come back in sheet order."""
+    items = list(frames.items())
+
+    if PARSE_WORKERS <= 1 or len(items) < PARSE_PARALLEL_MIN_SHEETS:
+        results = [_build_dataset(sheet, df) for sheet, df in items]
+    else:
+        with ThreadPoolExecutor(
+            max_workers=min(PARSE_WORKERS, len(items)),
+            thread_name_prefix="excel-parse",
+        ) as pool:
+            # map() yields in submission order
+            results = list(pool.map(lambda item: _build_dataset(*item), items))
+
+    return [d for d in results if d is not None]
+
+
+def parse_workbook(contents: bytes) -> list[dict]:
+    return build_datasets(read_workbook_frames(contents))
+
+
+async def parse_excel(file):
+
+    contents = await file.read()
+
+    # CPU-bound: keep it off the event loop
+    return await run_in_threadpool(parse_workbook, contents)
@@ -1,18 +1,168 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
 from pathlib import Path
 from datetime import datetime
 
 from sqlalchemy.orm import Session
 
 from app.models.dataset import Dataset
-from app.services.dataset_profiler import profile_dataset
-from app.services.ppt.slide_builder import build_ppt_from_slides
+from app.services.chart_rows import apply_row_spec
+from app.services.chart_series import CHART_SERIES_VERSION
+from app.services.dataset_rows import load_rows_for_datasets
+from app.services.dataset_service import ensure_dataset_profiles
+from app.services.ppt.chart_embedding import DEFAULT_EMBED_MODE, EMBED_MODES
+from app.services.ppt.slide_builder import RENDERER_VERSION, build_ppt_from_slides
+from app.services.ppt.template_loader import get_template_info
 
 
-EXPORT_DIR = Path("exports")
+# Absolute: pipeline steps chdir while export jobs run in other threads
+EXPORT_DIR = Path("exports").resolve()
 EXPORT_DIR.mkdir(exist_ok=True)
 
+# Finished decks are kept this long for later download
+EXPORT_RETENTION_HOURS = float(os.environ.get("EXPORT_RETENTION_HOURS", "24"))
 
-def export_project_to_ppt(project, slides, db: Session, debug_mode: bool = False):
+# Built decks keyed by export_cache_key(); least recently used evicted first
+EXPORT_CACHE_DIR = EXPORT_DIR / "cache"
+EXPORT_CACHE_MAX_ENTRIES = int(os.environ.get("EXPORT_CACHE_MAX_ENTRIES", "20"))
+
+# Export jobs may run concurrently: eviction must not race a job pinning its deck
+_CACHE_LOCK = threading.Lock()
+
+
+def cleanup_old_exports(max_age_hours: float = EXPORT_RETENTION_HOURS) -> int:
+    """Deletes .pptx files in exports/ older than the retention window."""
+    cutoff = time.time() - max_age_hours * 3600
+    removed = 0
+
+    for f in [*EXPORT_DIR.glob("*.pptx"), *EXPORT_CACHE_DIR.glob("*.pptx")]:
+        try:
+            if f.stat().st_mtime < cutoff:
+                f.unlink()
+                removed += 1
+        except OSError:
+            continue
+
+    if removed:
+        print(f"[Export] Removed {removed} export(s) older than {max_age_hours}h")
+
+    return removed
+
+
+def export_filename(project) -> str:
+    """Download name of an export (cached files are named by their key)."""
+    return f"{project.name}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.pptx"
+
+
+# --------------------------------------------------
+# EXPORT CACHE
+# --------------------------------------------------
+
+def export_cache_key(
+    slides, datasets, template_hash: str, debug_mode: bool, embed_mode: str = "full"
+) -> str:
+    """
+    Everything a built deck depends on: ordered slide JSON, dataset versions
+    (content hash + profile and chart series versions), template, renderer version, debug
+    overlays, chart workbook embed mode and the footer date.
+    """
+    payload = json.dumps(
+        {
+            "slides": [[s.position, s.slide_json] for s in slides],
+            "datasets": sorted(
+                [str(d.id), d.content_hash, d.profile_version] for d in datasets
+            ),
+            "series": CHART_SERIES_VERSION,
+            "template": template_hash,
+            "renderer": RENDERER_VERSION,
+            "debug": debug_mode or os.environ.get("EXPORT_DEBUG") == "true",
+            "embed": embed_mode,
+            "date": datetime.now().strftime("%Y-%m-%d"),
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _cached_export(key: str) -> Path | None:
+    path = EXPORT_CACHE_DIR / f"{key}.pptx"
+    if not path.exists():
+        return None
+    try:
+        os.utime(path)  # mark as recently used
+    except OSError:
+        return None
+    return path
+
+
+def _evict_exports(max_entries: int = EXPORT_CACHE_MAX_ENTRIES):
+    entries = []
+    for f in EXPORT_CACHE_DIR.glob("*.pptx"):
+        try:
+            entries.append((f.stat().st_mtime, f))
+        except OSError:
+            continue
+
+    entries.sort(reverse=True)
+
+    for _, f in entries[max_entries:]:
+        try:
+            f.unlink()
+        except OSError:
+            pass
+
+
+def _pin_export(path: Path, name: str) -> Path:
+    """
+    Links a cached deck into exports/ as <name>.pptx. Eviction only scans
+    the cache, so the pinned file stays until retention cleanup removes it.
+    """
+    pinned = EXPORT_DIR / f"{name}.pptx"
+    try:
+        os.link(path, pinned)
+    except OSError:
+        # No hard links here (e.g. another filesystem): copy instead
+        shutil.copy2(path, pinned)
+    return pinned
+
+
+def remove_pinned_export(path) -> None:
+    """Deletes a pinned deck once it has been served (synchronous exports)."""
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+# --------------------------------------------------
+# EXPORT
+# --------------------------------------------------
+
+def export_project_to_ppt(
+    project,
+    slides,
+    db: Session,
+    debug_mode: bool = False,
+    embed_mode: str | None = None,
+    pin_as: str | None = None,
+):
+    """
+    Builds (or reuses) the project's PPTX and returns its path. embed_mode
+    picks the chart workbooks: "full", "minimal" or "none" (see chart_embedding).
+    With pin_as, the returned file is a pinned copy that cache eviction cannot
+    remove while it is being served or waits for download.
+    """
+    embed_mode = embed_mode or DEFAULT_EMBED_MODE
+    if embed_mode not in EMBED_MODES:
+        raise RuntimeError(
+            f"Unknown embed mode '{embed_mode}'. Use one of: {', '.join(EMBED_MODES)}"
+        )
 
     # -----------------------------------
     # Load datasets for lookup
@@ -23,16 +173,46 @@ def export_project_to_ppt(project, slides, db: Session, debug_mode: bool = False
         .all()
     )
 
+    # Stale/legacy datasets get their profile and content hash first
+    profiles = ensure_dataset_profiles(db, datasets)
+
+    # -----------------------------------
+    # Cache lookup (before any rows are read)
+    # -----------------------------------
+    key = export_cache_key(
+        slides, datasets, get_template_info()["hash"], debug_mode, embed_mode
+    )
+
+    with _CACHE_LOCK:
+        cached = _cached_export(key)
+        if cached is not None:
+            print(f"[Export] Cache hit for '{project.name}' ({key[:10]})")
+            return str(_pin_export(cached, pin_as) if pin_as else cached)
+
+    # Series compiled at dataset creation (ensure_dataset_profiles refreshed stale ones)
+    series_map = {
+        str(d.id): d.chart_series
+        for d in datasets
+        if (d.chart_series or {}).get("version") == CHART_SERIES_VERSION
+    }
+
+    # Full rows (preview is only a sample) only where a chart reshapes them
+    row_ids = {
+        el.get("datasetId")
+        for slide in slides
+        for el in slide.slide_json.get("elements", [])
+        if el.get("type") == "chart"
+        and (el.get("rowSpec") or el.get("datasetId") not in series_map)
+    }
+    rows_map = load_rows_for_datasets(db, [d for d in datasets if str(d.id) in row_ids])
+
     dataset_map = {
         str(d.id): {
-            "preview": d.preview,
+            "preview": rows_map.get(str(d.id)),
+            "series": series_map.get(str(d.id)),
             "schema": d.schema,
             "name": d.name,
-            "profile": profile_dataset({
-                "name": d.name,
-                "schema": d.schema,
-                "preview": d.preview
-            })
+            "profile": profiles[str(d.id)],
         }
         for d in datasets
     }
@@ -59,24 +239,40 @@ def export_project_to_ppt(project, slides, db: Session, debug_mode: bool = False
             if not dataset_info:
                 continue
 
-            # inject for renderer
-            el["preview"] = dataset_info["preview"]
+            # inject for renderer: compiled series, or rows shaped by the rowSpec
+            if el.get("rowSpec") or dataset_info["series"] is None:
+                el["chartSeries"] = None
+                el["preview"] = apply_row_spec(dataset_info["preview"], el.get("rowSpec"))
+            else:
+                el["chartSeries"] = dataset_info["series"]
             el["schema"] = dataset_info["schema"]
             el["datasetName"] = dataset_info["name"]
             el["metricTypes"] = dataset_info["profile"].get("metric_types")
             el["datasetFamily"] = dataset_info["profile"].get("dataset_family")
+            el["renderType"] = dataset_info["profile"].get("render_type")
 
     # -----------------------------------
-    # Build PPTX
+    # Build PPTX (temp file, then atomic rename into the cache)
     # -----------------------------------
-    filename = f"{project.name}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.pptx"
-    output_path = EXPORT_DIR / filename
-
-    ppt_path = build_ppt_from_slides(
-        project=project,
-        slides=slides,
-        output_path=output_path,
-        debug_mode=debug_mode,
-    )
+    EXPORT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    output_path = EXPORT_CACHE_DIR / f"{key}.pptx"
+    tmp_path = EXPORT_CACHE_DIR / f"{key}.{uuid.uuid4().hex}.tmp"
+
+    try:
+        build_ppt_from_slides(
+            project=project,
+            slides=slides,
+            output_path=tmp_path,
+            debug_mode=debug_mode,
+            embed_mode=embed_mode,
+        )
+        with _CACHE_LOCK:
+            os.replace(tmp_path, output_path)
+            if pin_as:
+                output_path = _pin_export(output_path, pin_as)
+            _evict_exports()
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
 
-    return str(ppt_path)
+    return str(output_path)
@@ -0,0 +1,74 @@
+from pathlib import Path
+
+import pandas as pd
+from pandas.api.types import is_float_dtype
+from sqlalchemy.orm import Session
+
+from app.services.excel_parser import build_datasets, read_workbook_frames
+from app.services.pipeline_state import get_pipeline_state
+from app.services.project_service import create_project_with_datasets
+
+
+# Download copy written by step 5 (fallback when the in-memory state is gone)
+STEP5_SNAPSHOT = Path("outputs") / "step5_uploadable.xlsx"
+
+
+def _as_parser_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Gives an in-memory step 5 frame the numeric typing the parser relies on,
+    without an Excel round-trip: numbers held in object columns become numeric,
+    whole-number float columns become ints.
+    """
+    df = df.copy()
+
+    for col in df.columns:
+        s = df[col]
+
+        if s.dtype == object:
+            converted = pd.to_numeric(s, errors="coerce")
+            if converted.notna().sum() == s.notna().sum() and s.notna().any():
+                s = converted
+
+        if is_float_dtype(s.dtype) and s.notna().all() and (s % 1 == 0).all():
+            s = s.astype("int64")
+
+        df[col] = s
+
+    return df
+
+
+def load_step5_frames(base_dir: Path) -> dict[str, pd.DataFrame]:
+    """
+    Uploadable sheets straight from state["step5"]. Falls back to the step 5
+    snapshot only when the in-memory state was lost (e.g. server restart).
+    """
+    frames = get_pipeline_state().get("step5") or {}
+    if frames:
+        print(f"[Finalize] Using {len(frames)} in-memory step 5 sheets")
+        return {name: _as_parser_frame(df) for name, df in frames.items() if df is not None}
+
+    snapshot = Path(base_dir) / STEP5_SNAPSHOT
+    print(f"[Finalize] Step 5 state empty, looking for file: {snapshot}")
+
+    if not snapshot.exists():
+        raise FileNotFoundError("Uploadable data not found. Run performance step 5 first.")
+
+    return read_workbook_frames(snapshot.read_bytes())
+
+
+def finalize_pipeline_output(base_dir: Path, db: Session) -> dict:
+    """
+    Turns the pipeline's uploadable sheets into a project with datasets and
+    auto-generated slides. Shared by the sync endpoint and the background job.
+    """
+    frames = load_step5_frames(base_dir)
+
+    # Same cleaning / schema / normalize path as uploaded workbooks
+    print("[Finalize] Building datasets...")
+    datasets = build_datasets(frames)
+
+    # Project, datasets, row chunks and slides in one transaction
+    print(f"[Finalize] Saving {len(datasets)} datasets and generating slides...")
+    created = create_project_with_datasets(db, "Analysis Pipeline Output", datasets)
+
+    return {"project_id": created["project_id"], "slides_created": len(created["slides"])}
@@ -0,0 +1,96 @@
+import copy
+
+
+# --------------------------------------------------
+# JSON PATCH (RFC 6902 subset: add / remove / replace)
+# --------------------------------------------------
+#
+# Used by the slide PATCH endpoint so the editor can send "move element 3"
+# as one op instead of the whole slide:
+#
+#   [{"op": "replace", "path": "/elements/3/x", "value": 120}]
+
+
+class JsonPatchError(ValueError):
+    pass
+
+
+def _parse_pointer(path: str) -> list:
+    if path == "":
+        return []
+    if not path.startswith("/"):
+        raise JsonPatchError(f"Invalid JSON pointer: {path!r}")
+    return [p.replace("~1", "/").replace("~0", "~") for p in path[1:].split("/")]
+
+
+def _list_index(container: list, token: str, allow_end: bool) -> int:
+    if allow_end and token == "-":
+        return len(container)
+    try:
+        idx = int(token)
+    except ValueError:
+        raise JsonPatchError(f"Invalid list index: {token!r}")
+    upper = len(container) if allow_end else len(container) - 1
+    if idx < 0 or idx > upper:
+        raise JsonPatchError(f"List index out of range: {idx}")
+    return idx
+
+
+def _resolve_parent(doc, tokens: list):
+    target = doc
+    for token in tokens[:-1]:
+        if isinstance(target, list):
+            target = target[_list_index(target, token, allow_end=False)]
+        elif isinstance(target, dict):
+            if token not in target:
+                raise JsonPatchError(f"Path not found: {token!r}")
+            target = target[token]
+        else:
+            raise JsonPatchError(f"Cannot traverse into {type(target).__name__}")
+    return target
+
+
+def apply_patch(doc, ops: list):
+    """Returns a patched copy of `doc`; the input is left untouched."""
+    doc = copy.deepcopy(doc)
+
+    for op in ops:
+        kind = op.get("op")
+        tokens = _parse_pointer(op.get("path", ""))
+
+        if kind not in ("add", "remove", "replace"):
+            raise JsonPatchError(f"Unsupported op: {kind!r}")
+
+        if kind != "remove" and "value" not in op:
+            raise JsonPatchError(f"Missing 'value' for {kind} {op.get('path')!r}")
+
+        if not tokens:
+            if kind == "remove":
+                raise JsonPatchError("Cannot remove the document root")
+            doc = copy.deepcopy(op["value"])
+            continue
+
+        parent = _resolve_parent(doc, tokens)
+        key = tokens[-1]
+
+        if isinstance(parent, list):
+            idx = _list_index(parent, key, allow_end=(kind == "add"))
+            if kind == "add":
+                parent.insert(idx, copy.deepcopy(op["value"]))
+            elif kind == "remove":
+                parent.pop(idx)
+            else:
+                parent[idx] = copy.deepcopy(op["value"])
+
+        elif isinstance(parent, dict):
+            if kind != "add" and key not in parent:
+                raise JsonPatchError(f"Path not found: {op['path']!r}")
+            if kind == "remove":
+                del parent[key]
+            else:
+                parent[key] = copy.deepcopy(op["value"])
+
+        else:
+            raise JsonPatchError(f"Cannot patch into {type(parent).__name__}")
+
+    return doc
@@ -1,5 +1,9 @@
 import re
 
+import pandas as pd
+
+from app.services.column_stats import compute_column_stats
+
 # --------------------------------------------------
 # Patterns
 # --------------------------------------------------
@@ -52,64 +56,88 @@ TEXT_PATTERNS = [
 ]
 
 
+# One compiled regex per class (alternation of the literal patterns)
+def _compile(patterns):
+    return re.compile("|".join(re.escape(p) for p in patterns))
+
+
+REG_RE = _compile(REG_PATTERNS)
+NOT_REG_RE = _compile(NOT_REG_PATTERNS)
+PART_RE = _compile(PART_PATTERNS)
+PERCENT_RE = _compile(PERCENT_PATTERNS)
+TOTAL_RE = _compile(TOTAL_PATTERNS)
+TEXT_RE = _compile(TEXT_PATTERNS)
+
+
 # --------------------------------------------------
 # CLASSIFIER
 # --------------------------------------------------
 
-def classify_metric(name: str, values: list = None) -> str:
+def classify_metric_stats(name: str, stats: dict = None) -> str:
     """
-    Classifies a metric based on its name and optionally its values.
+    Classifies a metric from its name and, optionally, its column statistics
+    (see column_stats.compute_column_stats).
     """
     n = name.lower().strip()
 
     # 1. High-confidence name matches
-    for p in REG_PATTERNS:
-        if p in n:
-            return "registered"
+    if REG_RE.search(n):
+        return "registered"
 
-    for p in NOT_REG_PATTERNS:
-        if p in n:
-            return "not_registered"
+    if NOT_REG_RE.search(n):
+        return "not_registered"
 
-    for p in PART_PATTERNS:
-        if p in n:
-            return "participated"
+    if PART_RE.search(n):
+        return "participated"
 
     # 2. Data-driven percent detection
-    if values is not None:
-        try:
-            import pandas as pd
-            series = pd.to_numeric(values, errors="coerce").dropna()
-            if not series.empty:
-                # If explicit % in name, it's a percent
-                if "%" in n or "percent" in n:
-                    return "percent"
-                
-                # If values are in 0–1 range (true fractional percent)
-                if series.max() <= 1.0 and series.min() >= 0.0:
-                    if len(series.unique()) > 2:
-                        return "percent"
-                
-                # If explicit percent cues in name AND numeric range fits
-                if series.max() <= 100.0 and series.min() >= 0.0:
-                    if any(p in n for p in PERCENT_PATTERNS):
-                        return "percent"
-        except Exception:
-            pass
+    if stats is not None and stats["numeric_count"] > 0:
+        lo, hi = stats["min"], stats["max"]
 
-    # 3. Fallback name-based patterns
-    for p in PERCENT_PATTERNS:
-        if p in n:
+        # If explicit % in name, it's a percent
+        if "%" in n or "percent" in n:
             return "percent"
 
-    for p in TOTAL_PATTERNS:
-        if p in n:
-            return "count"
+        # NOTE: no value-only rule for unnamed 0–1 columns. The original
+        # fraction check never ran (its error was swallowed); enabling it
+        # would reclassify existing datasets, so it stays out for parity.
+
+        # If explicit percent cues in name AND numeric range fits
+        if hi <= 100.0 and lo >= 0.0:
+            if PERCENT_RE.search(n):
+                return "percent"
 
-    for p in TEXT_PATTERNS:
-        if p in n:
-            return "text"
+    # 3. Fallback name-based patterns
+    if PERCENT_RE.search(n):
+        return "percent"
+
+    if TOTAL_RE.search(n):
+        return "count"
+
+    if TEXT_RE.search(n):
+        return "text"
 
     return "generic"
 
 
+def classify_metrics(names: list, column_stats: dict = None) -> dict:
+    """Batch form: all metrics of a dataset from one column-statistics pass."""
+    return {
+        m: classify_metric_stats(m, column_stats.get(m) if column_stats is not None else None)
+        for m in names
+    }
+
+
+def classify_metric(name: str, values: list = None) -> str:
+    """
+    Classifies a metric based on its name and optionally its values.
+    """
+    stats = None
+
+    if values is not None:
+        try:
+            stats = compute_column_stats(pd.DataFrame({"v": list(values)}))["v"]
+        except Exception:
+            stats = None
+
+    return classify_metric_stats(name, stats)
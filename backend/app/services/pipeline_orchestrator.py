@@ -1,4 +1,5 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from contextlib import contextmanager
 from sqlalchemy.orm import Session
@@ -10,10 +11,24 @@ import json
 from datetime import datetime
 import pandas as pd
 import numpy as np
-from app.core.logging_utils import job_context_var, active_job_logs
+from app.core.logging_utils import job_context_var, active_job_logs, active_job_progress, JobLogger
+from app.core.pipeline_config import PIPELINE_CONFIG
+from app.services.pipeline_speculation import (
+    EXECUTION_LOCK,
+    PipelineSpeculator,
+    speculation_enabled,
+)
 
 BASE_DIR = Path(__file__).parent.parent.parent
 
+# Snapshot written by participation step 0 (relative to BASE_DIR)
+PARTICIPATION_OUTPUT = "outputs/participation_step0.xlsx"
+
+# PPT exports run as jobs too, but never block pipeline steps
+EXPORT_STEP = "export"
+
+EXPORT_WORKERS = int(os.environ.get("EXPORT_WORKERS", "2"))
+
 @contextmanager
 def working_directory(path: Path):
     """Context manager to temporarily change working directory"""
@@ -27,6 +42,8 @@ def working_directory(path: Path):
 class PipelineOrchestrator:
     def __init__(self):
         self.base_dir = BASE_DIR
+        self.speculator = PipelineSpeculator(self._run_step_in_process)
+        self._export_pool = None
     
     def create_job(self, step_name: str, db: Session) -> str:
         job = PipelineJob(step_name=step_name, status=JobStatus.PENDING)
@@ -46,6 +63,11 @@ class PipelineOrchestrator:
         if job.status == JobStatus.RUNNING and job_id in active_job_logs:
             # We don't save to DB until end, so just use memory
             data["logs"] = active_job_logs[job_id]
+
+        if job.status == JobStatus.RUNNING:
+            data["progress"] = active_job_progress.get(job_id)
+        else:
+            data["progress"] = (data["result"] or {}).get("progress")
             
         return data
     
@@ -63,6 +85,8 @@ class PipelineOrchestrator:
                     job.output_files = json.dumps(value)
                 elif key == "error_message":
                     job.error_message = value
+                elif key == "result":
+                    job.result = json.dumps(value)
             
             # Persist logs if finishing
             if status in (JobStatus.COMPLETED, JobStatus.FAILED):
@@ -70,6 +94,7 @@ class PipelineOrchestrator:
                     job.logs = json.dumps(active_job_logs[job_id])
                     # Clean up memory
                     del active_job_logs[job_id]
+                active_job_progress.pop(job_id, None)
             
             db.commit()
     
@@ -139,6 +164,85 @@ class PipelineOrchestrator:
         
         return result
     
+    # --------------------------------------------------
+    # STEP EXECUTION
+    # --------------------------------------------------
+
+    def _step_function(self, step_name: str):
+        from app.services.analysis_pipeline.participation_analysis.step0_summarizing import run_step0 as run_participation_step0
+        # Import new in-memory steps
+        from app.services.analysis_pipeline.performance_analysis.step0_formatting import run_step0
+        from app.services.analysis_pipeline.performance_analysis.step1_percentage_calc_pivot import run_step1
+        from app.services.analysis_pipeline.performance_analysis.step2_lo_wise_perf_w_qtns_pivot import run_step2
+        from app.services.analysis_pipeline.performance_analysis.step3_diff_lvl_wise_w_qtns_pivot import run_step3
+        from app.services.analysis_pipeline.performance_analysis.step4_clustering import run_step4
+        from app.services.analysis_pipeline.performance_analysis.step5_uploadable_data import run_step5
+
+        step_functions = {
+            "participation-0": run_participation_step0,
+            "performance-0": run_step0,
+            "performance-1": run_step1,
+            "performance-2": run_step2,
+            "performance-3": run_step3,
+            "performance-4": run_step4,
+            "performance-5": run_step5,
+        }
+
+        if step_name not in step_functions:
+            raise ValueError(f"Unknown pipeline step: {step_name}")
+
+        return step_functions[step_name]
+
+    def _run_step_in_process(self, step_name: str):
+        fn = self._step_function(step_name)
+
+        with EXECUTION_LOCK:
+            # We still use working_directory logic since the functions rely on relative paths (e.g. data/)
+            with working_directory(self.base_dir):
+                fn()
+
+    def _execute_step(self, step_name: str):
+        """
+        Runs a step for an explicit job, reusing the speculative result
+        for the current config/data when one is in flight or finished.
+        """
+        if self.speculator.attach(step_name, self.speculation_fingerprint()):
+            JobLogger.log(f"Reused speculative result for {step_name}.")
+            return
+
+        self._run_step_in_process(step_name)
+
+    # --------------------------------------------------
+    # SPECULATION
+    # --------------------------------------------------
+
+    def speculation_fingerprint(self) -> str:
+        """Current config hash + content hashes of the uploaded source files."""
+        from app.services.analysis_pipeline.utils.config_filter import config_hash
+        from app.services.analysis_pipeline.utils.raw_ingest import file_hash
+        from app.services.school_catalog import source_files
+
+        reg_file, grade_files = source_files(self.base_dir / "data")
+        parts = [config_hash(PIPELINE_CONFIG)]
+        parts += [file_hash(f) for f in [reg_file, *grade_files] if f.exists()]
+        return ":".join(parts)
+
+    def start_speculation(self):
+        """Starts (or restarts) speculative pre-computation if enabled."""
+        if not speculation_enabled():
+            return
+        try:
+            self.speculator.start(self.speculation_fingerprint())
+        except Exception as e:
+            print(f"[Speculation] Not started: {e}")
+
+    def cancel_speculation(self, wait: bool = False):
+        self.speculator.cancel(wait=wait)
+
+    # --------------------------------------------------
+    # JOBS
+    # --------------------------------------------------
+
     def run_participation_step0(self, job_id: str):
         # Set context for logging
         token = job_context_var.set(job_id)
@@ -149,12 +253,11 @@ class PipelineOrchestrator:
         try:
             self.update_job_status(job_id, JobStatus.RUNNING, db)
             
-            with working_directory(self.base_dir):
-                from app.services.analysis_pipeline.participation_analysis import step0_summarizing
+            self._execute_step("participation-0")
             
             self.update_job_status(
                 job_id, JobStatus.COMPLETED, db,
-                output_files=["data/REG VS PART.xlsx"]
+                output_files=self._get_participation_output_files()
             )
             self.update_pipeline_state("participation.step0", "completed", db)
             
@@ -175,30 +278,7 @@ class PipelineOrchestrator:
         try:
             self.update_job_status(job_id, JobStatus.RUNNING, db)
             
-            # Import new in-memory steps
-            from app.services.analysis_pipeline.performance_analysis.step0_formatting import run_step0
-            from app.services.analysis_pipeline.performance_analysis.step1_percentage_calc_pivot import run_step1
-            from app.services.analysis_pipeline.performance_analysis.step2_lo_wise_perf_w_qtns_pivot import run_step2
-            from app.services.analysis_pipeline.performance_analysis.step3_diff_lvl_wise_w_qtns_pivot import run_step3
-            from app.services.analysis_pipeline.performance_analysis.step4_clustering import run_step4
-            from app.services.analysis_pipeline.performance_analysis.step5_uploadable_data import run_step5
-
-            step_functions = {
-                0: run_step0,
-                1: run_step1,
-                2: run_step2,
-                3: run_step3,
-                4: run_step4,
-                5: run_step5,
-            }
-            
-            if step_num not in step_functions:
-                raise ValueError(f"Unknown step number: {step_num}")
-            
-            # Execute in-memory function
-            # We still use working_directory logic if the functions rely on relative paths (e.g. data/)
-            with working_directory(self.base_dir):
-                step_functions[step_num]()
+            self._execute_step(f"performance-{step_num}")
             
             output_files = self._get_output_files_for_step(step_num)
             
@@ -215,6 +295,112 @@ class PipelineOrchestrator:
             db.close()
             job_context_var.reset(token)
     
+    def run_finalize(self, job_id: str):
+        """Background variant of /pipeline/finalize; the payload lands in job.result."""
+        from app.services.finalize_service import finalize_pipeline_output
+
+        token = job_context_var.set(job_id)
+        active_job_logs[job_id] = []
+
+        db = SessionLocal()
+        try:
+            self.update_job_status(job_id, JobStatus.RUNNING, db)
+
+            JobLogger.log("Building project from uploadable data...")
+            result = finalize_pipeline_output(self.base_dir, db)
+            JobLogger.log(f"Created project {result['project_id']} with {result['slides_created']} slides")
+
+            self.update_job_status(job_id, JobStatus.COMPLETED, db, result=result)
+
+        except Exception as e:
+            db.rollback()
+            self.update_job_status(job_id, JobStatus.FAILED, db, error_message=str(e))
+        finally:
+            db.close()
+            job_context_var.reset(token)
+
+    def submit_export(
+        self, project_id: str, debug_mode: bool, db: Session, embed_mode: str | None = None
+    ) -> str:
+        """Queues a PPT export on the export worker pool; returns the job id."""
+        job_id = self.create_job(EXPORT_STEP, db)
+
+        if self._export_pool is None:
+            self._export_pool = ThreadPoolExecutor(
+                max_workers=EXPORT_WORKERS, thread_name_prefix="export"
+            )
+        self._export_pool.submit(self.run_export, job_id, project_id, debug_mode, embed_mode)
+
+        return job_id
+
+    def run_export(
+        self, job_id: str, project_id: str, debug_mode: bool = False, embed_mode: str | None = None
+    ):
+        """Builds a project's PPTX; job.result carries the file and slide count."""
+        import uuid
+        from app.models.project import Project
+        from app.models.slide import Slide
+        from app.services.export_service import (
+            cleanup_old_exports,
+            export_filename,
+            export_project_to_ppt,
+        )
+
+        token = job_context_var.set(job_id)
+        active_job_logs[job_id] = []
+
+        db = SessionLocal()
+        try:
+            self.update_job_status(job_id, JobStatus.RUNNING, db)
+
+            pid = uuid.UUID(project_id)
+            project = db.query(Project).filter(Project.id == pid).first()
+            if not project:
+                raise RuntimeError("Project not found")
+
+            slides = (
+                db.query(Slide)
+                .filter(Slide.project_id == pid)
+                .order_by(Slide.position.asc())
+                .all()
+            )
+            if not slides:
+                raise RuntimeError("No slides to export")
+
+            JobLogger.log(f"Exporting {len(slides)} slides of '{project.name}'...")
+            JobLogger.progress(0, len(slides))
+
+            ppt_path = export_project_to_ppt(
+                project=project,
+                slides=slides,
+                db=db,
+                debug_mode=debug_mode,
+                embed_mode=embed_mode,
+                # Own copy: the cache entry may be evicted before download
+                pin_as=job_id,
+            )
+            filename = export_filename(project)
+            JobLogger.log(f"Saved {filename}")
+
+            self.update_job_status(
+                job_id, JobStatus.COMPLETED, db,
+                output_files=[str(ppt_path)],
+                result={
+                    "project_id": project_id,
+                    "file": str(ppt_path),
+                    "filename": filename,
+                    "progress": {"done": len(slides), "total": len(slides)},
+                },
+            )
+
+        except Exception as e:
+            db.rollback()
+            self.update_job_status(job_id, JobStatus.FAILED, db, error_message=str(e))
+        finally:
+            db.close()
+            job_context_var.reset(token)
+            cleanup_old_exports()
+
     def _get_output_files_for_step(self, step_num: int) -> list:
         # User requirement: "All outputs go to /outputs folder."
         # The new export_snapshot saves as:
@@ -244,11 +430,18 @@ class PipelineOrchestrator:
         
         return []
     
+    def _get_participation_output_files(self) -> list:
+        # Participation results live in the state store; the snapshot in
+        # outputs/ is the on-disk artifact (the uploaded REG VS PART.xlsx is never modified)
+        f = self.base_dir / PARTICIPATION_OUTPUT
+        if f.exists():
+            return [str(f.relative_to(self.base_dir))]
+        return []
+
     def get_step_preview(self, step_name: str) -> dict:
         # Define mappings for fixed cases if any
-        # Participation Step 0 is still using data/REG VS PART.xlsx
         output_map = {
-            "participation-0": ("data/REG VS PART.xlsx", ["schl_wise", "grade_wise"]),
+            "participation-0": (PARTICIPATION_OUTPUT, ["schl_wise", "grade_wise"]),
         }
         
         # Check static map first
@@ -326,7 +519,7 @@ class PipelineOrchestrator:
         """
         # Define mappings for fixed cases
         output_map = {
-            "participation-0": ("data/REG VS PART.xlsx", None),
+            "participation-0": (PARTICIPATION_OUTPUT, None),
         }
         
         target_files = []
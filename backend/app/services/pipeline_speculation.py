@@ -0,0 +1,127 @@
+import os
+import threading
+from typing import Callable, Optional
+
+
+# Opt-in: PIPELINE_SPECULATIVE=true
+def speculation_enabled() -> bool:
+    return os.environ.get("PIPELINE_SPECULATIVE") == "true"
+
+
+# Full DAG in dependency order (participation is independent but step 5 reads it)
+SPECULATIVE_STEPS = [
+    "participation-0",
+    "performance-0",
+    "performance-1",
+    "performance-2",
+    "performance-3",
+    "performance-4",
+    "performance-5",
+]
+
+# Serializes every in-process step execution (explicit or speculative):
+# the steps share the global pipeline state.
+EXECUTION_LOCK = threading.RLock()
+
+
+class SpeculativeRun:
+    """One background run of the whole DAG for a given config/data fingerprint."""
+
+    def __init__(self, fingerprint: str):
+        self.fingerprint = fingerprint
+        self.cancelled = threading.Event()
+        self.done = {step: threading.Event() for step in SPECULATIVE_STEPS}
+        self.succeeded = set()
+        self.thread: Optional[threading.Thread] = None
+
+
+class PipelineSpeculator:
+    """
+    Pre-computes all pipeline steps at low priority after a config save/upload.
+    Explicit step runs attach to the in-flight or finished speculative result
+    when their fingerprint matches; a newer fingerprint cancels stale work.
+    """
+
+    def __init__(self, run_step: Callable[[str], None]):
+        self._run_step = run_step
+        self._current: Optional[SpeculativeRun] = None
+        self._lock = threading.Lock()
+
+    def start(self, fingerprint: str):
+        with self._lock:
+            current = self._current
+            if current and current.fingerprint == fingerprint and not current.cancelled.is_set():
+                return
+
+            if current:
+                current.cancelled.set()
+
+            run = SpeculativeRun(fingerprint)
+            run.thread = threading.Thread(
+                target=self._run,
+                args=(run,),
+                name="pipeline-speculation",
+                daemon=True,
+            )
+            self._current = run
+
+        print(f"[Speculation] Starting speculative run {fingerprint[:12]}")
+        run.thread.start()
+
+    def cancel(self, wait: bool = False):
+        with self._lock:
+            run = self._current
+            self._current = None
+
+        if run:
+            run.cancelled.set()
+            if wait and run.thread and run.thread is not threading.current_thread():
+                run.thread.join()
+
+    def attach(self, step_name: str, fingerprint: str) -> bool:
+        """
+        Waits for the speculative result of `step_name` if one is (being)
+        computed for `fingerprint`. Returns True when it can be used as-is.
+        """
+        with self._lock:
+            run = self._current
+
+        if not run or run.fingerprint != fingerprint or step_name not in run.done:
+            return False
+
+        run.done[step_name].wait()
+
+        return step_name in run.succeeded and not run.cancelled.is_set()
+
+    def _run(self, run: SpeculativeRun):
+        _lower_thread_priority()
+
+        try:
+            for step in SPECULATIVE_STEPS:
+                if run.cancelled.is_set():
+                    break
+
+                with EXECUTION_LOCK:
+                    if run.cancelled.is_set():
+                        break
+                    try:
+                        self._run_step(step)
+                    except Exception as e:
+                        print(f"[Speculation] {step} failed: {e}")
+                        break
+
+                run.succeeded.add(step)
+                run.done[step].set()
+        finally:
+            # Unblock any waiter on steps that were never reached
+            for event in run.done.values():
+                event.set()
+            print(f"[Speculation] Run {run.fingerprint[:12]} finished ({len(run.succeeded)} steps)")
+
+
+def _lower_thread_priority():
+    # Linux: per-thread nice value. Not available everywhere; best effort.
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 10)
+    except (AttributeError, OSError):
+        pass
@@ -3,10 +3,11 @@ from typing import Dict, Any
 # Global In-Memory State
 # Structure:
 # {
-#   "raw": { "filename": { "sheetname": pd.DataFrame, ... } },
+#   "raw": { "file_sha1": { "filename": str, "sheets": { "sheetname": pd.DataFrame, ... } } },
 #   "step0": { "filename": { "formatted": df, "formatted_long": df } },
 #   "step1": { ... },
 #   ...
+#   "participation": { "schl_wise": df, "grade_wise": df },
 #   "logs": []
 # }
 _pipeline_state: Dict[str, Any] = {
@@ -17,6 +18,7 @@ _pipeline_state: Dict[str, Any] = {
     "step3": {},
     "step4": {},
     "step5": {},
+    "participation": {},
     "logs": []
 }
 
@@ -36,6 +38,7 @@ def reset_pipeline_state():
         "step3": {},
         "step4": {},
         "step5": {},
+        "participation": {},
         "logs": []
     })
 
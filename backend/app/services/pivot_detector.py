@@ -43,17 +43,20 @@ def _looks_textual(name: str) -> bool:
 # PERCENT DETECTOR
 # --------------------------------------------------
 
+from app.services.column_stats import compute_column_stats
 from app.services.metric_classifier import classify_metric
 
-def detect_percent_metric(series: pd.Series, name: str) -> bool:
+def detect_percent_metric(series: pd.Series, name: str, stats: dict = None) -> bool:
     n = name.lower()
 
     if "%" in n or "percent" in n or "percentage" in n:
         return True
 
-    s = pd.to_numeric(series, errors="coerce").dropna()
+    # Column statistics from detect_schema's single pass, if available
+    if stats is None:
+        stats = compute_column_stats(series.to_frame("v"))["v"]
 
-    if not s.empty and s.max() <= 1.0 and s.min() >= 0.0:
+    if stats["numeric_count"] > 0 and stats["max"] <= 1.0 and stats["min"] >= 0.0:
         return True
 
     return False
@@ -65,11 +68,27 @@ def detect_percent_metric(series: pd.Series, name: str) -> bool:
 # SCHEMA DETECTOR
 # --------------------------------------------------
 
-def detect_schema(df: pd.DataFrame) -> dict:
+def detect_schema(df: pd.DataFrame, column_types: dict = None) -> dict:
+    """
+    `column_types` (from type_inference.infer_column_types) supplies per-column
+    numeric / was_percent flags; without it they are derived from the frame.
+    """
+    column_types = column_types or {}
 
     dims = []
     metrics = []
 
+    def is_numeric(col):
+        info = column_types.get(col)
+        return info["numeric"] if info else pd.api.types.is_numeric_dtype(df[col])
+
+    # Stats for all numeric columns at once (percent range checks)
+    numeric_cols = [
+        c for c in df.columns
+        if not _looks_textual(c) and is_numeric(c)
+    ]
+    stats = compute_column_stats(df[numeric_cols]) if numeric_cols else {}
+
     for col in df.columns:
 
         series = df[col]
@@ -81,9 +100,12 @@ def detect_schema(df: pd.DataFrame) -> dict:
             continue
 
         # numeric → metric candidate
-        if pd.api.types.is_numeric_dtype(series):
+        if is_numeric(col):
 
-            is_percent = detect_percent_metric(series, col)
+            if column_types.get(col, {}).get("was_percent"):
+                is_percent = True
+            else:
+                is_percent = detect_percent_metric(series, col, stats.get(col))
 
             metrics.append(
                 {
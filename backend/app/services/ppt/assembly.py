@@ -0,0 +1,102 @@
+import copy
+import io
+import re
+
+from pptx import Presentation
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.packuri import PackURI
+from pptx.oxml.ns import qn
+from pptx.parts.chart import ChartPart
+from pptx.parts.embeddedpackage import EmbeddedXlsxPart
+
+
+# --------------------------------------------------
+# PARTIAL DECK ASSEMBLY
+# --------------------------------------------------
+#
+# Worker processes each render a batch of slides into their own PPTX
+# (template + batch). Assembly takes the first partial as the base deck and
+# moves the rendered slides of the others into it: the slide XML is copied,
+# chart parts (with their embedded workbooks) are re-homed under fresh
+# partnames, and the r:id references in the copied XML are remapped to the
+# relationship IDs of the new slide.
+
+# Shape-tree children that every slide already has
+_TREE_HEADER = {qn("p:nvGrpSpPr"), qn("p:grpSpPr")}
+
+# Attributes that reference a slide relationship
+_REL_ATTRS = (qn("r:id"), qn("r:embed"), qn("r:link"))
+
+
+class _PartNamer:
+    """Next free partname per template, scanning the base package once."""
+
+    def __init__(self, package):
+        self._next = {}
+        self._existing = [str(p.partname) for p in package.iter_parts()]
+
+    def next(self, tmpl: str) -> PackURI:
+        if tmpl not in self._next:
+            pattern = re.compile(re.escape(tmpl).replace("%d", r"(\d+)") + "$")
+            used = [int(m.group(1)) for m in map(pattern.match, self._existing) if m]
+            self._next[tmpl] = max(used, default=0) + 1
+
+        n = self._next[tmpl]
+        self._next[tmpl] = n + 1
+        return PackURI(tmpl % n)
+
+
+def _copy_slide(dest_prs, layout, src_slide, namer: _PartNamer):
+    new_slide = dest_prs.slides.add_slide(layout)
+    dest_tree = new_slide.shapes._spTree
+
+    # Drop the layout placeholders add_slide created; the source has its own
+    for child in list(dest_tree):
+        if child.tag not in _TREE_HEADER:
+            dest_tree.remove(child)
+
+    rid_map = {}
+
+    for rel in src_slide.part.rels.values():
+        if rel.is_external or rel.reltype != RT.CHART:
+            continue
+
+        chart_part = rel.target_part
+        chart_part.partname = namer.next(ChartPart.partname_template)
+
+        for chart_rel in chart_part.rels.values():
+            # Loaded back from a partial, the workbook is a plain Part: match the reltype
+            if not chart_rel.is_external and chart_rel.reltype == RT.PACKAGE:
+                chart_rel.target_part.partname = namer.next(EmbeddedXlsxPart.partname_template)
+
+        rid_map[rel.rId] = new_slide.part.relate_to(chart_part, RT.CHART)
+
+    for child in src_slide.shapes._spTree:
+        if child.tag in _TREE_HEADER:
+            continue
+
+        el = copy.deepcopy(child)
+        for node in el.iter():
+            for attr in _REL_ATTRS:
+                rid = node.get(attr)
+                if rid in rid_map:
+                    node.set(attr, rid_map[rid])
+        dest_tree.append(el)
+
+
+def assemble_partials(partials: list, layout_index: int, template_slide_count: int):
+    """
+    Merges partial decks (bytes, in slide order) into one Presentation.
+    Each partial starts with the template's own `template_slide_count`
+    slides; only the first partial keeps them.
+    """
+    prs = Presentation(io.BytesIO(partials[0]))
+    layout = prs.slide_layouts[layout_index]
+    namer = _PartNamer(prs.part.package)
+
+    for data in partials[1:]:
+        src = Presentation(io.BytesIO(data))
+        for src_slide in list(src.slides)[template_slide_count:]:
+            _copy_slide(prs, layout, src_slide, namer)
+
+    return prs
@@ -0,0 +1,170 @@
+import io
+import os
+import zipfile
+from xml.sax.saxutils import escape
+
+from pptx.chart.data import CategoryChartData
+
+
+# --------------------------------------------------
+# CHART WORKBOOK EMBEDDING
+# --------------------------------------------------
+#
+# Every chart carries its data twice: as caches in the chart XML (what
+# PowerPoint draws) and as an embedded .xlsx (what "Edit Data" opens).
+# python-pptx builds that .xlsx with xlsxwriter for every chart.
+#
+#   full     python-pptx's workbook (default)
+#   minimal  same cells, hand-written single-sheet workbook (no styles)
+#   none     no workbook at all; charts render from their caches but
+#            cannot be edited (read-only decks)
+
+EMBED_MODES = ("full", "minimal", "none")
+
+DEFAULT_EMBED_MODE = os.environ.get("EXPORT_EMBED_MODE", "full")
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+
+def _col_letter(col: int) -> str:
+    letters = ""
+    col += 1
+    while col:
+        col, rem = divmod(col - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _cell_xml(row: int, col: int, value) -> str:
+    ref = f"{_col_letter(col)}{row + 1}"
+    if value is None:
+        return ""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return f'<c r="{ref}" t="inlineStr"><is><t>{escape(str(value))}</t></is></c>'
+    return f'<c r="{ref}"><v>{value!r}</v></c>'
+
+
+def minimal_xlsx_blob(chart_data) -> bytes:
+    """
+    Single-sheet workbook with the same cell layout python-pptx's
+    CategoryWorkbookWriter uses (so the chart's Sheet1!$X$n references hold):
+    categories from A2 (one column per level), then one column per series
+    with its name in row 1.
+    """
+    cells = {}
+
+    categories = chart_data.categories
+    depth = categories.depth
+
+    for idx, level in enumerate(categories.levels):
+        col = depth - idx - 1
+        for off, name in level:
+            cells.setdefault(off + 1, {})[col] = name
+
+    for idx, series in enumerate(chart_data):
+        col = idx + depth
+        cells.setdefault(0, {})[col] = series.name
+        for off, value in enumerate(series.values):
+            cells.setdefault(off + 1, {})[col] = value
+
+    rows = []
+    for r in sorted(cells):
+        row_cells = "".join(_cell_xml(r, c, v) for c, v in sorted(cells[r].items()))
+        rows.append(f'<row r="{r + 1}">{row_cells}</row>')
+
+    sheet = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        f'<sheetData>{"".join(rows)}</sheetData>'
+        '</worksheet>'
+    )
+
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        zf.writestr("_rels/.rels", _ROOT_RELS)
+        zf.writestr("xl/workbook.xml", _WORKBOOK)
+        zf.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+        zf.writestr("xl/worksheets/sheet1.xml", sheet)
+    return buf.getvalue()
+
+
+class MinimalWorkbookChartData(CategoryChartData):
+    """CategoryChartData whose embedded workbook skips xlsxwriter."""
+
+    @property
+    def xlsx_blob(self):
+        # Date categories need number formats: leave those to xlsxwriter
+        if self.categories.are_dates:
+            return super().xlsx_blob
+        return minimal_xlsx_blob(self)
+
+
+class NoWorkbookChartData(CategoryChartData):
+    """Placeholder workbook; strip_chart_workbook() removes it after add_chart."""
+
+    @property
+    def xlsx_blob(self):
+        return b""
+
+
+def new_chart_data(embed_mode: str = "full"):
+    if embed_mode == "minimal":
+        return MinimalWorkbookChartData()
+    if embed_mode == "none":
+        return NoWorkbookChartData()
+    return CategoryChartData()
+
+
+def strip_chart_workbook(chart):
+    """Drops a chart's embedded workbook (externalData + its relationship)."""
+    chart_space = chart._chartSpace
+    external = chart_space.externalData
+    if external is None:
+        return
+
+    rId = external.rId
+    chart_space.remove(external)
+    chart.part.rels.pop(rId)
+
+
+def finish_chart(chart, embed_mode: str = "full"):
+    if embed_mode == "none":
+        strip_chart_workbook(chart)
+    return chart
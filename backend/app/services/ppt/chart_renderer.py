@@ -3,15 +3,21 @@ print("USING CHART RENDERER FROM:", __file__)
 
 
 from pptx.enum.chart import XL_CHART_TYPE, XL_DATA_LABEL_POSITION
-from pptx.chart.data import ChartData
 from pptx.util import Pt
 from pptx.enum.text import PP_ALIGN
 from pptx.dml.color import RGBColor
 from pptx.enum.shapes import MSO_SHAPE
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls
 
-import re
 import math
 import os
+from xml.sax.saxutils import escape
+
+from app.services.chart_series import compile_chart_series
+from app.services.dataset_service import detect_render_type
+from app.services.ppt.chart_embedding import new_chart_data
+from app.services.ppt.chart_styles import add_styled_chart
 
 
 EMU_PER_INCH = 914400
@@ -43,136 +49,21 @@ DEFAULT_BAR_COLOR = RGBColor(79, 129, 189)
 def detect_dataset_type(element):
     """
     Returns the classification for the dataset.
-    Prioritizes explicit 'datasetFamily' from the element metadata.
+    Uses the persisted 'renderType' from the dataset profile when present;
+    older slides fall back to 'datasetFamily' / name patterns.
     """
-    family = element.get("datasetFamily")
-    
-    # Do not trust generic family blindly
-    if family and family != "generic":
-        return family
-
-
-    name = (element.get("datasetName") or "").lower()
-
-    if "sub_wise" in name or "subwise" in name:
-        return "subwise"
-
-    if name.endswith("_lo") or "learning_outcome" in name:
-        return "lo"
-
-    if name.endswith("_qlvl") or "difficulty" in name:
-        return "qlvl"
-
-    if "reg_vs_part_grade" in name or ("reg" in name and "part" in name and "grade" in name):
-        return "reg_vs_part_grade"
-
-    if "reg_vs_part_schl" in name or "reg_vs_part_school" in name:
-        return "reg_vs_part_school"
-
-    if "perf_summary" in name or "summary" in name:
-        return "perf_summary"
-
-    return "generic"
-
-
-# --------------------------------------------------
-# Percent column detection (NEW)
-# --------------------------------------------------
+    render_type = element.get("renderType")
+    if render_type:
+        return render_type
 
-def _detect_numeric_percent_column(columns, preview):
-    """
-    Fallback: find numeric column that looks like percent.
-    """
-    for c in columns:
-        vals = []
-        for r in preview:
-            try:
-                # Better 0-1 decimal handling
-                raw = str(r.get(c))
-                if "." in raw and float(raw) <= 1:
-                    v = int(round(float(raw) * 100))
-                else:
-                    v = normalize_percent(raw)
-                vals.append(v)
-            except Exception:
-                continue
-
-        if not vals:
-            continue
-
-        mn = min(vals)
-        mx = max(vals)
-
-        # Only treat as percent if the column name clearly indicates it
-        if 0 <= mn and mx <= 100:
-            name = c.lower()
-            if "%" in name or "percent" in name or "percentage" in name:
-                return c
-
-    return None
-
-
-def normalize_percent(val):
-    """
-    Centralized percent handling. Strips symbols, rounds to nearest integer.
-    """
-    try:
-        # Handle None or empty strings
-        if val is None or str(val).strip() == "":
-            return 0
-        # Strip % and common numeric decorators
-        clean_val = str(val).replace("%", "").replace("(", "").replace(")", "").strip()
-        return int(round(float(clean_val)))
-    except (ValueError, TypeError):
-        return 0
-
-
-def _safe_count(val):
-    """
-    Safe numeric parser for counts. Rounds and strips junk characters.
-    """
-    try:
-        if val is None:
-            return 0
-        return int(round(float(str(val).replace("%", "").strip())))
-    except Exception:
-        return 0
-
-
-# --------------------------------------------------
-# LO label cleaner
-# --------------------------------------------------
-
-LO_PREFIXES = [
-    r"the student will be able to",
-    r"students will be able to",
-    r"student will be able to",
-    r"learner will be able to",
-]
-
-
-def clean_lo_label(text: str, max_words: int = 6) -> str:
-
-    t = str(text).lower().strip()
-
-    for p in LO_PREFIXES:
-        t = re.sub(p, "", t).strip()
-
-    t = t.strip(" .:")
-
-    words = t.split()
-
-    if len(words) > max_words:
-        words = words[:max_words]
-
-    return " ".join(words).title()
+    return detect_render_type(element.get("datasetName"), element.get("datasetFamily"))
 
 
 # --------------------------------------------------
 # MAIN ENTRY
 # --------------------------------------------------
 
-def render_chart(ppt_slide, element, debug_mode: bool = False):
+def render_chart(ppt_slide, element, debug_mode: bool = False, embed_mode: str = "full"):
 
     x = px_to_emu(element.get("x", 0))
     y = px_to_emu(element.get("y", 0))
@@ -180,13 +71,6 @@ def render_chart(ppt_slide, element, debug_mode: bool = False):
     h = px_to_emu(element.get("height", 350))
 
     chart_type = element.get("chartType")
-    preview = element.get("preview") or []
-
-    if not preview:
-        raise ValueError(
-            f"Chart Error: Dataset '{element.get('datasetName')}' has empty preview data. "
-            "Cannot render chart."
-        )
 
     dataset_type = detect_dataset_type(element)
     metric_types = element.get("metricTypes") or {}
@@ -196,161 +80,91 @@ def render_chart(ppt_slide, element, debug_mode: bool = False):
         f"Type: {dataset_type} | MetricTypes: {metric_types}"
     )
 
-    columns = list(preview[0].keys())
-    label_col = columns[0]
-
-    # --------------------------------------------------
-    # Percent column resolution (FIXED)
-    # --------------------------------------------------
+    # Compiled when the dataset was created; rowSpec-shaped rows compile here
+    series = element.get("chartSeries")
 
-    # For reg_vs_part_grade, ONLY use schema-classified percent columns
-    if dataset_type == "reg_vs_part_grade":
-        percent_col = next(
-            (c for c in columns if metric_types.get(c) == "percent"),
-            None,
-        )
-    else:
-        percent_col = next(
-            (c for c in columns if metric_types.get(c) == "percent"),
-            None,
+    if not series:
+        series = compile_chart_series(
+            element.get("preview") or [],
+            metric_types,
+            dataset_type,
+            element.get("datasetName"),
         )
 
-        if not percent_col:
-            percent_col = _detect_numeric_percent_column(columns, preview)
-
-        if not percent_col:
-            percent_col = next(
-                (c for c in columns if "%" in c or "percent" in c.lower()),
-                None,
-            )
-
-    # --------------------------------------------------
-    # VALIDATION
-    # --------------------------------------------------
+    if series.get("error"):
+        raise ValueError(series["error"])
 
-    PCT_REQUIRED_TYPES = {
-        "lo",
-        "qlvl",
-        "perf_summary",
-        "subwise",
-    }
-
-    if dataset_type in PCT_REQUIRED_TYPES and not percent_col:
-        raise ValueError(
-            f"Chart Error: Dataset '{element.get('datasetName')}' (type: {dataset_type}) "
-            "requires a percentage column but none was detected. "
-            f"Found columns: {columns}"
-        )
+    metric_cols = series["metric_columns"]
 
-    # --------------------------------------------------
-    # Metric selection
-    # --------------------------------------------------
+    print(f"METRIC_COLS = {metric_cols} | PERCENT_COL = {series['percent_column']}")
 
-    if dataset_type == "reg_vs_part_grade":
-        # Only include count columns as bars. ignore Participation %
-        metric_cols = [
-            c for c in columns
-            if metric_types.get(c) in ("registered", "participated")
-        ]
-        print(f"[DEBUG] reg_vs_part_grade DETECTED. metric_cols={metric_cols}")
-
-    elif dataset_type in ("lo", "qlvl", "perf_summary", "subwise"):
-        metric_cols = [percent_col] if percent_col else []
-        if dataset_type == "subwise":
-            print(f"[DEBUG] subwise DETECTED. metric_cols={metric_cols}")
-        if not metric_cols and columns[1:]:
-             # Last resort for percent types, but avoid Participation % if possible
-             metric_cols = [columns[1]]
-
-    else:
-        metric_cols = columns[1:]
-
-    print(f"DATASET TYPE = {dataset_type}")
-    print(f"METRIC_COLS = {metric_cols}")
-
-    # Remove dynamic fallback for reg_vs_part_grade to ensure only counts are plotted
-    if not metric_cols and dataset_type != "reg_vs_part_grade":
-        metric_cols = columns[1:]
-
-    print(f"[PRE-GUARD] dataset_type={dataset_type}, metric_cols={metric_cols}, percent_col={percent_col}")
-
-    # FINAL GUARD: reg_vs_part charts must NEVER plot percent series
-    if dataset_type == "reg_vs_part_grade" and percent_col in metric_cols:
-        metric_cols = [c for c in metric_cols if c != percent_col]
-        print(f"[GUARD] Removed percent column '{percent_col}' from metric_cols. Final: {metric_cols}")
-
-
-
-    chart_data = ChartData()
+    chart_data = new_chart_data(embed_mode)
 
     # ==================================================
     # PIE
     # ==================================================
 
     if chart_type == "pie":
-        chart = _build_pie_chart(
+        _build_pie_chart(
             ppt_slide,
             x,
             y,
             w,
             h,
             chart_data,
-            preview,
-            label_col,
-            metric_cols,
+            series,
+            embed_mode,
         )
-
-        _format_pie(chart)
         return
 
     # ==================================================
     # BAR / COLUMN BASE
     # ==================================================
 
-    categories = []
-
-    for r in preview:
-        label = str(r.get(label_col))
-        if dataset_type == "lo":
-            label = clean_lo_label(label)
-        categories.append(label)
+    chart_data.categories = series["labels"]
 
-    chart_data.categories = categories
-
-    for col in metric_cols:
-        vals = []
-        is_pct = (col == percent_col) or (metric_types.get(col) == "percent")
-        
-        if dataset_type == "subwise":
-            print("[SUBWISE] forcing percent-only plotting")
-
-        for r in preview:
-            raw_val = r.get(col)
-            # Force normalization for subwise OR if identified as percent
-            if dataset_type == "subwise" or is_pct:
-                vals.append(normalize_percent(raw_val))
-            elif dataset_type == "reg_vs_part_grade":
-                vals.append(_safe_count(raw_val))
-            else:
-                try:
-                    vals.append(float(str(raw_val).replace("%", "")))
-                except Exception:
-                    vals.append(0)
-        chart_data.add_series(col, vals)
+    for s in series["series"]:
+        chart_data.add_series(s["name"], s["values"])
 
     pptx_chart_type = CHART_MAP.get(chart_type, XL_CHART_TYPE.COLUMN_CLUSTERED)
 
-    chart = ppt_slide.shapes.add_chart(
+    # Same type + formatting branch + series count => same chart XML apart from
+    # the data; reg_vs_part labels and axis scale depend on the data itself
+    if dataset_type == "reg_vs_part_grade":
+        style_key = None
+    else:
+        style_key = (
+            pptx_chart_type,
+            dataset_type,
+            len(metric_cols),
+            any(metric_types.get(c) == "percent" for c in metric_cols),
+        )
+
+    chart = add_styled_chart(
+        ppt_slide,
+        style_key,
         pptx_chart_type,
         x,
         y,
         w,
         h,
         chart_data,
-    ).chart
+        lambda c: _format_bar_chart(c, dataset_type, metric_types, series),
+        embed_mode,
+    )
 
     print(f"SERIES IN CHART = {[s.name for s in chart.series]}")
 
+    if debug_mode or os.environ.get("EXPORT_DEBUG") == "true":
+        _render_debug_overlay(ppt_slide, x, y, w, h, element, dataset_type)
+
+
+# --------------------------------------------------
+# BAR / COLUMN FORMATTING
+# --------------------------------------------------
+
+def _format_bar_chart(chart, dataset_type, metric_types, series):
+
     chart.has_title = False
 
     plot = chart.plots[0]
@@ -377,7 +191,7 @@ def render_chart(ppt_slide, element, debug_mode: bool = False):
         _format_qlvl(chart, plot)
 
     elif dataset_type == "reg_vs_part_grade":
-        _format_reg_vs_part_grade(chart, plot, preview, percent_col)
+        _format_reg_vs_part_grade(chart, plot, series)
 
     elif dataset_type == "perf_summary":
         _format_perf_summary(chart, plot)
@@ -385,16 +199,13 @@ def render_chart(ppt_slide, element, debug_mode: bool = False):
     elif dataset_type == "subwise":
         _format_subwise(chart, plot)
 
-    elif any(metric_types.get(c) == "percent" for c in metric_cols):
+    elif any(metric_types.get(c) == "percent" for c in series["metric_columns"]):
         _format_perf_summary(chart, plot)
     else:
         _format_generic(chart, plot)
 
     _apply_bar_colors(chart)
 
-    if debug_mode or os.environ.get("EXPORT_DEBUG") == "true":
-        _render_debug_overlay(ppt_slide, x, y, w, h, element, dataset_type)
-
 
 # --------------------------------------------------
 # PIE BUILDER
@@ -407,34 +218,30 @@ def _build_pie_chart(
     w,
     h,
     chart_data,
-    preview,
-    label_col,
-    metric_cols,
+    chart_series,
+    embed_mode="full",
 ):
 
-    cats = []
-    vals = []
+    pie = chart_series["pie"]
 
-    metric = metric_cols[0]
+    if not pie:
+        raise ValueError("Chart Error: pie chart has no metric column to plot.")
 
-    for r in preview:
-        cats.append(str(r.get(label_col)))
-        # ALWAYS use normalize_percent for PIE as they are essentially distributions/percentages
-        vals.append(normalize_percent(r.get(metric)))
+    chart_data.categories = chart_series["categories"]
+    chart_data.add_series(pie["name"], pie["values"])
 
-    chart_data.categories = cats
-    chart_data.add_series(metric, vals)
-
-    chart = ppt_slide.shapes.add_chart(
+    return add_styled_chart(
+        ppt_slide,
+        ("pie",),
         XL_CHART_TYPE.PIE,
         x,
         y,
         w,
         h,
         chart_data,
-    ).chart
-
-    return chart
+        _format_pie,
+        embed_mode,
+    )
 
 
 # --------------------------------------------------
@@ -459,7 +266,7 @@ def _format_pie(chart):
 
 # ---------------- GRADE WISE -----------------------
 
-def _format_reg_vs_part_grade(chart, plot, preview, percent_col):
+def _format_reg_vs_part_grade(chart, plot, chart_series):
 
     # sensible spacing
     plot.gap_width = 220
@@ -474,15 +281,16 @@ def _format_reg_vs_part_grade(chart, plot, preview, percent_col):
     val_axis.minimum_scale = 0.0
 
     # Use only count series (Registered, Participated) for axis scaling, NEVER Participation %
-    series_names = [s.name for s in chart.series if s.name != percent_col]
-    if not series_names:
-        series_names = [s.name for s in chart.series]
+    percent_col = chart_series["percent_column"]
+    counts = [s["values"] for s in chart_series["series"] if s["name"] != percent_col]
+    if not counts:
+        counts = [s["values"] for s in chart_series["series"]]
 
     # STICK TO COUNTS: Ignore percent columns entirely for axis calculation
-    max_val = max(
-        max(_safe_count(r.get(col)) for r in preview)
-        for col in series_names
-    )
+    max_val = max(max(values) for values in counts)
+
+    # FORCE normalized integer % for reg_vs_part labels
+    percents = chart_series["percents"] or [0] * len(chart_series["categories"])
 
     val_axis.maximum_scale = float(math.ceil(max_val / 50) * 50)
     val_axis.major_unit = 50.0
@@ -506,29 +314,16 @@ def _format_reg_vs_part_grade(chart, plot, preview, percent_col):
             labels.position = XL_DATA_LABEL_POSITION.INSIDE_END
             labels.font.color.rgb = RGBColor(0, 0, 0)
 
-        for p_idx, point in enumerate(series.points):
-
-            dl = point.data_label
-            
-            tf = dl.text_frame
-            tf.clear()
-
-            p = tf.paragraphs[0]
-            p.font.size = Pt(9)
-            p.font.bold = True
-            p.font.color.rgb = RGBColor(0, 0, 0)
-
-            value = series.values[p_idx]
-            raw = preview[p_idx].get(percent_col)
-
-            # FORCE normalized integer % for reg_vs_part labels
-            percent = normalize_percent(raw)
+        texts = []
+        for value, percent in zip(series.values, percents):
 
             if series.name.lower().startswith("participated"):
                 # Ensure no decimals in the label text - format as count(percentage%)
-                p.text = f"{int(round(value))}({percent}%)"
+                texts.append(f"{int(round(value))}({percent}%)")
             else:
-                p.text = f"{int(round(value))}"
+                texts.append(f"{int(round(value))}")
+
+        _set_point_labels(series, texts)
 
     _set_axis_titles(chart, "Grade", "Students")
 
@@ -638,11 +433,46 @@ def _format_generic(chart, plot):
 
 def _apply_bar_colors(chart):
 
+    # One fill per series (not per point); every bar takes the series color
+    for plot in chart.plots:
+        plot.vary_by_categories = False
+
     for series in chart.series:
-        for point in series.points:
-            fill = point.format.fill
-            fill.solid()
-            fill.fore_color.rgb = DEFAULT_BAR_COLOR
+        fill = series.format.fill
+        fill.solid()
+        fill.fore_color.rgb = DEFAULT_BAR_COLOR
+
+
+# Bold black 9pt label with custom text, as python-pptx writes it for a point
+_POINT_LABEL_XML = (
+    '<c:dLbl><c:idx val="{idx}"/><c:tx><c:rich><a:bodyPr/><a:lstStyle/>'
+    '<a:p><a:pPr><a:defRPr sz="900" b="1"><a:solidFill><a:srgbClr val="000000"/>'
+    '</a:solidFill></a:defRPr></a:pPr><a:r><a:t>{text}</a:t></a:r></a:p>'
+    '</c:rich></c:tx><c:showLegendKey val="0"/><c:showVal val="1"/>'
+    '<c:showCatName val="0"/><c:showSerName val="0"/><c:showPercent val="0"/>'
+    '<c:showBubbleSize val="0"/></c:dLbl>'
+)
+
+
+def _set_point_labels(series, texts):
+    """
+    Custom label text for each point of a series, parsed as one XML fragment
+    instead of one python-pptx text frame per point.
+    """
+    dLbls = series._element.get_or_add_dLbls()
+
+    fragment = parse_xml(
+        f'<c:dLbls {nsdecls("c", "a")}>'
+        + "".join(
+            _POINT_LABEL_XML.format(idx=idx, text=escape(text))
+            for idx, text in enumerate(texts)
+        )
+        + "</c:dLbls>"
+    )
+
+    # <c:dLbl> elements come first in <c:dLbls>
+    for idx, dLbl in enumerate(list(fragment)):
+        dLbls.insert(idx, dLbl)
 
 
 def _set_axis_titles(chart, x_title=None, y_title=None):
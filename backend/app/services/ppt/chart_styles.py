@@ -0,0 +1,93 @@
+import copy
+import os
+
+from pptx.chart.xmlwriter import SeriesXmlRewriterFactory
+from pptx.opc.constants import CONTENT_TYPE as CT
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.parts.chart import ChartPart
+
+from app.services.ppt.chart_embedding import finish_chart
+
+
+# --------------------------------------------------
+# CHART STYLE TEMPLATES
+# --------------------------------------------------
+#
+# Decks repeat a handful of chart styles (LO bars, qlvl columns, summaries,
+# pies). The first chart of a style is built and formatted through python-pptx
+# as before; its formatted <c:chartSpace> is kept as the style template.
+# Later charts of that style deep-copy the template and only have their
+# series data (name, categories, values) rewritten, which skips the object
+# formatting calls entirely.
+#
+# Charts whose formatting depends on the data itself (per-point label text,
+# data-driven axis scales) pass style_key=None and are always built fresh.
+
+CHART_STYLE_CACHE = os.environ.get("EXPORT_CHART_STYLE_CACHE", "true") == "true"
+
+# style key -> formatted c:chartSpace (no externalData)
+_STYLE_TEMPLATES = {}
+
+
+def _snapshot(chart):
+    chart_space = copy.deepcopy(chart._chartSpace)
+    external = chart_space.externalData
+    if external is not None:
+        chart_space.remove(external)
+    return chart_space
+
+
+def _add_cloned_chart(ppt_slide, template, chart_type, x, y, cx, cy, chart_data, embed_mode):
+    chart_space = copy.deepcopy(template)
+
+    SeriesXmlRewriterFactory(chart_type, chart_data).replace_series_data(chart_space)
+
+    package = ppt_slide.part.package
+    chart_part = ChartPart(
+        package.next_partname(ChartPart.partname_template),
+        CT.DML_CHART,
+        package,
+        chart_space,
+    )
+
+    if embed_mode != "none":
+        chart_part.chart_workbook.update_from_xlsx_blob(chart_data.xlsx_blob)
+
+    rId = ppt_slide.part.relate_to(chart_part, RT.CHART)
+    ppt_slide.shapes._add_chart_graphicFrame(rId, x, y, cx, cy)
+
+    return chart_part.chart
+
+
+def add_styled_chart(
+    ppt_slide,
+    style_key,
+    chart_type,
+    x,
+    y,
+    cx,
+    cy,
+    chart_data,
+    format_chart,
+    embed_mode: str = "full",
+):
+    """
+    Adds a chart formatted by format_chart(chart). With a style_key, the
+    formatted XML of the first chart is reused for every later chart of the
+    same key; returns the chart either way.
+    """
+    template = _STYLE_TEMPLATES.get(style_key) if CHART_STYLE_CACHE else None
+
+    if style_key is not None and template is not None:
+        return _add_cloned_chart(
+            ppt_slide, template, chart_type, x, y, cx, cy, chart_data, embed_mode
+        )
+
+    chart = ppt_slide.shapes.add_chart(chart_type, x, y, cx, cy, chart_data).chart
+    finish_chart(chart, embed_mode)
+    format_chart(chart)
+
+    if style_key is not None and CHART_STYLE_CACHE:
+        _STYLE_TEMPLATES[style_key] = _snapshot(chart)
+
+    return chart
@@ -1,14 +1,35 @@
+import io
+import multiprocessing
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from pptx import Presentation
 from pptx.util import Pt
 from pptx.enum.text import PP_ALIGN
-from pptx.enum.shapes import MSO_SHAPE_TYPE, MSO_SHAPE
+from pptx.enum.shapes import MSO_SHAPE
 
 
-from app.services.ppt.template_loader import load_template
+from app.core.logging_utils import JobLogger
+from app.services.ppt.assembly import assemble_partials
+from app.services.ppt.template_loader import get_template_info, load_template
 from app.services.ppt.chart_renderer import render_chart
 from pptx.dml.color import RGBColor
 
 
+# Bump when rendering output changes (part of the export cache key)
+RENDERER_VERSION = 2
+
+# Decks with at least this many slides are rendered in worker processes
+PARALLEL_MIN_SLIDES = int(os.environ.get("EXPORT_PARALLEL_MIN_SLIDES", "24"))
+
+RENDER_PROCESSES = int(os.environ.get("EXPORT_RENDER_PROCESSES", str(min(4, os.cpu_count() or 1))))
+
+# Batches per worker (smaller batches = finer progress, more assembly work)
+BATCHES_PER_PROCESS = 2
+
+_render_pool = None
+
 EMU_PER_INCH = 914400
 PX_PER_INCH = 96
 
@@ -18,198 +39,261 @@ def px_to_emu(px: int) -> int:
 
 
 # --------------------------------------------------
-# Find branded layout (green header slide)
+# PPT BUILDER (TEMPLATE-DRIVEN)
 # --------------------------------------------------
 
-def _find_branded_layout(prs):
+# ---- layout constants (px) ----
+SIDE_MARGIN = px_to_emu(80)
+HEADER_Y = px_to_emu(18)
+HEADER_H = px_to_emu(56)
+CHART_TOP = px_to_emu(155)
+FOOTER_CLEARANCE = px_to_emu(80)
 
-    slide_w = prs.slide_width
-    slide_h = prs.slide_height
 
-    for layout in prs.slide_layouts:
+def _render_slide(prs, base_layout, slide_json: dict, debug_mode: bool = False, embed_mode: str = "full"):
 
-        for shp in layout.shapes:
+    slide_width = prs.slide_width
+    slide_height = prs.slide_height
+    
+    # -----------------------------
+    # VALIDATION (Soft)
+    # -----------------------------
 
-            if shp.is_placeholder:
-                continue
+    if not slide_json.get("elements"):
+        raise ValueError("Slide JSON has no elements. Aborting export.")
 
-            if shp.shape_type == MSO_SHAPE_TYPE.AUTO_SHAPE:
+    # NOTE:
+    # Slide dimensions are driven by the PPT template.
+    # Do NOT require width/height at slide level.
 
-                if shp.top < slide_h * 0.18 and shp.width > slide_w * 0.6:
-                    return layout
+    # Always create new slide to ensure clean state
+    ppt_slide = prs.slides.add_slide(base_layout)
 
-    return prs.slide_layouts[-1]
+    # -----------------------------
+    # Render elements
+    # -----------------------------
+    for el in slide_json.get("elements", []):
 
+        el_type = el.get("type")
 
-# --------------------------------------------------
-# PPT BUILDER (TEMPLATE-DRIVEN)
-# --------------------------------------------------
+        # ---------------- TITLE ----------------
+        if el_type == "title":
 
-def build_ppt_from_slides(project, slides, output_path, debug_mode: bool = False):
+            x = SIDE_MARGIN
+            y = HEADER_Y
+            w = slide_width - SIDE_MARGIN * 2
+            h = HEADER_H
 
-    prs = load_template()
+            box = ppt_slide.shapes.add_textbox(x, y, w, h)
+            if el.get("boxed"):
+              fill = box.fill
+              fill.solid()
+              fill.fore_color.rgb = RGBColor(235, 245, 241)
 
-    base_layout = _find_branded_layout(prs)
+              box.line.color.rgb = RGBColor(46, 139, 87)
 
-    slide_width = prs.slide_width
-    slide_height = prs.slide_height
+              box.line.width = Pt(1.5)
 
-    # ---- layout constants (px) ----
-    SIDE_MARGIN = px_to_emu(80)
-    HEADER_Y = px_to_emu(18)
-    HEADER_H = px_to_emu(56)
-    CHART_TOP = px_to_emu(155)
-    FOOTER_CLEARANCE = px_to_emu(80)
+              box.shadow.inherit = False
 
-    for idx, slide in enumerate(slides):
+            tf = box.text_frame
+            tf.clear()
 
-        slide_json = slide.slide_json
-        
-        # -----------------------------
-        # VALIDATION (Soft)
-        # -----------------------------
+            p = tf.paragraphs[0]
+            p.text = el.get("value", "")
+            p.font.size = Pt(18)
+            p.font.bold = True
+            p.font.color.rgb = RGBColor(255, 255, 255)
+            p.alignment = PP_ALIGN.CENTER
 
-        if not slide_json.get("elements"):
-            raise ValueError("Slide JSON has no elements. Aborting export.")
+        # ---------------- TEXT ----------------
+        elif el_type == "text":
 
-        # NOTE:
-        # Slide dimensions are driven by the PPT template.
-        # Do NOT require width/height at slide level.
+            x = px_to_emu(el.get("x", 0))
+            y = px_to_emu(el.get("y", 0))
+            w = px_to_emu(el.get("width", 600))
+            h = px_to_emu(el.get("height", 120))
 
-        # Always create new slide to ensure clean state
-        ppt_slide = prs.slides.add_slide(base_layout)
+            box = ppt_slide.shapes.add_textbox(x, y, w, h)
+            tf = box.text_frame
+            tf.clear()
 
-        # -----------------------------
-        # Render elements
-        # -----------------------------
-        for el in slide_json.get("elements", []):
+            p = tf.paragraphs[0]
+            p.text = el.get("value", "")
+            p.font.size = Pt(el.get("fontSize", 16))
+            p.alignment = PP_ALIGN.LEFT
 
-            el_type = el.get("type")
+        # ---------------- CHART ----------------
+        elif el_type == "chart":
 
-            # ---------------- TITLE ----------------
-            if el_type == "title":
+            name = (el.get("datasetName") or "").lower()
 
-                x = SIDE_MARGIN
-                y = HEADER_Y
-                w = slide_width - SIDE_MARGIN * 2
-                h = HEADER_H
+            # ---------------- SIZE RULES ----------------
 
-                box = ppt_slide.shapes.add_textbox(x, y, w, h)
-                if el.get("boxed"):
-                  fill = box.fill
-                  fill.solid()
-                  fill.fore_color.rgb = RGBColor(235, 245, 241)
+            if name.endswith("_lo"):
+                # Series-backed charts carry no preview rows
+                if el.get("chartSeries"):
+                    lo_count = len(el["chartSeries"].get("categories") or [])
+                else:
+                    lo_count = len(el.get("preview") or [])
+                BASE = 360
+                PER_ROW = 45
+                chart_w = px_to_emu(920)
+                chart_h = px_to_emu(min(900, BASE + lo_count * PER_ROW))
+
+            elif name.endswith("_qlvl"):
+                chart_w = px_to_emu(760)
+                chart_h = px_to_emu(440)
+
+            elif "reg_vs_part" in name:
+                chart_w = px_to_emu(700)
+                chart_h = px_to_emu(420)
+
+            elif "summary" in name:
+                chart_w = px_to_emu(760)
+                chart_h = px_to_emu(430)
+
+            else:
+                chart_w = px_to_emu(760)
+                chart_h = px_to_emu(430)
+
+            # ---------------- CENTER + CLAMP ----------------
+
+            x = int((slide_width - chart_w) / 2)
+
+            max_h = slide_height - CHART_TOP - FOOTER_CLEARANCE
+            if chart_h > max_h:
+                chart_h = max_h
+
+            y = CHART_TOP
+
+            # inject geometry back so renderer remains local
+            el["x"] = int(x / EMU_PER_INCH * PX_PER_INCH)
+            el["y"] = int(y / EMU_PER_INCH * PX_PER_INCH)
+            el["width"] = int(chart_w / EMU_PER_INCH * PX_PER_INCH)
+            el["height"] = int(chart_h / EMU_PER_INCH * PX_PER_INCH)
+
+            # render chart
+            
+            # Header flag OR env var
+            use_debug = debug_mode or (os.environ.get("EXPORT_DEBUG") == "true")
+
+            render_chart(
+                ppt_slide=ppt_slide,
+                element=el,
+                debug_mode=use_debug,
+                embed_mode=embed_mode,
+            )
+
+            # DEBUG: Bounding Box
+            if use_debug:
+                debug_box = ppt_slide.shapes.add_shape(
+                    MSO_SHAPE.RECTANGLE,
+                    px_to_emu(el["x"]),
+                    px_to_emu(el["y"]),
+                    px_to_emu(el["width"]),
+                    px_to_emu(el["height"]),
+                )
 
-                  box.line.color.rgb = RGBColor(46, 139, 87)
+                debug_box.fill.background()
+                debug_box.line.color.rgb = RGBColor(0, 0, 255)
+                debug_box.line.width = Pt(2)
+                # No text in box
+                debug_box.text_frame.clear()
 
-                  box.line.width = Pt(1.5)
+    # -----------------------------
+    # Footer (Version Stamp)
+    # -----------------------------
+    _add_version_footer(ppt_slide, slide_width, slide_height)
 
-                  box.shadow.inherit = False
 
-                tf = box.text_frame
-                tf.clear()
+# --------------------------------------------------
+# PARALLEL RENDERING
+# --------------------------------------------------
 
-                p = tf.paragraphs[0]
-                p.text = el.get("value", "")
-                p.font.size = Pt(18)
-                p.font.bold = True
-                p.font.color.rgb = RGBColor(255, 255, 255)
-                p.alignment = PP_ALIGN.CENTER
+def render_slide_batch(
+    template_bytes: bytes,
+    layout_index: int,
+    slide_jsons: list,
+    debug_mode: bool = False,
+    embed_mode: str = "full",
+) -> bytes:
+    """Worker-process entry: renders a batch of slides into a partial PPTX (bytes)."""
+    prs = Presentation(io.BytesIO(template_bytes))
+    base_layout = prs.slide_layouts[layout_index]
 
-            # ---------------- TEXT ----------------
-            elif el_type == "text":
+    for slide_json in slide_jsons:
+        _render_slide(prs, base_layout, slide_json, debug_mode, embed_mode)
 
-                x = px_to_emu(el.get("x", 0))
-                y = px_to_emu(el.get("y", 0))
-                w = px_to_emu(el.get("width", 600))
-                h = px_to_emu(el.get("height", 120))
+    buf = io.BytesIO()
+    prs.save(buf)
+    return buf.getvalue()
 
-                box = ppt_slide.shapes.add_textbox(x, y, w, h)
-                tf = box.text_frame
-                tf.clear()
 
-                p = tf.paragraphs[0]
-                p.text = el.get("value", "")
-                p.font.size = Pt(el.get("fontSize", 16))
-                p.alignment = PP_ALIGN.LEFT
+def _get_render_pool() -> ProcessPoolExecutor:
+    global _render_pool
+    if _render_pool is None:
+        # spawn: the API process is multi-threaded, fork is not safe here
+        _render_pool = ProcessPoolExecutor(
+            max_workers=RENDER_PROCESSES,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _render_pool
 
-            # ---------------- CHART ----------------
-            elif el_type == "chart":
 
-                name = (el.get("datasetName") or "").lower()
+def _build_parallel(template: dict, slide_jsons: list, debug_mode: bool, embed_mode: str):
+    n_batches = min(len(slide_jsons), RENDER_PROCESSES * BATCHES_PER_PROCESS)
+    size = -(-len(slide_jsons) // n_batches)
+    batches = [slide_jsons[i:i + size] for i in range(0, len(slide_jsons), size)]
 
-                # ---------------- SIZE RULES ----------------
+    pool = _get_render_pool()
+    futures = {
+        pool.submit(
+            render_slide_batch, template["bytes"], template["layout_index"], batch, debug_mode, embed_mode
+        ): len(batch)
+        for batch in batches
+    }
 
-                if name.endswith("_lo"):
-                    lo_count = len(el.get("preview", []))
-                    BASE = 360
-                    PER_ROW = 45
-                    chart_w = px_to_emu(920)
-                    chart_h = px_to_emu(min(900, BASE + lo_count * PER_ROW))
+    done = 0
+    for future in as_completed(futures):
+        future.result()  # surface worker errors early
+        done += futures[future]
+        JobLogger.progress(done, len(slide_jsons))
 
-                elif name.endswith("_qlvl"):
-                    chart_w = px_to_emu(760)
-                    chart_h = px_to_emu(440)
+    partials = [f.result() for f in futures]  # submission (= slide) order
+    return assemble_partials(partials, template["layout_index"], template["slide_count"])
 
-                elif "reg_vs_part" in name:
-                    chart_w = px_to_emu(700)
-                    chart_h = px_to_emu(420)
 
-                elif "summary" in name:
-                    chart_w = px_to_emu(760)
-                    chart_h = px_to_emu(430)
+def build_ppt_from_slides(project, slides, output_path, debug_mode: bool = False, embed_mode: str = "full"):
+    global _render_pool
 
-                else:
-                    chart_w = px_to_emu(760)
-                    chart_h = px_to_emu(430)
+    template = get_template_info()
 
-                # ---------------- CENTER + CLAMP ----------------
+    slide_jsons = [slide.slide_json for slide in slides]
 
-                x = int((slide_width - chart_w) / 2)
+    for slide_json in slide_jsons:
+        if not slide_json.get("elements"):
+            raise ValueError("Slide JSON has no elements. Aborting export.")
 
-                max_h = slide_height - CHART_TOP - FOOTER_CLEARANCE
-                if chart_h > max_h:
-                    chart_h = max_h
+    if RENDER_PROCESSES > 1 and len(slide_jsons) >= PARALLEL_MIN_SLIDES:
+        try:
+            prs = _build_parallel(template, slide_jsons, debug_mode, embed_mode)
+            prs.save(output_path)
+            return output_path
+        except BrokenProcessPool as e:
+            print(f"[Export] Render workers unavailable ({e}); rendering in-process")
+            _render_pool = None
 
-                y = CHART_TOP
+    prs = load_template(template)
 
-                # inject geometry back so renderer remains local
-                el["x"] = int(x / EMU_PER_INCH * PX_PER_INCH)
-                el["y"] = int(y / EMU_PER_INCH * PX_PER_INCH)
-                el["width"] = int(chart_w / EMU_PER_INCH * PX_PER_INCH)
-                el["height"] = int(chart_h / EMU_PER_INCH * PX_PER_INCH)
+    base_layout = prs.slide_layouts[template["layout_index"]]
 
-                # render chart
-                
-                # Header flag OR env var
-                use_debug = debug_mode or (os.environ.get("EXPORT_DEBUG") == "true")
+    for idx, slide_json in enumerate(slide_jsons):
 
-                render_chart(
-                    ppt_slide=ppt_slide,
-                    element=el,
-                    debug_mode=use_debug,
-                )
+        _render_slide(prs, base_layout, slide_json, debug_mode, embed_mode)
 
-                # DEBUG: Bounding Box
-                if use_debug:
-                    debug_box = ppt_slide.shapes.add_shape(
-                        MSO_SHAPE.RECTANGLE,
-                        px_to_emu(el["x"]),
-                        px_to_emu(el["y"]),
-                        px_to_emu(el["width"]),
-                        px_to_emu(el["height"]),
-                    )
-
-                    debug_box.fill.background()
-                    debug_box.line.color.rgb = RGBColor(0, 0, 255)
-                    debug_box.line.width = Pt(2)
-                    # No text in box
-                    debug_box.text_frame.clear()
-
-        # -----------------------------
-        # Footer (Version Stamp)
-        # -----------------------------
-        _add_version_footer(ppt_slide, slide_width, slide_height)
+        # Export jobs report slides done (no-op for synchronous exports)
+        JobLogger.progress(idx + 1, len(slide_jsons))
 
     prs.save(output_path)
     return output_path
@@ -1,43 +1,148 @@
-
+import hashlib
+import io
 import os
 from pptx import Presentation
+from pptx.enum.shapes import MSO_SHAPE_TYPE
 from pathlib import Path
 
-def load_template():
+BASE_DIR = Path(__file__).parent.parent.parent.parent
+
+# Absolute: pipeline steps chdir while exports run on other threads
+UPLOADED_TEMPLATE_PATH = BASE_DIR / "templates" / "current_template.pptx"
+
+# Parsed template metadata, keyed by the file's SHA-1
+_TEMPLATES = {}
+
+# path -> (mtime_ns, size, sha1): skips re-hashing an unchanged file
+_FILE_STATS = {}
+
+
+def _resolve_template_path() -> Path:
     # Priority 1: Environment Variable
     path_str = os.environ.get("PPT_TEMPLATE_PATH")
     template_path = None
-    
+
     if path_str:
         template_path = Path(path_str)
-        if template_path.exists():
-            print(f"[TEMPLATE] Using environment template: {template_path}")
-        else:
+        if not template_path.exists():
             print(f"[TEMPLATE] WARNING: PPT_TEMPLATE_PATH set but file not found: {template_path}")
             template_path = None
 
     # Priority 2: Uploaded Fallback
     if not template_path:
-        fallback_path = Path("templates/current_template.pptx")
-        if fallback_path.exists():
-            template_path = fallback_path
-            print(f"[TEMPLATE] Using uploaded template: {template_path}")
-    
+        if UPLOADED_TEMPLATE_PATH.exists():
+            template_path = UPLOADED_TEMPLATE_PATH
+
     if not template_path:
         raise RuntimeError(
             "No PPT template configured. Upload one from UI or set PPT_TEMPLATE_PATH."
         )
 
+    return template_path
+
+
+# --------------------------------------------------
+# Find branded layout (green header slide)
+# --------------------------------------------------
+
+def _branded_layout_index(prs) -> int:
+
+    slide_w = prs.slide_width
+    slide_h = prs.slide_height
+
+    for idx, layout in enumerate(prs.slide_layouts):
+
+        for shp in layout.shapes:
+
+            if shp.is_placeholder:
+                continue
+
+            if shp.shape_type == MSO_SHAPE_TYPE.AUTO_SHAPE:
+
+                if shp.top < slide_h * 0.18 and shp.width > slide_w * 0.6:
+                    return idx
+
+    return len(prs.slide_layouts) - 1
+
+
+# --------------------------------------------------
+# Parse / validate once per template file
+# --------------------------------------------------
+
+def inspect_template(content: bytes, source: str = "template") -> dict:
+    """
+    Parses and validates template bytes once; returns the bytes plus derived
+    metadata (hash, branded layout index, slide size). Raises RuntimeError
+    for files python-pptx cannot open or that have no slide layouts.
+    """
     try:
-        prs = Presentation(str(template_path))
+        prs = Presentation(io.BytesIO(content))
     except Exception as e:
         raise RuntimeError(
-            f"Template Error: Failed to load PowerPoint template at {template_path}.\n"
+            f"Template Error: Failed to load PowerPoint template at {source}.\n"
             f"Details: {str(e)}"
         ) from e
 
-    # Freeze slide size from template
-    prs.slide_width = prs.slide_width
-    prs.slide_height = prs.slide_height
+    if len(prs.slide_layouts) == 0:
+        raise RuntimeError(f"Template Error: {source} has no slide layouts.")
+
+    return {
+        "hash": hashlib.sha1(content).hexdigest(),
+        "bytes": content,
+        "layout_index": _branded_layout_index(prs),
+        "slide_width": prs.slide_width,
+        "slide_height": prs.slide_height,
+        "slide_count": len(prs.slides),
+    }
+
+
+def cache_template(content: bytes, source: str = "template") -> dict:
+    """Validates template bytes and caches the result (used on upload too)."""
+    key = hashlib.sha1(content).hexdigest()
+
+    if key not in _TEMPLATES:
+        _TEMPLATES.clear()  # one active template at a time
+        _TEMPLATES[key] = inspect_template(content, source)
+        print(f"[TEMPLATE] Cached {source} ({key[:10]})")
+
+    return _TEMPLATES[key]
+
+
+def get_template_info() -> dict:
+    """Metadata of the active template; the file is re-read only if it changed."""
+    template_path = _resolve_template_path()
+    st = os.stat(template_path)
+    stamp = (st.st_mtime_ns, st.st_size)
+
+    known = _FILE_STATS.get(str(template_path))
+    if known and known[:2] == stamp and known[2] in _TEMPLATES:
+        return _TEMPLATES[known[2]]
+
+    content = template_path.read_bytes()
+    info = cache_template(content, str(template_path))
+    _FILE_STATS[str(template_path)] = (*stamp, info["hash"])
+    print(f"[TEMPLATE] Using template: {template_path}")
+
+    return info
+
+
+def save_uploaded_template(content: bytes) -> dict:
+    """
+    Validates an uploaded template, then stores it as the fallback template
+    and primes the cache, so the next export does not re-parse or re-scan it.
+    """
+    info = cache_template(content, "uploaded template")
+
+    UPLOADED_TEMPLATE_PATH.parent.mkdir(exist_ok=True)
+    UPLOADED_TEMPLATE_PATH.write_bytes(content)
+
+    st = os.stat(UPLOADED_TEMPLATE_PATH)
+    _FILE_STATS[str(UPLOADED_TEMPLATE_PATH)] = (st.st_mtime_ns, st.st_size, info["hash"])
+
+    return info
+
 
-    return prs
+def load_template(info: dict = None):
+    """A fresh Presentation parsed from the cached template bytes (no disk I/O)."""
+    info = info or get_template_info()
+    return Presentation(io.BytesIO(info["bytes"]))
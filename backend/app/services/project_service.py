@@ -0,0 +1,464 @@
+import io
+import uuid
+
+from sqlalchemy import delete, insert, update
+from sqlalchemy.orm import Session
+
+from app.models.project import Project
+from app.models.dataset import Dataset
+from app.models.dataset_rows import DatasetRowChunk
+from app.models.slide import Slide
+from app.services.dataset_rows import encode_row_chunks, load_rows_for_datasets, preview_sample
+from app.services.dataset_service import dataset_profile_fields, ensure_dataset_profiles
+from app.services.json_patch import apply_patch
+from app.services.evaluator import pick_rules
+from app.services.slide_generator import (
+    dataset_fingerprint,
+    generate_dataset_slides,
+    generate_overview_slide,
+    generate_slides,
+)
+
+
+# --------------------------------------------------
+# BULK WRITES
+# --------------------------------------------------
+#
+# IDs are generated client-side, so every insert is a plain multi-row
+# INSERT (SQLAlchemy batches executemany into INSERT ... VALUES (...), (...))
+# with no per-row flush to learn the primary key.
+
+ROW_CHUNK_COLUMNS = ("id", "dataset_id", "chunk_index", "row_start", "row_count", "data")
+
+
+def _copy_row_chunks(db: Session, chunks: list) -> bool:
+    """
+    Loads row chunks with COPY on PostgreSQL (same transaction as the session).
+    Returns False when the driver has no COPY support, so the caller inserts.
+    """
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return False
+
+    copy_sql = (
+        f"COPY {DatasetRowChunk.__tablename__} ({', '.join(ROW_CHUNK_COLUMNS)}) FROM STDIN"
+    )
+    raw = db.connection().connection.driver_connection
+
+    if bind.dialect.driver == "psycopg":
+        with raw.cursor() as cur:
+            with cur.copy(copy_sql) as copy:
+                for c in chunks:
+                    copy.write_row([c[k] for k in ROW_CHUNK_COLUMNS])
+        return True
+
+    if bind.dialect.driver == "psycopg2":
+        # Text format: bytea as \x<hex>, backslash escaped for COPY
+        buf = io.StringIO()
+        for c in chunks:
+            buf.write(
+                f"{c['id']}\t{c['dataset_id']}\t{c['chunk_index']}\t"
+                f"{c['row_start']}\t{c['row_count']}\t\\\\x{c['data'].hex()}\n"
+            )
+        buf.seek(0)
+        with raw.cursor() as cur:
+            cur.copy_expert(copy_sql, buf)
+        return True
+
+    return False
+
+
+def bulk_insert_row_chunks(db: Session, chunks: list):
+    if not chunks:
+        return
+    if not _copy_row_chunks(db, chunks):
+        db.execute(insert(DatasetRowChunk), chunks)
+
+
+def bulk_insert_slides(db: Session, project_id, slides: list):
+    """One multi-row INSERT for a list of slide JSONs (each with a 'position')."""
+    if not slides:
+        return
+    db.execute(
+        insert(Slide),
+        [
+            {
+                "id": uuid.uuid4(),
+                "project_id": project_id,
+                "slide_json": s,
+                "position": s["position"],
+            }
+            for s in slides
+        ],
+    )
+
+
+# --------------------------------------------------
+# PROJECT CREATION
+# --------------------------------------------------
+
+def create_project_with_datasets(db: Session, name: str, datasets: list) -> dict:
+    """
+    Creates a project from parsed datasets (excel_parser output) with its
+    row chunks, profiles and auto-generated slides, in ONE transaction.
+
+    Returns {"project_id", "project_name", "datasets", "slides"}; "datasets"
+    entries carry the full rows under "preview" (used for slide generation).
+    """
+    project_id = uuid.uuid4()
+
+    dataset_values = []
+    dataset_outputs = []
+    chunk_values = []
+
+    for d in datasets:
+        dataset_id = uuid.uuid4()
+        fields = dataset_profile_fields(d["name"], d["schema"], d["columns"], d["preview"])
+
+        dataset_values.append({
+            "id": dataset_id,
+            "project_id": project_id,
+            "name": d["name"],
+            "schema": d["schema"],
+            "columns": d["columns"],
+            "row_count": d["rows"],
+            "preview": preview_sample(d["preview"]),
+            **fields,
+        })
+
+        # Full rows go to the chunked row store
+        chunk_values.extend(encode_row_chunks(dataset_id, d["columns"], d["preview"]))
+
+        # Slide generation still needs every row
+        dataset_outputs.append({
+            "id": str(dataset_id),
+            "name": d["name"],
+            "columns": d["columns"],
+            "schema": d["schema"],
+            "preview": d["preview"],
+            "profile": fields["profile"],
+            "content_hash": fields["content_hash"],
+        })
+
+    # IDs are known up front, so slides are built before touching the DB
+    slides = generate_slides(str(project_id), dataset_outputs)
+
+    try:
+        db.execute(insert(Project).values(id=project_id, name=name))
+        if dataset_values:
+            db.execute(insert(Dataset), dataset_values)
+        bulk_insert_row_chunks(db, chunk_values)
+        bulk_insert_slides(db, project_id, slides)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    print(
+        f" [ProjectService] Created project {project_id}: {len(dataset_values)} datasets, "
+        f"{len(chunk_values)} row chunks, {len(slides)} slides"
+    )
+
+    return {
+        "project_id": str(project_id),
+        "project_name": name,
+        "datasets": dataset_outputs,
+        "slides": slides,
+    }
+
+
+# --------------------------------------------------
+# DIFF-BASED SLIDE SAVE
+# --------------------------------------------------
+
+class SlideRevisionConflict(Exception):
+    """Raised when a change was made against an outdated slide revision."""
+
+    def __init__(self, conflicts: list):
+        super().__init__(f"{len(conflicts)} slide(s) changed since last load")
+        self.conflicts = conflicts
+
+
+def _conflict(slide_id: str, expected, current) -> dict:
+    return {"slideId": slide_id, "expected": expected, "current": current}
+
+
+def apply_slide_changes(db: Session, project_id, changes: list, deletes: list) -> dict:
+    """
+    Applies per-slide upserts / JSON patches / deletes (schemas.api.SlideChange,
+    SlideDelete) to a project. Only the referenced rows are read and written.
+
+    Every change carries the revision the client last saw. A mismatch for any
+    slide raises SlideRevisionConflict and nothing is written. Updates are
+    conditional on the stored revision, so a concurrent writer that slips in
+    between the read and the write is reported the same way.
+
+    Returns {"revisions": {slideId: revision}, "deleted": [slideId, ...]}.
+    """
+    slide_ids = {c.slideId for c in changes} | {d.slideId for d in deletes}
+
+    if not slide_ids:
+        return {"revisions": {}, "deleted": []}
+
+    rows = (
+        db.query(Slide)
+        .filter(
+            Slide.project_id == project_id,
+            Slide.slide_json["slideId"].as_string().in_(slide_ids),
+        )
+        .all()
+    )
+    existing = {s.slide_json["slideId"]: s for s in rows}
+
+    # ----------------------------------
+    # Revision checks (all or nothing)
+    # ----------------------------------
+    conflicts = []
+
+    for c in changes:
+        current = existing.get(c.slideId)
+        if current is None:
+            # New slide: needs a full body; a revision means it was deleted meanwhile
+            if c.revision is not None or c.slide is None:
+                conflicts.append(_conflict(c.slideId, c.revision, None))
+        elif c.revision != current.revision:
+            conflicts.append(_conflict(c.slideId, c.revision, current.revision))
+
+    for d in deletes:
+        current = existing.get(d.slideId)
+        if current is not None and d.revision is not None and d.revision != current.revision:
+            conflicts.append(_conflict(d.slideId, d.revision, current.revision))
+
+    if conflicts:
+        raise SlideRevisionConflict(conflicts)
+
+    # ----------------------------------
+    # Writes
+    # ----------------------------------
+    revisions = {}
+    new_slides = []
+
+    try:
+        for c in changes:
+            current = existing.get(c.slideId)
+
+            if c.slide is not None:
+                slide_json = dict(c.slide)
+            else:
+                slide_json = apply_patch(current.slide_json, c.patch or [])
+
+            slide_json.pop("revision", None)
+            slide_json["slideId"] = c.slideId
+
+            if c.position is not None:
+                slide_json["position"] = c.position
+
+            if current is None:
+                slide_json.setdefault("generated", True)
+                slide_json.setdefault("position", 0)
+                new_slides.append(slide_json)
+                revisions[c.slideId] = 0
+                continue
+
+            slide_json.setdefault("generated", current.slide_json.get("generated", True))
+            slide_json.setdefault("position", current.position)
+
+            result = db.execute(
+                update(Slide)
+                .where(Slide.id == current.id, Slide.revision == current.revision)
+                .values(
+                    slide_json=slide_json,
+                    position=slide_json["position"],
+                    revision=Slide.revision + 1,
+                )
+                .execution_options(synchronize_session=False)
+            )
+
+            if result.rowcount != 1:
+                raise SlideRevisionConflict([_conflict(c.slideId, c.revision, None)])
+
+            revisions[c.slideId] = current.revision + 1
+
+        bulk_insert_slides(db, project_id, new_slides)
+
+        deleted = [d.slideId for d in deletes if d.slideId in existing]
+        if deleted:
+            db.execute(
+                delete(Slide)
+                .where(Slide.id.in_([existing[sid].id for sid in deleted]))
+                .execution_options(synchronize_session=False)
+            )
+
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return {"revisions": revisions, "deleted": deleted}
+
+
+# --------------------------------------------------
+# INCREMENTAL REGENERATION
+# --------------------------------------------------
+
+def _pair_regenerated(old: list, new: list) -> tuple[list, list]:
+    """
+    Pairs freshly generated slides with the dataset's previous auto slides
+    (same title first, then in position order) so slide IDs survive.
+    Returns ([(old_or_None, new_json)], unmatched_old).
+    """
+    by_title = {}
+    for s in old:
+        by_title.setdefault(s.slide_json.get("title"), []).append(s)
+
+    pairs = []
+    for n in new:
+        same = by_title.get(n.get("title"))
+        pairs.append([same.pop(0) if same else None, n])
+
+    leftover = [s for group in by_title.values() for s in group]
+    leftover.sort(key=lambda s: s.position)
+
+    for pair in pairs:
+        if pair[0] is None and leftover:
+            pair[0] = leftover.pop(0)
+
+    return [tuple(p) for p in pairs], leftover
+
+
+def regenerate_project_slides(db: Session, project_id) -> dict:
+    """
+    Regenerates auto slides only for datasets whose fingerprint (content hash,
+    profiler version, rule decision, generator version) no longer matches the
+    one stored on their slides. Manual slides are never touched; regenerated
+    slides keep their slide IDs and positions. Rows are loaded only for the
+    datasets that changed.
+    """
+    existing = (
+        db.query(Slide)
+        .filter(Slide.project_id == project_id)
+        .order_by(Slide.position.asc())
+        .all()
+    )
+
+    manual = [s for s in existing if s.slide_json.get("generated") is False]
+    autos = [s for s in existing if s.slide_json.get("generated") is True]
+
+    manual_overview_exists = any(s.slide_json.get("role") == "overview" for s in manual)
+
+    overview_autos = []
+    autos_by_dataset = {}
+    stale = []
+
+    for s in autos:
+        role = s.slide_json.get("role")
+        if role == "overview" and not manual_overview_exists:
+            overview_autos.append(s)
+        elif role == "dataset":
+            autos_by_dataset.setdefault(s.slide_json.get("dataset_id"), []).append(s)
+        else:
+            stale.append(s)
+
+    # ----------------------------------
+    # Compare fingerprints
+    # ----------------------------------
+    datasets = db.query(Dataset).filter(Dataset.project_id == project_id).all()
+    profiles = ensure_dataset_profiles(db, datasets, commit=False)
+
+    decisions = pick_rules([profiles[str(d.id)] for d in datasets])
+
+    kept = list(overview_autos)
+    changed = []
+
+    for d, result in zip(datasets, decisions):
+        payload = {
+            "id": str(d.id),
+            "name": d.name,
+            "schema": d.schema,
+            "columns": d.columns,
+            "profile": profiles[str(d.id)],
+            "content_hash": d.content_hash,
+        }
+        profile, decision = payload["profile"], result["then"]
+        fingerprint = dataset_fingerprint(payload, decision)
+
+        old = autos_by_dataset.pop(payload["id"], [])
+
+        if fingerprint and old and all(s.slide_json.get("fingerprint") == fingerprint for s in old):
+            kept.extend(old)
+            continue
+
+        changed.append((d, payload, profile, decision, old))
+
+    # Slides of datasets that no longer exist
+    for group in autos_by_dataset.values():
+        stale.extend(group)
+
+    # ----------------------------------
+    # Regenerate changed datasets
+    # ----------------------------------
+    rows_map = load_rows_for_datasets(db, [c[0] for c in changed]) if changed else {}
+
+    updated = []
+    to_insert = []
+
+    for d, payload, profile, decision, old in changed:
+        payload["preview"] = rows_map[payload["id"]]
+        pairs, leftover = _pair_regenerated(old, generate_dataset_slides(payload, profile, decision))
+        stale.extend(leftover)
+
+        for prev, slide_json in pairs:
+            if prev is None:
+                to_insert.append(slide_json)
+                continue
+
+            slide_json["slideId"] = prev.slide_json["slideId"]
+            slide_json["position"] = prev.position
+            prev.slide_json = slide_json
+            prev.revision = (prev.revision or 0) + 1
+            updated.append(prev)
+
+    if not overview_autos and not manual_overview_exists:
+        to_insert.insert(0, generate_overview_slide())
+
+    # ----------------------------------
+    # Positions for new slides (first free slot)
+    # ----------------------------------
+    used_positions = {s.position for s in manual + kept + updated}
+    pos = 0
+
+    for s in to_insert:
+        preferred = s.get("position") if s.get("role") == "overview" else None
+        if preferred is not None and preferred not in used_positions:
+            s["position"] = preferred
+        else:
+            while pos in used_positions:
+                pos += 1
+            s["position"] = pos
+        used_positions.add(s["position"])
+
+    try:
+        if stale:
+            db.execute(
+                delete(Slide)
+                .where(Slide.id.in_([s.id for s in stale]))
+                .execution_options(synchronize_session=False)
+            )
+        bulk_insert_slides(db, project_id, to_insert)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    print(
+        f" [ProjectService] Regenerated project {project_id}: {len(changed)}/{len(datasets)} "
+        f"datasets changed, {len(updated)} updated, {len(to_insert)} created, "
+        f"{len(stale)} deleted, {len(kept)} unchanged"
+    )
+
+    return {
+        "slides_created": len(to_insert),
+        "slides_updated": len(updated),
+        "slides_deleted": len(stale),
+        "slides_unchanged": len(kept),
+    }
@@ -0,0 +1,213 @@
+import re
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+from app.services.analysis_pipeline.utils.config_filter import (
+    compile_config_filter,
+    get_config_val,
+    normalize_school_name,
+)
+from app.services.analysis_pipeline.utils.raw_ingest import file_hash, load_raw_workbook
+
+
+REG_FILE = "REG VS PART.xlsx"
+REG_SHEET = "Assessment Participation"
+
+# Column layout of the participation sheet (see participation step 0)
+REG_IDX = list(range(3, 15))
+
+GRADE_FILE_RE = re.compile(r"^Grade[_\s-]?(\d+)\.xlsx$", re.IGNORECASE)
+
+
+# --------------------------------------------------
+# In-memory catalog (one per upload)
+# --------------------------------------------------
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def source_files(data_dir: Path):
+    reg_file = data_dir / REG_FILE
+    grade_files = sorted(
+        (f for f in data_dir.iterdir() if f.is_file() and GRADE_FILE_RE.match(f.name)),
+        key=lambda f: int(GRADE_FILE_RE.match(f.name).group(1)),
+    ) if data_dir.exists() else []
+    return reg_file, grade_files
+
+
+def _catalog_key(reg_file: Path, grade_files: list) -> tuple:
+    return tuple(file_hash(f) for f in [reg_file, *grade_files])
+
+
+# --------------------------------------------------
+# BUILD
+# --------------------------------------------------
+
+def _read_participation_schools(reg_file: Path) -> dict:
+    """
+    One read of the Assessment Participation sheet:
+    normalized name -> display name, district, registered count per grade.
+    """
+    raw = pd.read_excel(reg_file, sheet_name=REG_SHEET, header=None)
+
+    header_row = raw.iloc[1]
+    df = raw.iloc[2:]
+
+    reg_grades = {i: int(float(header_row.iloc[i])) for i in REG_IDX}
+
+    schools = {}
+    for row in df.itertuples(index=False):
+        name = row[1]
+        if pd.isna(name):
+            continue
+
+        display = str(name).strip()
+        key = normalize_school_name(display)
+        if key == "total" or key in schools:
+            continue
+
+        registered = {}
+        for i, grade in reg_grades.items():
+            count = pd.to_numeric(row[i], errors="coerce")
+            if pd.notna(count) and count > 0:
+                registered[grade] = int(count)
+
+        schools[key] = {
+            "key": key,
+            "name": display,
+            "district": None if pd.isna(row[2]) else str(row[2]).strip(),
+            "grades": sorted(registered),
+            "registered": registered,
+            "rows": {},
+        }
+
+    return schools
+
+
+def _count_grade_file_rows(grade_file: Path) -> dict:
+    """Rows per normalized school across all sheets of a grade workbook."""
+    counts = {}
+
+    for df in load_raw_workbook(grade_file).values():
+        col = "SchoolName" if "SchoolName" in df.columns else "School Name"
+        if col not in df.columns:
+            continue
+
+        per_school = df[col].dropna().astype(str).value_counts()
+        for name, n in per_school.items():
+            key = normalize_school_name(name)
+            counts[key] = counts.get(key, 0) + int(n)
+
+    return counts
+
+
+def build_school_catalog(data_dir: Path) -> dict | None:
+    """
+    Builds the school catalog for the uploaded data: one entry per school with
+    display name, district, grades present and row counts per grade file.
+    Grade workbooks go through raw_ingest, which also warms step 0's cache.
+    """
+    global _catalog
+
+    data_dir = Path(data_dir)
+    reg_file, grade_files = source_files(data_dir)
+
+    if not reg_file.exists():
+        return None
+
+    with _catalog_lock:
+        key = _catalog_key(reg_file, grade_files)
+        if _catalog is not None and _catalog["key"] == key:
+            return _catalog
+
+        print(f"[SchoolCatalog] Building catalog from {reg_file.name} + {len(grade_files)} grade files")
+
+        schools = _read_participation_schools(reg_file)
+        files = {}
+
+        for grade_file in grade_files:
+            grade = int(GRADE_FILE_RE.match(grade_file.name).group(1))
+            counts = _count_grade_file_rows(grade_file)
+
+            files[grade_file.name] = {
+                "grade": grade,
+                "rows": sum(counts.values()),
+            }
+
+            for school_key, n in counts.items():
+                entry = schools.get(school_key)
+                if entry is not None:
+                    entry["rows"][grade_file.name] = n
+
+        _catalog = {
+            "key": key,
+            "schools": sorted(schools.values(), key=lambda s: s["name"]),
+            "index": schools,
+            "grade_files": files,
+        }
+        return _catalog
+
+
+def get_school_catalog(data_dir: Path) -> dict | None:
+    """Returns the catalog for the current upload, building it on first use."""
+    try:
+        return build_school_catalog(data_dir)
+    except Exception as e:
+        print(f"[SchoolCatalog] Failed to build catalog: {e}")
+        return None
+
+
+def invalidate_school_catalog():
+    global _catalog
+    with _catalog_lock:
+        _catalog = None
+
+
+# --------------------------------------------------
+# CONFIG HELPERS
+# --------------------------------------------------
+
+def validate_config_schools(config, catalog: dict) -> list[str]:
+    """Returns human-readable problems with the configured schools (empty if valid)."""
+    errors = []
+
+    for school in get_config_val(config, "schools", "schools", []) or []:
+        name = get_config_val(school, "schoolName", "school_name", "")
+        from_grade = get_config_val(school, "fromGrade", "from_grade", 0)
+        to_grade = get_config_val(school, "toGrade", "to_grade", 100)
+
+        if normalize_school_name(name) not in catalog["index"]:
+            errors.append(f"Unknown school: '{name}'")
+        if from_grade > to_grade:
+            errors.append(f"Invalid grade range for '{name}': {from_grade} > {to_grade}")
+
+    return errors
+
+
+def estimate_config_rows(config, catalog: dict) -> dict:
+    """
+    Estimated raw rows the pipeline would process per grade file for a config,
+    computed from the catalog without touching any workbook.
+    """
+    plan = compile_config_filter(config)
+    keys = list(catalog["index"].keys())
+
+    files = {}
+    for fname, meta in catalog["grade_files"].items():
+        if plan.use_all:
+            files[fname] = meta["rows"]
+            continue
+
+        allowed = plan.mask(keys, meta["grade"])
+        files[fname] = sum(
+            catalog["index"][k]["rows"].get(fname, 0)
+            for k, ok in zip(keys, allowed) if ok
+        )
+
+    return {
+        "total_rows": sum(files.values()),
+        "files": files,
+    }
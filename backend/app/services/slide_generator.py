@@ -1,11 +1,20 @@
 print("🔥 USING FIXED SLIDE GENERATOR 🔥")
 
 from typing import List, Dict
+import hashlib
+import json
 import uuid
-import copy
 
-from app.services.dataset_profiler import profile_dataset
-from app.services.evaluator import pick_rule
+from app.services.dataset_profiler import PROFILE_VERSION
+from app.services.dataset_service import build_dataset_profile
+from app.services.evaluator import pick_rule, pick_rules
+
+
+# Bump when the layout/content of generated dataset slides changes
+GENERATOR_VERSION = 1
+
+# Row key for per-school split slides (first non-empty wins)
+SCHOOL_KEY_COLUMNS = ("School Name", "school", "School")
 
 
 def new_id() -> str:
@@ -28,12 +37,37 @@ def generate_slides(project_id: str, datasets: List[Dict]) -> List[Dict]:
     # OVERVIEW SLIDE
     # --------------------------------------------------
 
-    slides.append({
+    slides.append(generate_overview_slide(pos))
+
+    pos += 1
+
+    # --------------------------------------------------
+    # DATASET SLIDES
+    # --------------------------------------------------
+
+    profiles = [dataset_profile(d) for d in datasets]
+    decisions = pick_rules(profiles)
+
+    for d, profile, decision in zip(datasets, profiles, decisions):
+        for slide in generate_dataset_slides(d, profile, decision["then"]):
+            slide["position"] = pos
+            slides.append(slide)
+            pos += 1
+
+    return slides
+
+
+# --------------------------------------------------
+# Overview slide
+# --------------------------------------------------
+
+def generate_overview_slide(position: int = 0) -> Dict:
+    return {
         "slideId": new_id(),
         "layoutVersion": 1,
         "generated": True,
         "role": "overview",
-        "position": pos,
+        "position": position,
         "type": "overview",
         "title": "Performance Summary",
         "locked": False,
@@ -55,188 +89,214 @@ def generate_slides(project_id: str, datasets: List[Dict]) -> List[Dict]:
                 "fontSize": 16,
             },
         ],
-    })
+    }
 
-    pos += 1
 
-    # --------------------------------------------------
-    # DATASET SLIDES
-    # --------------------------------------------------
+# --------------------------------------------------
+# Per-dataset slides (positions assigned by the caller)
+# --------------------------------------------------
 
-    for d in datasets:
+def dataset_profile(d: Dict) -> Dict:
+    # Persisted profile from dataset creation; computed here only as a fallback
+    return d.get("profile") or build_dataset_profile(d["name"], d.get("schema"), d.get("preview"))
 
-        profile = profile_dataset(d)
+
+def dataset_fingerprint(d: Dict, decision: Dict) -> str | None:
+    """
+    What a dataset's generated slides depend on: its content, the profiler
+    version, the rule decision it got and this generator's version.
+    None when the dataset has no content hash (always regenerated).
+    """
+    if not d.get("content_hash"):
+        return None
+
+    payload = json.dumps(
+        [d["content_hash"], PROFILE_VERSION, GENERATOR_VERSION, decision],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def generate_dataset_slides(d: Dict, profile: Dict = None, decision: Dict = None) -> List[Dict]:
+
+    if profile is None:
+        profile = dataset_profile(d)
+    if decision is None:
         decision = pick_rule(profile)
 
-        print("DATASET:", d["name"])
-        print("PROFILE:", profile)
-        print("DECISION:", decision)
-
-        base_name = d["name"]
-
-        # ==================================================
-        # SCHOOL REG VS PART → PIE PER SCHOOL
-        # ==================================================
-
-        if decision.get("split_slides"):
-
-            buckets = {}
-
-            for r in d.get("preview", []):
-
-                key = (
-                    r.get("School Name")
-                    or r.get("school")
-                    or r.get("School")
-                )
-
-                if not key:
-                    continue
-
-                try:
-                    part = float(r.get("Participated"))
-                    notp = float(r.get("Not Participated"))
-                    reg = float(r.get("Registered") or 0)
-                except Exception:
-                    continue
-
-                buckets[key] = {
-                    "Participated": part,
-                    "Not Participated": notp,
-                    "Registered": reg,
-                }
-
-            for school, vals in buckets.items():
-
-                preview = [
-                    {"Category": "Participated", "Value": vals["Participated"]},
-                    {"Category": "Not Participated", "Value": vals["Not Participated"]},
-                ]
-
-                elements: List[Dict] = []
-
-                elements.append({
-                    "id": new_id(),
-                    "type": "title",
-                    "value": f"{base_name} - {school}",
-                    "x": 60,
-                    "y": 40,
-                    "fontSize": 24,
-                })
-
-                elements.append({
-                    "id": new_id(),
-                    "type": "chart",
-                    "chartType": decision["chart"],
-                    "datasetName": base_name,
-                    "datasetFamily": profile.get("dataset_family"),
-                    "metricTypes": profile.get("metric_types"),
-                    "preview": preview,
-                    "schema": {},
-                    "x": 80,
-                    "y": 120,
-                    "width": 620,
-                    "height": 420,
-                })
-
-                elements.append({
-                    "id": new_id(),
-                    "type": "text",
-                    "value": f"Registered: {int(vals['Registered'])}",
-                    "x": 780,
-                    "y": 190,
-                    "width": 220,
-                    "height": 90,
-                    "fontSize": 16,
-                    "boxed": True,
-                })
-
-                slides.append({
-                    "slideId": new_id(),
-                    "layoutVersion": 1,
-                    "generated": True,
-                    "role": "dataset",
-                    "dataset_id": d["id"],
-                    "position": pos,
-                    "type": "dataset",
-                    "title": f"{base_name} - {school}",
-                    "locked": False,
-                    "elements": elements,
-                })
-
-                pos += 1
-
-            continue
-
-        # ==================================================
-        # GRADE REG VS PART → grouped bars
-        # ==================================================
-
-        local_dataset = d
-
-        if (
-            profile.get("special_case") == "reg_vs_part"
-            and profile.get("entity") == "grade"
-        ):
-
-            new_preview = []
-
-            for r in d.get("preview", []):
-                new_preview.append({
-                    "Grade": r.get("Grade"),
-                    "Registered": r.get("Registered"),
-                    "Participated": r.get("Participated"),
-                    "Participation %": r.get("Participation %"),
-                })
-
-            local_dataset = copy.deepcopy(d)
-            local_dataset["preview"] = new_preview
-
-        # ==================================================
-        # DEFAULT SLIDE
-        # ==================================================
-
-        elements: List[Dict] = []
-
-        elements.append({
-            "id": new_id(),
-            "type": "title",
-            "value": base_name,
-            "x": 60,
-            "y": 40,
-            "fontSize": 24,
-        })
-
-        print(f"[PROFILE] Dataset: {d['name']} | Family: {profile['dataset_family']} | Types: {profile['metric_types']}")
-
-        elements.append({
-            "id": new_id(),
-            "type": "chart",
-            "chartType": decision.get("chart", "column"),
-            "datasetName": base_name,
-            "datasetFamily": profile.get("dataset_family"),
-            "metricTypes": profile.get("metric_types"),
-            "preview": local_dataset.get("preview"),
-            "schema": local_dataset.get("schema"),
-            "x": 80,
-            "y": 120,
-            "width": 680,
-            "height": 420,
-        })
-
-        slides.append({
-            "slideId": new_id(),
-            "layoutVersion": 1,
-            "generated": True,
-            "role": "dataset",
-            "dataset_id": d["id"],
-            "position": pos,
-            "type": "dataset",
-            "title": base_name,
-            "locked": False,
-            "elements": elements,
-        })
-
-        pos += 1
+    fingerprint = dataset_fingerprint(d, decision)
+    slides: List[Dict] = []
+
+    print("DATASET:", d["name"])
+    print("PROFILE:", profile)
+    print("DECISION:", decision)
+
+    base_name = d["name"]
+
+    # ==================================================
+    # SCHOOL REG VS PART → PIE PER SCHOOL
+    # ==================================================
+
+    if decision.get("split_slides"):
+
+        buckets = {}
+
+        for r in d.get("preview", []):
+
+            key_col = next(
+                (c for c in SCHOOL_KEY_COLUMNS if r.get(c)),
+                None,
+            )
+
+            if not key_col:
+                continue
+
+            key = r[key_col]
+
+            try:
+                part = float(r.get("Participated"))
+                notp = float(r.get("Not Participated"))
+                reg = float(r.get("Registered") or 0)
+            except Exception:
+                continue
+
+            buckets[key] = {
+                "column": key_col,
+                "Participated": part,
+                "Not Participated": notp,
+                "Registered": reg,
+            }
+
+        for school, vals in buckets.items():
+
+            # Resolved at export: the school's row, unpivoted to Category/Value
+            row_spec = {
+                "filter": {"column": vals["column"], "equals": school},
+                "take": "last",
+                "unpivot": {
+                    "columns": ["Participated", "Not Participated"],
+                    "labelColumn": "Category",
+                    "valueColumn": "Value",
+                    "valueType": "float",
+                },
+            }
+
+            elements: List[Dict] = []
+
+            elements.append({
+                "id": new_id(),
+                "type": "title",
+                "value": f"{base_name} - {school}",
+                "x": 60,
+                "y": 40,
+                "fontSize": 24,
+            })
+
+            elements.append({
+                "id": new_id(),
+                "type": "chart",
+                "chartType": decision["chart"],
+                "datasetName": base_name,
+                "datasetFamily": profile.get("dataset_family"),
+                "renderType": profile.get("render_type"),
+                "metricTypes": profile.get("metric_types"),
+                "datasetId": d["id"],
+                "rowSpec": row_spec,
+                "schema": {},
+                "x": 80,
+                "y": 120,
+                "width": 620,
+                "height": 420,
+            })
+
+            elements.append({
+                "id": new_id(),
+                "type": "text",
+                "value": f"Registered: {int(vals['Registered'])}",
+                "x": 780,
+                "y": 190,
+                "width": 220,
+                "height": 90,
+                "fontSize": 16,
+                "boxed": True,
+            })
+
+            slides.append({
+                "slideId": new_id(),
+                "layoutVersion": 1,
+                "generated": True,
+                "role": "dataset",
+                "dataset_id": d["id"],
+                "fingerprint": fingerprint,
+                "type": "dataset",
+                "title": f"{base_name} - {school}",
+                "locked": False,
+                "elements": elements,
+            })
+
+        return slides
+
+    # ==================================================
+    # GRADE REG VS PART → grouped bars
+    # ==================================================
+
+    row_spec = None
+
+    if (
+        profile.get("special_case") == "reg_vs_part"
+        and profile.get("entity") == "grade"
+    ):
+
+        row_spec = {
+            "columns": ["Grade", "Registered", "Participated", "Participation %"],
+        }
+
+    # ==================================================
+    # DEFAULT SLIDE
+    # ==================================================
+
+    elements: List[Dict] = []
+
+    elements.append({
+        "id": new_id(),
+        "type": "title",
+        "value": base_name,
+        "x": 60,
+        "y": 40,
+        "fontSize": 24,
+    })
+
+    print(f"[PROFILE] Dataset: {d['name']} | Family: {profile['dataset_family']} | Types: {profile['metric_types']}")
+
+    elements.append({
+        "id": new_id(),
+        "type": "chart",
+        "chartType": decision.get("chart", "column"),
+        "datasetName": base_name,
+        "datasetFamily": profile.get("dataset_family"),
+        "renderType": profile.get("render_type"),
+        "metricTypes": profile.get("metric_types"),
+        "datasetId": d["id"],
+        "rowSpec": row_spec,
+        "schema": d.get("schema"),
+        "x": 80,
+        "y": 120,
+        "width": 680,
+        "height": 420,
+    })
+
+    slides.append({
+        "slideId": new_id(),
+        "layoutVersion": 1,
+        "generated": True,
+        "role": "dataset",
+        "dataset_id": d["id"],
+        "fingerprint": fingerprint,
+        "type": "dataset",
+        "title": base_name,
+        "locked": False,
+        "elements": elements,
+    })
 
     return slides
@@ -0,0 +1,82 @@
+import pandas as pd
+
+
+# --------------------------------------------------
+# HINTS
+# --------------------------------------------------
+
+# Columns whose names suggest a percentage/average are coerced to numbers
+PERCENT_COL_HINTS = ["%", "percent", "avg"]
+
+# Names that explicitly say "percent" (schema flags these as percent metrics)
+PERCENT_NAME_HINTS = ["%", "percent"]
+
+TEXT_COL_HINTS = [
+    "question",
+    "questions",
+    "learning outcome",
+    "lo",
+    "description",
+    "statement",
+    "indicator",
+]
+
+# "(55%)" -> "55"
+_PERCENT_DECORATION = r"[%()]"
+
+
+# --------------------------------------------------
+# INFERENCE
+# --------------------------------------------------
+
+def _coerce_numeric(s: pd.Series) -> tuple[pd.Series, bool]:
+    """
+    Numeric version of a percent-ish column, plus whether any value carried
+    a '%' sign. Already-numeric columns pass through untouched.
+    """
+    if pd.api.types.is_numeric_dtype(s.dtype) and not pd.api.types.is_bool_dtype(s.dtype):
+        return s, False
+
+    # Values that are already numbers (or empty) need no string pass
+    direct = pd.to_numeric(s, errors="coerce")
+    if direct.notna().sum() == s.notna().sum():
+        return direct, False
+
+    text = s.astype(str)
+    had_sign = bool(text.str.contains("%", regex=False).any())
+
+    return pd.to_numeric(text.str.replace(_PERCENT_DECORATION, "", regex=True), errors="coerce"), had_sign
+
+
+def infer_column_types(df: pd.DataFrame) -> tuple[pd.DataFrame, dict]:
+    """
+    Single type-inference pass over a cleaned sheet.
+
+    - percent-ish columns (%, percent, avg) become numeric ('%', '(', ')' stripped)
+    - narrative columns (question, LO, ...) never become numeric: cast to str
+
+    Returns the frame and, per column, {"numeric": bool, "was_percent": bool}.
+    'was_percent' is set when the name says percent or the raw values had '%'.
+    detect_schema and normalize_dataset read these instead of re-deriving them.
+    """
+    column_types = {}
+
+    for col in df.columns:
+        n = col.lower()
+        s = df[col]
+        had_sign = False
+
+        if any(h in n for h in PERCENT_COL_HINTS):
+            s, had_sign = _coerce_numeric(s)
+
+        if any(h in n for h in TEXT_COL_HINTS):
+            s = s.astype(str)
+
+        df[col] = s
+
+        column_types[col] = {
+            "numeric": pd.api.types.is_numeric_dtype(s.dtype),
+            "was_percent": had_sign or any(h in n for h in PERCENT_NAME_HINTS),
+        }
+
+    return df, column_types
@@ -8,7 +8,8 @@ import pandas as pd
 # Add app to path
 sys.path.append(os.getcwd())
 
-from app.services.excel_parser import looks_like_pivot, detect_schema, _clean_dataframe, _coerce_percent_columns
+from app.services.excel_parser import looks_like_pivot, detect_schema, _clean_dataframe
+from app.services.type_inference import infer_column_types
 
 # Mock UploadFile
 class MockFile:
@@ -20,7 +21,8 @@ class MockFile:
             return f.read()
 
 async def debug_parse():
-    file_path = Path("data/uploadable data.xlsx")
+    # Step 5 snapshot (finalize falls back to it without in-memory state)
+    file_path = Path("outputs/step5_uploadable.xlsx")
     if not file_path.exists():
         print(f"ERROR: {file_path} does not exist!")
         return
@@ -37,6 +39,9 @@ async def debug_parse():
         # 1. Clean
         df = _clean_dataframe(df)
         print(f"Cleaned Shape: {df.shape}")
+
+        # Same typing pass as the parser (percent strings -> numbers)
+        df, column_types = infer_column_types(df)
         
         # 2. Pivot Check
         is_pivot = looks_like_pivot(df)
@@ -59,7 +64,7 @@ async def debug_parse():
             continue
             
         # 3. Schema
-        schema = detect_schema(df)
+        schema = detect_schema(df, column_types)
         print(f"Schema: {schema}")
         
         # 4. Success
@@ -0,0 +1,113 @@
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from pptx import Presentation
+from pptx.dml.color import RGBColor
+from pptx.util import Pt
+
+from app.services.ppt import chart_renderer, chart_styles
+
+N_CATEGORIES = 50
+REPEATS = 20
+
+
+def lo_element(n):
+    return {
+        "chartType": "bar",
+        "datasetName": "grade_5_lo_wise",
+        "metricTypes": {"Score %": "percent"},
+        "preview": [
+            {"Learning Outcome": f"Students will be able to identify item {i}", "Score %": i % 100}
+            for i in range(n)
+        ],
+    }
+
+
+def reg_vs_part_element(n):
+    return {
+        "chartType": "column",
+        "datasetName": "reg_vs_part_grade_wise",
+        "metricTypes": {
+            "Registered": "registered",
+            "Participated": "participated",
+            "Participation %": "percent",
+        },
+        "preview": [
+            {"Grade": str(i), "Registered": 100 + i, "Participated": 50 + i, "Participation %": 0.5}
+            for i in range(n)
+        ],
+    }
+
+
+# Previous per-point formatting, kept here for comparison only
+def per_point_bar_colors(chart):
+    for series in chart.series:
+        for point in series.points:
+            fill = point.format.fill
+            fill.solid()
+            fill.fore_color.rgb = chart_renderer.DEFAULT_BAR_COLOR
+
+
+def per_point_labels(series, texts):
+    for p_idx, point in enumerate(series.points):
+        tf = point.data_label.text_frame
+        tf.clear()
+
+        p = tf.paragraphs[0]
+        p.font.size = Pt(9)
+        p.font.bold = True
+        p.font.color.rgb = RGBColor(0, 0, 0)
+        p.text = texts[p_idx]
+
+
+def timed(element, reps=REPEATS):
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(reps):
+            chart_renderer.render_chart(slide, element)
+    elapsed = (time.perf_counter() - start) / reps * 1000
+
+    xml = slide.shapes[-1].chart.part.blob
+    return elapsed, xml.count(b"<c:dPt>"), xml.count(b"<c:dLbl>")
+
+
+def main():
+    # Measure formatting itself, not chart style template reuse
+    chart_styles.CHART_STYLE_CACHE = False
+
+    cases = [
+        ("LO bars", lo_element(N_CATEGORIES)),
+        ("reg vs part", reg_vs_part_element(N_CATEGORIES)),
+    ]
+
+    print(f"{N_CATEGORIES} categories, {REPEATS} charts each\n")
+    print(f"{'chart':<14}{'formatting':<12}{'ms/chart':>10}{'dPt':>6}{'dLbl':>6}")
+
+    for name, element in cases:
+        results = {"series": timed(element)}
+
+        bar_colors, set_labels = chart_renderer._apply_bar_colors, chart_renderer._set_point_labels
+        chart_renderer._apply_bar_colors = per_point_bar_colors
+        chart_renderer._set_point_labels = per_point_labels
+        try:
+            results["per point"] = timed(element)
+        finally:
+            chart_renderer._apply_bar_colors = bar_colors
+            chart_renderer._set_point_labels = set_labels
+
+        for mode in ("per point", "series"):
+            ms, dpts, dlbls = results[mode]
+            print(f"{name:<14}{mode:<12}{ms:>10.2f}{dpts:>6}{dlbls:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import contextlib
+import io
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pandas as pd
+
+from app.services import excel_parser
+
+REPEATS = 20
+WORKERS = (1, 2, 4)
+SHEET_COUNTS = (2, 4, 8, 16)
+N_ROWS = 50
+
+
+def synthetic_frames(n_sheets, n_rows=N_ROWS):
+    """Step 5 style sheets: one label column plus percent-string metrics."""
+    return {
+        f"grade_{i}_lo_wise": pd.DataFrame({
+            "Learning Outcome": [f"Students will be able to identify item {r}" for r in range(n_rows)],
+            "Score %": [f"{(r * 7 + i) % 100}%" for r in range(n_rows)],
+            "Participated": [(r * 13 + i) % 90 + 10 for r in range(n_rows)],
+        })
+        for i in range(n_sheets)
+    }
+
+
+def timed(frames, workers, reps=REPEATS):
+    excel_parser.PARSE_WORKERS = workers
+    excel_parser.PARSE_PARALLEL_MIN_SHEETS = 1
+
+    runs = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        excel_parser.build_datasets(frames)  # warm-up
+        for _ in range(reps):
+            start = time.perf_counter()
+            excel_parser.build_datasets(frames)
+            runs.append((time.perf_counter() - start) * 1000)
+
+    return min(runs), statistics.median(runs)
+
+
+def main():
+    # Optional: a real workbook (e.g. outputs/step5_uploadable.xlsx)
+    if len(sys.argv) > 1:
+        with contextlib.redirect_stdout(io.StringIO()):
+            frames = excel_parser.read_workbook_frames(Path(sys.argv[1]).read_bytes())
+        cases = [(Path(sys.argv[1]).name, frames)]
+    else:
+        cases = [(f"{n} sheets", synthetic_frames(n)) for n in SHEET_COUNTS]
+
+    print(f"build_datasets, {REPEATS} runs each\n")
+    print(f"{'workbook':<28}{'workers':>8}{'min ms':>10}{'median ms':>11}")
+
+    for name, frames in cases:
+        for workers in WORKERS:
+            best, median = timed(frames, workers)
+            print(f"{name:<28}{workers:>8}{best:>10.1f}{median:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
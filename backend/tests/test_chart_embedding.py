@@ -0,0 +1,54 @@
+import io
+import sys
+import zipfile
+from pathlib import Path
+
+# Add backend to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from pptx import Presentation
+from pptx.enum.chart import XL_CHART_TYPE
+
+from app.services.ppt.chart_embedding import finish_chart, new_chart_data
+
+
+def _deck(embed_mode):
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+
+    chart_data = new_chart_data(embed_mode)
+    chart_data.categories = ["A & B", "C"]
+    chart_data.add_series("Score %", [40.5, 60])
+
+    chart = slide.shapes.add_chart(
+        XL_CHART_TYPE.COLUMN_CLUSTERED, 0, 0, 914400, 914400, chart_data
+    ).chart
+    finish_chart(chart, embed_mode)
+
+    buf = io.BytesIO()
+    prs.save(buf)
+    return zipfile.ZipFile(buf)
+
+
+def _chart_xml(z):
+    return z.read("ppt/charts/chart1.xml").decode()
+
+
+def test_minimal_workbook_has_same_cells():
+    z = _deck("minimal")
+
+    xlsx = zipfile.ZipFile(io.BytesIO(z.read("ppt/embeddings/Microsoft_Excel_Sheet1.xlsx")))
+    sheet = xlsx.read("xl/worksheets/sheet1.xml").decode()
+
+    assert '<c r="B1" t="inlineStr"><is><t>Score %</t></is></c>' in sheet
+    assert '<c r="A2" t="inlineStr"><is><t>A &amp; B</t></is></c>' in sheet
+    assert '<c r="B2"><v>40.5</v></c>' in sheet
+    assert _chart_xml(z) == _chart_xml(_deck("full"))
+
+
+def test_no_workbook_keeps_chart_caches():
+    z = _deck("none")
+
+    assert not [n for n in z.namelist() if n.startswith("ppt/embeddings/")]
+    assert "externalData" not in _chart_xml(z)
+    assert "<c:v>40.5</c:v>" in _chart_xml(z)
@@ -0,0 +1,40 @@
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.services.chart_rows import apply_row_spec
+
+
+ROWS = [
+    {"School Name": "Alpha", "Registered": 10, "Participated": 8, "Not Participated": 2},
+    {"School Name": "Beta", "Registered": 5, "Participated": 3, "Not Participated": 2},
+    {"School Name": "Alpha", "Registered": 12, "Participated": 9, "Not Participated": 3},
+]
+
+
+def test_no_spec_returns_all_rows():
+    assert apply_row_spec(ROWS, None) is ROWS
+
+
+def test_projection():
+    rows = apply_row_spec(ROWS, {"columns": ["School Name", "Registered"]})
+    assert rows[1] == {"School Name": "Beta", "Registered": 5}
+
+
+def test_filter_take_last_unpivot():
+    spec = {
+        "filter": {"column": "School Name", "equals": "Alpha"},
+        "take": "last",
+        "unpivot": {
+            "columns": ["Participated", "Not Participated"],
+            "labelColumn": "Category",
+            "valueColumn": "Value",
+            "valueType": "float",
+        },
+    }
+    assert apply_row_spec(ROWS, spec) == [
+        {"Category": "Participated", "Value": 9.0},
+        {"Category": "Not Participated", "Value": 3.0},
+    ]
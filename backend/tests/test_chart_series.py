@@ -0,0 +1,83 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add backend to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from pptx import Presentation
+
+from app.services.chart_series import build_chart_series, compile_chart_series
+from app.services.ppt.chart_renderer import render_chart
+
+LO_ROWS = [
+    {"Learning Outcome": "Students will be able to identify shapes.", "Score %": "45.6%"},
+    {"Learning Outcome": "The student will be able to add two numbers", "Score %": None},
+]
+
+
+def test_lo_series_are_cleaned_and_normalized():
+    series = compile_chart_series(LO_ROWS, {}, "lo", "grade_5_lo_wise")
+
+    assert series["percent_column"] == "Score %"
+    assert series["labels"] == ["Identify Shapes", "Add Two Numbers"]
+    assert series["categories"][0] == LO_ROWS[0]["Learning Outcome"]
+    assert series["series"] == [{"name": "Score %", "values": [46, 0]}]
+
+
+def test_unplottable_dataset_stores_the_render_error():
+    rows = [{"Learning Outcome": "x", "Count": 3}]
+    series = build_chart_series("grade_5_lo_wise", rows, {"render_type": "lo", "metric_types": {}})
+
+    assert "requires a percentage column" in series["error"]
+
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    with pytest.raises(ValueError, match="requires a percentage column"):
+        render_chart(slide, {"chartType": "bar", "renderType": "lo", "chartSeries": series})
+
+
+def test_compiled_series_render_like_rows():
+    rows = [
+        {"Grade": "5", "Registered": 120, "Participated": "100", "Participation %": "83.3%"},
+        {"Grade": "6", "Registered": 90, "Participated": 45, "Participation %": 0.5},
+    ]
+    metric_types = {
+        "Registered": "registered",
+        "Participated": "participated",
+        "Participation %": "percent",
+    }
+    element = {"chartType": "column", "renderType": "reg_vs_part_grade", "metricTypes": metric_types}
+
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+
+    render_chart(slide, {**element, "preview": rows})
+    render_chart(
+        slide,
+        {**element, "chartSeries": compile_chart_series(rows, metric_types, "reg_vs_part_grade")},
+    )
+
+    from_rows, compiled = (shape.chart.part.blob for shape in list(slide.shapes)[-2:])
+    assert from_rows == compiled
+    assert b"100(83%)" in compiled
+
+
+def test_series_backed_lo_chart_grows_with_its_categories():
+    from app.services.ppt.slide_builder import _render_slide, px_to_emu
+
+    series = compile_chart_series(LO_ROWS, {}, "lo", "grade_5_lo")
+    element = {
+        "type": "chart",
+        "chartType": "bar-horizontal",
+        "datasetName": "grade_5_lo",
+        "renderType": "lo",
+        "chartSeries": series,
+    }
+
+    prs = Presentation()  # 4:3, room for ~485px charts
+    _render_slide(prs, prs.slide_layouts[6], {"elements": [element]})
+
+    frame = next(s for s in prs.slides[0].shapes if s.has_chart)
+    assert frame.height == px_to_emu(360 + 2 * 45)  # BASE + rows * PER_ROW
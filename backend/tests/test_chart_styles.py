@@ -0,0 +1,47 @@
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from pptx import Presentation
+
+from app.services.ppt import chart_styles
+from app.services.ppt.chart_renderer import render_chart
+
+
+def _lo_element(n):
+    return {
+        "chartType": "bar",
+        "datasetName": "grade_5_lo_wise",
+        "metricTypes": {"Score %": "percent"},
+        "preview": [{"LO": f"Outcome {i}", "Score %": 10 * i} for i in range(n)],
+    }
+
+
+def _chart_xml(n, cache: bool):
+    chart_styles.CHART_STYLE_CACHE = cache
+    chart_styles._STYLE_TEMPLATES.clear()
+
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+
+    render_chart(slide, _lo_element(3))  # first chart of the style
+    render_chart(slide, _lo_element(n))
+
+    return slide.shapes[-1].chart.part.blob
+
+
+def test_cloned_chart_matches_freshly_formatted_chart():
+    try:
+        for n in (2, 3, 7):
+            cloned = _chart_xml(n, cache=True)
+            fresh = _chart_xml(n, cache=False)
+
+            assert cloned.count(b"<c:pt idx=") == 2 * n + 1  # name, categories, values
+            assert cloned.replace(b"\n", b"").replace(b" ", b"") == fresh.replace(
+                b"\n", b""
+            ).replace(b" ", b"")
+    finally:
+        chart_styles.CHART_STYLE_CACHE = True
+        chart_styles._STYLE_TEMPLATES.clear()
@@ -0,0 +1,57 @@
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pandas as pd
+from app.services.column_stats import compute_column_stats
+from app.services.metric_classifier import classify_metric, classify_metrics
+
+
+def test_column_stats_mixed_frame():
+    df = pd.DataFrame({
+        "Score": [0.2, 0.5, 0.5, None],
+        "Raw": ["10", "abc", None, "30"],
+        "Name": ["a", "b", "b", "c"],
+    })
+
+    stats = compute_column_stats(df)
+
+    assert stats["Score"]["numeric_count"] == 3
+    assert stats["Score"]["numeric_distinct"] == 2
+    assert stats["Score"]["null_count"] == 1
+    assert (stats["Score"]["min"], stats["Score"]["max"]) == (0.2, 0.5)
+
+    assert stats["Raw"]["numeric_count"] == 2
+    assert stats["Raw"]["numeric_rate"] == 2 / 3
+    assert (stats["Raw"]["min"], stats["Raw"]["max"]) == (10.0, 30.0)
+
+    assert stats["Name"]["numeric_count"] == 0
+    assert stats["Name"]["min"] is None
+    assert stats["Name"]["distinct"] == 3
+
+
+def test_batch_matches_single_classification():
+    df = pd.DataFrame({
+        "Ratio": [0.1, 0.4, 0.9],
+        "Growth": [5, 10, -2],
+        "Registered": [10, 20, 30],
+    })
+
+    batch = classify_metrics(list(df.columns), compute_column_stats(df))
+
+    assert batch == {c: classify_metric(c, df[c].tolist()) for c in df.columns}
+    assert batch == {"Ratio": "generic", "Growth": "generic", "Registered": "registered"}
+
+
+def test_unnamed_fractions_are_not_percents():
+    # Parity with the original classifier: values alone never make a percent
+    assert classify_metric("Passed", [0, 1, 1, 0]) == "generic"
+    assert classify_metric("Share", [0, 0.5, 1]) == "generic"
+    assert classify_metric("Share", [0.25, 0.5, 0.75, None]) == "generic"
+
+    # Name cues still decide, whatever the values
+    assert classify_metric("Share %", [0.25, 0.5, 0.75]) == "percent"
+    assert classify_metric("Avg Score", [0.25, 0.5, 0.75]) == "percent"
+    assert classify_metric("Avg Score", [120, 150]) == "percent"
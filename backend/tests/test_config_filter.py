@@ -0,0 +1,74 @@
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pandas as pd
+from app.services.analysis_pipeline.utils.config_filter import (
+    apply_pipeline_config_filter,
+    compile_config_filter,
+)
+
+
+def _frame():
+    return pd.DataFrame({
+        "SchoolName": ["Alpha School", " alpha school ", "Beta", "Gamma", None, "Beta"],
+        "Grade": [5, 7, "6", 6, 5, 9],
+        "Score": [1, 2, 3, 4, 5, 6],
+    })
+
+
+def test_use_all_returns_frame_untouched():
+    df = _frame()
+    assert apply_pipeline_config_filter(df, {"useAll": True, "schools": []}) is df
+
+
+def test_no_schools_returns_empty():
+    out = apply_pipeline_config_filter(_frame(), {"useAll": False, "schools": []})
+    assert out.empty
+
+
+def test_school_and_grade_interval():
+    config = {
+        "useAll": False,
+        "schools": [
+            {"schoolName": "ALPHA SCHOOL", "fromGrade": 5, "toGrade": 6},
+            {"schoolName": "beta", "fromGrade": 6, "toGrade": 6},
+        ],
+    }
+    out = apply_pipeline_config_filter(_frame(), config)
+
+    assert out["Score"].tolist() == [1, 3]
+    assert out["Grade"].tolist() == [5, 6]
+
+
+def test_disjoint_intervals_for_same_school():
+    config = {
+        "useAll": False,
+        "schools": [
+            {"schoolName": "beta", "fromGrade": 5, "toGrade": 6},
+            {"schoolName": "beta", "fromGrade": 9, "toGrade": 10},
+        ],
+    }
+    out = apply_pipeline_config_filter(_frame(), config)
+
+    assert out["Score"].tolist() == [3, 6]
+
+
+def test_school_name_column_alias():
+    df = _frame().rename(columns={"SchoolName": "School Name"}).drop(columns=["Grade"])
+    config = {"useAll": False, "schools": [{"schoolName": "gamma", "fromGrade": 1, "toGrade": 12}]}
+
+    out = apply_pipeline_config_filter(df, config)
+
+    assert out["SchoolName"].tolist() == ["Gamma"]
+
+
+def test_plan_is_cached_per_config():
+    config = {"useAll": False, "schools": [{"schoolName": "x", "fromGrade": 1, "toGrade": 2}]}
+    assert compile_config_filter(config) is compile_config_filter(dict(config))
+
+    plan = compile_config_filter(config)
+    assert plan.mask(["X ", "y"], 2).tolist() == [True, False]
+    assert plan.mask(["X"], 3).tolist() == [False]
@@ -0,0 +1,29 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add backend to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.services.dataset_rows import _decode_chunk, _encode_chunk, load_dataset_rows
+
+
+ROWS = [
+    {"LO": "LO a", "Avg Performance (%)": 55.5},
+    {"LO": "LO b", "Avg Performance (%)": None},
+]
+
+
+def test_chunk_round_trip_with_projection():
+    data = _encode_chunk(["LO", "Avg Performance (%)"], ROWS)
+
+    assert _decode_chunk(data) == ROWS
+    assert _decode_chunk(data, ["LO"]) == [{"LO": "LO a"}, {"LO": "LO b"}]
+
+
+def test_complete_preview_is_served_without_chunks():
+    # Legacy / small datasets: the preview already has every row
+    dataset = SimpleNamespace(columns=["LO", "Avg Performance (%)"], preview=ROWS, row_count=2)
+
+    assert load_dataset_rows(None, dataset, offset=1, limit=5) == ROWS[1:]
+    assert load_dataset_rows(None, dataset, columns=["LO"]) == [{"LO": "LO a"}, {"LO": "LO b"}]
@@ -0,0 +1,84 @@
+import os
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+from app.services import evaluator
+
+
+RULES = """
+rules:
+  - name: school_pie
+    when:
+      special_case: reg_vs_part
+      entity: school
+    then:
+      chart: pie
+  - name: lo_bars
+    when:
+      dataset_family: lo
+    then:
+      chart: bar-horizontal
+  - name: multi
+    when:
+      series_count: ">1"
+    then:
+      chart: grouped_bar
+  - name: fallback
+    when: {}
+    then:
+      chart: column
+"""
+
+
+@pytest.fixture
+def rules_file(tmp_path):
+    path = tmp_path / "rules.yaml"
+    path.write_text(RULES)
+    evaluator.RULES_PATH = path
+    yield path
+    evaluator.RULES_PATH = evaluator.BASE / "chart_rules.yaml"
+
+
+def test_compiled_predicates():
+    assert evaluator._compile_value(">=2")(2)
+    assert not evaluator._compile_value(">1")(1)
+    assert not evaluator._compile_value(">1")(None)
+    assert evaluator._compile_value("*")(None)
+    assert evaluator._compile_value("!=lo")("qlvl")
+    assert evaluator._compile_value(["a", "b"])("b")
+
+
+def test_pick_rules_index_priority_and_trace(rules_file):
+    results = evaluator.pick_rules([
+        {"special_case": "reg_vs_part", "entity": "school", "series_count": 2},
+        {"dataset_family": "lo", "series_count": 3},
+        {"dataset_family": "qlvl", "series_count": 1},
+    ])
+
+    assert [r["rule"] for r in results] == ["school_pie", "lo_bars", "fallback"]
+
+    # index skips lo_bars / school_pie for the qlvl profile entirely
+    assert [t["rule"] for t in results[2]["trace"]] == ["multi", "fallback"]
+    assert results[2]["trace"][0]["failed_on"] == "series_count"
+
+
+def test_rules_reload_on_mtime_change(rules_file):
+    path = rules_file
+
+    assert evaluator.pick_rule({"dataset_family": "lo"}) == {"chart": "bar-horizontal"}
+
+    path.write_text(RULES.replace("bar-horizontal", "column"))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert evaluator.pick_rule({"dataset_family": "lo"}) == {"chart": "column"}
+
+    # a broken file keeps the last good rules
+    path.write_text("rules: [")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2_000_000))
+
+    assert evaluator.pick_rule({"dataset_family": "lo"}) == {"chart": "column"}
@@ -0,0 +1,74 @@
+import io
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import openpyxl
+from app.services.excel_parser import detect_merged_sheets, read_workbook_frames
+
+
+def _workbook_bytes():
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Cover"
+    ws["A1"] = "Report"
+    ws.merge_cells("A1:C2")
+
+    data = wb.create_sheet("grade_5_English_lo")
+    data.append(["LO", "Avg Performance (%)"])
+    data.append(["LO a", 55])
+
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def test_detect_merged_sheets_from_xml():
+    assert detect_merged_sheets(io.BytesIO(_workbook_bytes())) == {"Cover"}
+
+
+def test_read_workbook_frames_skips_merged_sheets():
+    frames = read_workbook_frames(_workbook_bytes())
+
+    assert list(frames) == ["grade_5_English_lo"]
+    assert frames["grade_5_English_lo"]["LO"].tolist() == ["LO a"]
+
+
+def test_type_inference_flags():
+    import pandas as pd
+    from app.services.type_inference import infer_column_types
+
+    df = pd.DataFrame({
+        "Avg Score": ["55%", "(60%)", None],
+        "Participation %": [0.5, 0.7, 0.9],
+        "Questions": ["Q1", "Q2", "Q3"],
+    })
+
+    df, types = infer_column_types(df)
+
+    assert df["Avg Score"].tolist()[:2] == [55, 60]
+    assert types["Avg Score"] == {"numeric": True, "was_percent": True}
+    assert types["Participation %"] == {"numeric": True, "was_percent": True}
+    assert types["Questions"]["numeric"] is False
+
+
+def test_build_datasets_pool_keeps_sheet_order(monkeypatch):
+    import pandas as pd
+    from app.services import excel_parser
+
+    frames = {
+        f"grade_{g}_lo": pd.DataFrame({"LO": ["a", "b"], "Score %": [f"{g}%", "50%"]})
+        for g in range(3, 10)
+    }
+
+    monkeypatch.setattr(excel_parser, "PARSE_WORKERS", 1)
+    sequential = excel_parser.build_datasets(frames)
+
+    monkeypatch.setattr(excel_parser, "PARSE_WORKERS", 4)
+    monkeypatch.setattr(excel_parser, "PARSE_PARALLEL_MIN_SHEETS", 1)
+    pooled = excel_parser.build_datasets(frames)
+
+    assert [d["name"] for d in pooled] == list(frames)
+    assert pooled == sequential
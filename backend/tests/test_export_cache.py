@@ -0,0 +1,44 @@
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.services import export_service
+
+
+def test_pinned_job_export_survives_cache_eviction(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    monkeypatch.setattr(export_service, "EXPORT_DIR", tmp_path)
+    monkeypatch.setattr(export_service, "EXPORT_CACHE_DIR", cache_dir)
+
+    cached = cache_dir / "key.pptx"
+    cached.write_bytes(b"deck")
+
+    pinned = export_service._pin_export(cached, "job-1")
+    export_service._evict_exports(max_entries=0)
+
+    assert not cached.exists()
+    assert pinned == tmp_path / "job-1.pptx"
+    assert pinned.read_bytes() == b"deck"
+
+    # Pinned files still expire with the retention window
+    export_service.cleanup_old_exports(max_age_hours=-1)
+    assert not pinned.exists()
+
+
+def test_served_pin_is_removed_without_touching_the_cache(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    monkeypatch.setattr(export_service, "EXPORT_DIR", tmp_path)
+
+    cached = cache_dir / "key.pptx"
+    cached.write_bytes(b"deck")
+
+    pinned = export_service._pin_export(cached, "sync-1")
+    export_service.remove_pinned_export(pinned)
+    export_service.remove_pinned_export(pinned)  # already gone: no error
+
+    assert not pinned.exists()
+    assert cached.read_bytes() == b"deck"
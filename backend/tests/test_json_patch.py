@@ -0,0 +1,45 @@
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+from app.services.json_patch import JsonPatchError, apply_patch
+
+
+SLIDE = {
+    "slideId": "s1",
+    "title": "Overview",
+    "elements": [
+        {"id": "a", "type": "title", "x": 60},
+        {"id": "b", "type": "text", "x": 80},
+    ],
+}
+
+
+def test_replace_add_remove():
+    patched = apply_patch(SLIDE, [
+        {"op": "replace", "path": "/elements/1/x", "value": 120},
+        {"op": "add", "path": "/elements/-", "value": {"id": "c", "type": "text"}},
+        {"op": "remove", "path": "/elements/0"},
+        {"op": "add", "path": "/subtitle", "value": "Q1"},
+    ])
+
+    assert [e["id"] for e in patched["elements"]] == ["b", "c"]
+    assert patched["elements"][0]["x"] == 120
+    assert patched["subtitle"] == "Q1"
+
+    # input untouched
+    assert SLIDE["elements"][1]["x"] == 80
+
+
+def test_invalid_paths_raise():
+    with pytest.raises(JsonPatchError):
+        apply_patch(SLIDE, [{"op": "replace", "path": "/missing", "value": 1}])
+
+    with pytest.raises(JsonPatchError):
+        apply_patch(SLIDE, [{"op": "remove", "path": "/elements/5"}])
+
+    with pytest.raises(JsonPatchError):
+        apply_patch(SLIDE, [{"op": "move", "path": "/title", "from": "/x"}])
@@ -0,0 +1,55 @@
+import io
+import sys
+import zipfile
+from collections import Counter
+from pathlib import Path
+
+# Add backend to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.services.ppt.assembly import assemble_partials
+from app.services.ppt.slide_builder import render_slide_batch
+from app.services.ppt.template_loader import inspect_template
+
+TEMPLATE = Path(__file__).parent.parent / "templates" / "current_template.pptx"
+
+
+def _slide(name):
+    return {
+        "elements": [
+            {"type": "title", "value": name},
+            {
+                "type": "chart",
+                "chartType": "column",
+                "datasetName": f"{name}_sub_wise_avg_perf",
+                "metricTypes": {"Score %": "percent"},
+                "preview": [{"Subject": "A", "Score %": 40}, {"Subject": "B", "Score %": 60}],
+            },
+        ]
+    }
+
+
+def test_assembled_deck_has_unique_parts_and_all_slides():
+    info = inspect_template(TEMPLATE.read_bytes())
+
+    partials = [
+        render_slide_batch(info["bytes"], info["layout_index"], [_slide("g5"), _slide("g6")]),
+        render_slide_batch(info["bytes"], info["layout_index"], [_slide("g7"), _slide("g8")]),
+    ]
+
+    prs = assemble_partials(partials, info["layout_index"], info["slide_count"])
+
+    buf = io.BytesIO()
+    prs.save(buf)
+    names = zipfile.ZipFile(buf).namelist()
+
+    assert len(prs.slides) == info["slide_count"] + 4
+    assert [n for n, c in Counter(names).items() if c > 1] == []
+    assert len([n for n in names if n.startswith("ppt/charts/chart")]) == 4
+    assert len([n for n in names if n.startswith("ppt/embeddings/")]) == 4
+
+    # every chart frame points at a chart relationship of its own slide
+    for slide in list(prs.slides)[info["slide_count"]:]:
+        chart_rids = {r.rId for r in slide.part.rels.values() if r.reltype.endswith("/chart")}
+        frames = [s for s in slide.shapes if s.has_chart]
+        assert len(frames) == 1 and frames[0]._element.chart_rId in chart_rids
@@ -1,5 +1,5 @@
 import axios from "axios";
-import type { Dataset } from "./types";
+import type { ChartEmbedMode, ChartSeries, Dataset, DatasetRowsPage, ExportProgress, SlideChange, SlidePatchResult } from "./types";
 
 // Access Vite env var or default to localhost
 const API_URL = import.meta.env.VITE_API_URL || "https://ppt-dashboard-builder.onrender.com";
@@ -35,20 +35,68 @@ export const getProject = async (
     return res.data;
 };
 
+// Dataset.preview is a sample; page through the full rows here
+export const getDatasetRows = async (
+    datasetId: string,
+    offset: number = 0,
+    limit: number = 100,
+    columns?: string[]
+): Promise<DatasetRowsPage> => {
+    const res = await api.get(`/datasets/${datasetId}/rows`, {
+        params: { offset, limit, columns: columns?.join(",") },
+    });
+    return res.data;
+};
+
+// Categories, cleaned labels and normalized series, as the PPT export plots them
+export const getDatasetChartSeries = async (datasetId: string): Promise<ChartSeries | null> => {
+    const res = await api.get(`/datasets/${datasetId}/chart-series`);
+    return res.data.chart_series;
+};
+
+// Saves only changed slides; rejects with 409 when a revision is stale
+export const patchSlides = async (
+    projectId: string,
+    changes: SlideChange[],
+    deletes: { slideId: string; revision?: number | null }[] = []
+): Promise<SlidePatchResult> => {
+    const res = await api.patch(`/projects/${projectId}/slides`, { changes, deletes });
+    return res.data;
+};
+
+// Export runs as a background job: submit, poll progress, then download
 export const exportProject = async (
     projectId: string,
-    debugMode: boolean = false
+    debugMode: boolean = false,
+    onProgress?: (progress: ExportProgress | null) => void,
+    embed?: ChartEmbedMode
 ): Promise<Blob> => {
-    const res = await api.post(
-        `/export/${projectId}`,
+    const submit = await api.post(
+        `/export/${projectId}/jobs`,
         {},
         {
-            responseType: "blob", // Important for file download
             headers: {
                 "X-EXPORT-DEBUG": debugMode ? "true" : "false",
             },
+            params: embed ? { embed } : undefined,
         }
     );
+    const jobId: string = submit.data.job_id;
+
+    while (true) {
+        await new Promise(r => setTimeout(r, 1000));
+        const job = (await api.get(`/export/jobs/${jobId}`)).data;
+        onProgress?.(job.progress ?? null);
+
+        if (job.status === "failed") {
+            throw new Error(job.error_message || "Export failed");
+        }
+        if (job.status === "completed") break;
+    }
+
+    const res = await api.get(`/export/jobs/${jobId}/download`, {
+        responseType: "blob", // Important for file download
+    });
     return res.data;
 };
 
@@ -163,8 +211,9 @@ export const getPipelineState = async () => {
     return res.data;
 };
 
-export const finalizePipeline = async () => {
-    const res = await api.post(`/pipeline/finalize`);
+// background=true returns { job_id } immediately; poll getPipelineStatus for job.result
+export const finalizePipeline = async (background: boolean = false) => {
+    const res = await api.post(`/pipeline/finalize`, null, { params: { background } });
     return res.data;
 };
 
@@ -207,6 +256,14 @@ export const getPipelineConfig = async () => {
     return res.data;
 };
 
+export const estimatePipelineConfig = async (config: {
+    useAll: boolean;
+    schools?: any[];
+}): Promise<{ errors: string[]; total_rows: number; files: Record<string, number> }> => {
+    const res = await api.post("/pipeline/config/estimate", config);
+    return res.data;
+};
+
 export const fetchAvailableSchools = async (): Promise<{ schools: string[] }> => {
     try {
         const res = await api.get("/pipeline/available-schools");
@@ -3,7 +3,7 @@ import axios from 'axios';
 import { PipelineStepButton } from '../components/PipelineStepButton';
 
 import { usePipelineState } from '../hooks/usePipelineState';
-import { fetchStepOutput, getPipelineFiles, uploadData, uploadPipelineData, updatePipelineConfig, runPipelineStep, getPipelineStatus, fetchAvailableSchools } from '../api';
+import { getPipelineFiles, finalizePipeline, uploadPipelineData, updatePipelineConfig, runPipelineStep, getPipelineStatus, fetchAvailableSchools, estimatePipelineConfig } from '../api';
 import { useNavigate } from 'react-router-dom';
 import { LogViewer } from '../components/LogViewer';
 import { DataPreview } from '../components/DataPreview';
@@ -13,6 +13,17 @@ import { type PipelineConfig } from "../config/defaultPipelineConfig";
 import { SchoolConfigList } from "../components/SchoolConfigList";
 import { usePipelineConfig } from "../core/PipelineConfigProvider";
 
+// Map snake_case (internal) to camelCase (backend legacy)
+// TODO: Update backend to accept snake_case
+const toBackendConfig = (config: PipelineConfig) => ({
+    useAll: config.use_all,
+    schools: config.schools.map(s => ({
+        schoolName: s.school_name,
+        fromGrade: s.from_grade,
+        toGrade: s.to_grade
+    }))
+});
+
 export default function AnalysisPipelinePage() {
     const navigate = useNavigate();
     const { state: pipeline, refresh } = usePipelineState();
@@ -84,6 +95,29 @@ export default function AnalysisPipelinePage() {
         });
     }, [globalConfig]);
 
+    // Row estimate for the form config (served from the backend school catalog)
+    const [estimate, setEstimate] = useState<Awaited<ReturnType<typeof estimatePipelineConfig>> | null>(null);
+
+    useEffect(() => {
+        if (!uploaded) {
+            setEstimate(null);
+            return;
+        }
+
+        let cancelled = false;
+        // Debounced: the form changes on every keystroke
+        const timer = setTimeout(() => {
+            estimatePipelineConfig(toBackendConfig(formConfig))
+                .then(res => { if (!cancelled) setEstimate(res); })
+                .catch(() => { if (!cancelled) setEstimate(null); });
+        }, 400);
+
+        return () => {
+            cancelled = true;
+            clearTimeout(timer);
+        };
+    }, [formConfig, uploaded]);
+
     // Run All State
     const [runAllLogs, setRunAllLogs] = useState<string[]>([]);
     const [previewStep, setPreviewStep] = useState<string | null>(null);
@@ -190,20 +224,12 @@ export default function AnalysisPipelinePage() {
         setFinalizing(true);
         console.log("Starting finalization...");
         try {
-            // Updated Flow:
-            // 1. Fetch Blob from Pipeline Output
-            // 2. Upload Blob to Project Backend
-
-            console.log("Fetching pipeline output...");
-            const blob = await fetchStepOutput("performance-5");
+            // Datasets are built server-side from the in-memory step 5 output
+            // (no download + re-upload of the workbook)
+            console.log("Finalizing pipeline output...");
+            const res = await finalizePipeline();
 
-            // Create a File object from the Blob
-            const file = new File([blob], "uploadable data.xlsx", { type: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet" });
-
-            console.log("Uploading to Dashboard Backend...");
-            const res = await uploadData(file, "analysis_pipeline_output");
-
-            console.log("Upload response:", res);
+            console.log("Finalize response:", res);
 
             if (!res || !res.project_id) {
                 console.error("Missing project_id in response", res);
@@ -225,16 +251,7 @@ export default function AnalysisPipelinePage() {
     const handleSaveConfig = async (silent = false) => {
         try {
             setConfigSaving(true);
-            // Map snake_case (internal) to camelCase (backend legacy)
-            // TODO: Update backend to accept snake_case
-            await updatePipelineConfig({
-                useAll: formConfig.use_all,
-                schools: formConfig.schools.map(s => ({
-                    schoolName: s.school_name,
-                    fromGrade: s.from_grade,
-                    toGrade: s.to_grade
-                }))
-            });
+            await updatePipelineConfig(toBackendConfig(formConfig));
             if (silent !== true) {
                 alert("Configuration saved!");
             }
@@ -360,7 +377,6 @@ export default function AnalysisPipelinePage() {
         if (!name) return false;
         if (name === 'REG VS PART.xlsx') return true;
         if (/^Grade\s\d+\.xlsx$/.test(name)) return true;
-        if (name.includes('uploadable data.xlsx')) return true;
         return false;
     };
 
@@ -520,6 +536,17 @@ export default function AnalysisPipelinePage() {
                     </div>
                 )}
 
+                {estimate && (
+                    <div className="mt-6 text-sm text-gray-600">
+                        Estimated rows to process: <strong>{estimate.total_rows.toLocaleString()}</strong> across {Object.keys(estimate.files).length} grade file(s)
+                        {estimate.errors.length > 0 && (
+                            <ul className="mt-2 list-disc pl-5 text-amber-700">
+                                {estimate.errors.map(err => <li key={err}>{err}</li>)}
+                            </ul>
+                        )}
+                    </div>
+                )}
+
                 <div className="mt-8 flex justify-end">
                     <button
                         onClick={() => handleSaveConfig(false)}
@@ -642,7 +669,8 @@ export default function AnalysisPipelinePage() {
                         ✅ Pipeline Complete
                     </h2>
                     <p className="text-gray-700 mb-4">
-                        Final dataset ready: <code className="bg-white px-2 py-1 rounded">uploadable data.xlsx</code>
+                        Final dataset ready: the step 5 uploadable sheets are used directly
+                        (saved copy: <code className="bg-white px-2 py-1 rounded">outputs/step5_uploadable.xlsx</code>, used if the server restarted).
                     </p>
                     <button
                         onClick={handleFinalize}
@@ -1,7 +1,7 @@
 import { useState, useMemo } from "react";
 import { useLocation, useNavigate } from "react-router-dom";
 import { useMutation, useQuery } from "@tanstack/react-query";
-import type { Dataset } from "../types";
+import type { Dataset, ExportProgress } from "../types";
 import { exportProject, getProject, checkTemplateStatus, uploadTemplate } from "../api";
 import { Button } from "../components/ui/Button";
 import { Card, CardHeader, CardContent } from "../components/ui/Card";
@@ -179,9 +179,13 @@ function ExportControls({ projectId, projectName, datasets, templateConfigured }
     const [debugMode, setDebugMode] = useState(true);
     const [downloadUrl, setDownloadUrl] = useState<string | null>(null);
     const [exportError, setExportError] = useState<string | null>(null);
+    const [exportProgress, setExportProgress] = useState<ExportProgress | null>(null);
 
     const exportMutation = useMutation({
-        mutationFn: (args: { projectId: string; debugMode: boolean }) => exportProject(args.projectId, args.debugMode),
+        mutationFn: (args: { projectId: string; debugMode: boolean }) => {
+            setExportProgress(null);
+            return exportProject(args.projectId, args.debugMode, setExportProgress);
+        },
         onSuccess: (blob) => {
             const url = window.URL.createObjectURL(blob);
             setDownloadUrl(url);
@@ -219,6 +223,9 @@ function ExportControls({ projectId, projectName, datasets, templateConfigured }
         datasets.forEach(d => {
             if (!d.preview || d.preview.length === 0) {
                 list.push(`Dataset '${d.name}': Empty preview/data.`);
+            } else if (d.chart_series?.error) {
+                // Same check the exporter runs (compiled with the dataset)
+                list.push(`Dataset '${d.name}': ${d.chart_series.error}`);
             }
 
             const PCT_REQUIRED_TYPES = ["reg_vs_part", "participation_summary"];
@@ -301,7 +308,7 @@ function ExportControls({ projectId, projectName, datasets, templateConfigured }
                         disabled={!canExport || exportMutation.isPending}
                         onClick={() => exportMutation.mutate({ projectId, debugMode })}
                     >
-                        {exportMutation.isPending ? <><Spinner className="mr-2" /> Generating...</> : <><Download className="mr-2 h-4 w-4" /> Generate PowerPoint</>}
+                        {exportMutation.isPending ? <><Spinner className="mr-2" /> {exportProgress ? `Generating... ${exportProgress.done}/${exportProgress.total} slides` : "Generating..."}</> : <><Download className="mr-2 h-4 w-4" /> Generate PowerPoint</>}
                     </Button>
 
                     {!canExport && <p className="text-center text-xs text-red-500">Resolve blocking issues to export.</p>}
@@ -12,6 +12,47 @@ export interface Dataset {
     col_count: number;
     detected_type: string;
     profile: Record<string, unknown>;
+    chart_series: ChartSeries | null;
+}
+
+// Render-ready chart data compiled when the dataset was created; the PPT
+// exporter plots exactly these values. `error` is set if it cannot be plotted.
+export interface ChartSeries {
+    version: number;
+    error?: string;
+    render_type?: string;
+    label_column?: string;
+    percent_column?: string | null;
+    metric_columns?: string[];
+    categories?: string[];
+    labels?: string[];
+    series?: { name: string; values: number[] }[];
+    percents?: number[] | null;
+    pie?: { name: string; values: number[] } | null;
+}
+
+export interface DatasetRowsPage {
+    dataset_id: string;
+    offset: number;
+    limit: number;
+    total: number;
+    columns: string[];
+    rows: Record<string, unknown>[];
+}
+
+// PATCH /projects/{id}/slides: upsert (`slide`) or JSON-patch ops (`patch`)
+export interface SlideChange {
+    slideId: string;
+    revision?: number | null;
+    slide?: Record<string, unknown>;
+    patch?: { op: "add" | "remove" | "replace"; path: string; value?: unknown }[];
+    position?: number;
+}
+
+export interface SlidePatchResult {
+    status: string;
+    revisions: Record<string, number>;
+    deleted: string[];
 }
 
 export interface UploadResponse {
@@ -37,3 +78,12 @@ export interface PipelineJob {
     started_at?: string;
     completed_at?: string;
 }
+
+// Export job progress, in slides
+export interface ExportProgress {
+    done: number;
+    total: number;
+}
+
+// Workbook embedded behind each exported chart (none = read-only charts)
+export type ChartEmbedMode = "full" | "minimal" | "none";
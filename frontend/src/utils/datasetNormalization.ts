@@ -15,6 +15,7 @@ export function normalizeDatasets(raw: unknown): Dataset[] {
         row_count: Number(d?.row_count ?? 0),
         col_count: Number(d?.col_count ?? 0),
         detected_type: String(d?.detected_type ?? "unknown"),
-        profile: typeof d?.profile === "object" && d?.profile !== null ? d.profile : {}
+        profile: typeof d?.profile === "object" && d?.profile !== null ? d.profile : {},
+        chart_series: typeof d?.chart_series === "object" && d?.chart_series !== null ? d.chart_series : null
     }));
 }